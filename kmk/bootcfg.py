@@ -20,6 +20,7 @@ def bootcfg(
     midi: bool = True,
     mouse: bool = True,
     nkro: bool = False,
+    nkro_rollover: bool = False,
     pan: bool = False,
     storage: bool = True,
     usb_id: Optional[tuple[str, str]] = None,
@@ -47,7 +48,14 @@ def bootcfg(
     # configure HID devices
     devices = []
     if keyboard:
-        if nkro:
+        if nkro_rollover:
+            from kmk.hid_reports import nkro_keyboard
+
+            devices.append(usb_hid.Device.KEYBOARD)
+            devices.append(
+                nkro_keyboard.keyboard_device(nkro_keyboard.ROLLOVER_REPORT_ID)
+            )
+        elif nkro:
             from kmk.hid_reports import nkro_keyboard
 
             devices.append(nkro_keyboard.NKRO_KEYBOARD)
@@ -15,7 +15,11 @@ class Extension:
 
         self.on_runtime_disable(keyboard)
 
-    # The below methods should be implemented by subclasses
+    # Subclasses have to implement on_runtime_enable/disable and during_bootup,
+    # all other hooks are optional.
+    # Per-cycle hooks (before/after_matrix_scan, before/after_hid_send) and
+    # on_layers_changed that aren't overridden are skipped by the keyboard and
+    # don't cost any time. They do nothing, and are safe to call with super().
 
     def on_runtime_enable(self, keyboard):
         raise NotImplementedError
@@ -30,25 +34,32 @@ class Extension:
         '''
         Return value will be injected as an extra matrix update
         '''
-        raise NotImplementedError
+        return
 
     def after_matrix_scan(self, keyboard):
         '''
         Return value will be replace matrix update if supplied
         '''
-        raise NotImplementedError
+        return
 
     def before_hid_send(self, keyboard):
-        raise NotImplementedError
+        return
 
     def after_hid_send(self, keyboard):
-        raise NotImplementedError
+        return
+
+    def on_layers_changed(self, keyboard):
+        '''
+        Called at the start of a cycle, whenever the active layers have
+        changed since the last cycle.
+        '''
+        pass
 
     def on_powersave_enable(self, keyboard):
-        raise NotImplementedError
+        return
 
     def on_powersave_disable(self, keyboard):
-        raise NotImplementedError
+        return
 
     def deinit(self, keyboard):
         pass
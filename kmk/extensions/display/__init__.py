@@ -206,6 +206,8 @@ class Display(Extension):
     def before_matrix_scan(self, sandbox):
         if self.dim_period.tick():
             self.dim()
+
+    def on_layers_changed(self, sandbox):
         if sandbox.active_layers[0] != self.prev_layer:
             self.prev_layer = sandbox.active_layers[0]
             self.render(sandbox.active_layers[0])
@@ -214,12 +216,6 @@ class Display(Extension):
         if sandbox.matrix_update or sandbox.secondary_matrix_update:
             self.timer_start = ticks_ms()
 
-    def before_hid_send(self, sandbox):
-        return
-
-    def after_hid_send(self, sandbox):
-        return
-
     def on_powersave_enable(self, sandbox):
         self.powersave = True
 
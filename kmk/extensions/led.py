@@ -9,10 +9,12 @@ debug = Debug(__name__)
 
 
 class LEDKey(Key):
+    interned = True
+    brightness = None
+
     def __init__(self, *leds, brightness=None, **kwargs):
         super().__init__(**kwargs)
         self.leds = leds
-        self.brightness = None
 
 
 def led_set_key(brightness, *leds):
@@ -122,15 +124,6 @@ class LED(Extension):
     def during_bootup(self, sandbox):
         return
 
-    def before_matrix_scan(self, sandbox):
-        return
-
-    def after_matrix_scan(self, sandbox):
-        return
-
-    def before_hid_send(self, sandbox):
-        return
-
     def after_hid_send(self, sandbox):
         self.animate()
 
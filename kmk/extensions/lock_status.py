@@ -22,19 +22,12 @@ class LockStatus(Extension):
     def during_bootup(self, sandbox):
         for device in usb_hid.devices:
             if device.usage == usb_hid.Device.KEYBOARD.usage:
+                # The first keyboard is the boot keyboard, also with NKRO.
                 self.hid = device
+                break
         if self.hid is None:
             raise RuntimeError
 
-    def before_matrix_scan(self, sandbox):
-        return
-
-    def after_matrix_scan(self, sandbox):
-        return
-
-    def before_hid_send(self, sandbox):
-        return
-
     def after_hid_send(self, sandbox):
         report = self.hid.get_last_received_report()
         if report is None:
@@ -42,18 +42,6 @@ class MediaKeys(Extension):
     def during_bootup(self, sandbox):
         return
 
-    def before_matrix_scan(self, sandbox):
-        return
-
-    def after_matrix_scan(self, sandbox):
-        return
-
-    def before_hid_send(self, sandbox):
-        return
-
-    def after_hid_send(self, sandbox):
-        return
-
     def on_powersave_enable(self, sandbox):
         return
 
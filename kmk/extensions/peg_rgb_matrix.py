@@ -171,18 +171,6 @@ class Rgb_matrix(Extension):
         self.on()
         return
 
-    def before_matrix_scan(self, sandbox):
-        return
-
-    def after_matrix_scan(self, sandbox):
-        return
-
-    def before_hid_send(self, sandbox):
-        return
-
-    def after_hid_send(self, sandbox):
-        return
-
     def on_powersave_enable(self, sandbox):
         if self.neopixel:
             self.neopixel.brightness = (
@@ -3,7 +3,7 @@ from math import e, exp, pi, sin
 
 from kmk.extensions import Extension
 from kmk.keys import make_key
-from kmk.scheduler import create_task
+from kmk.scheduler import Priority, create_task
 from kmk.utils import Debug, clamp
 
 debug = Debug(__name__)
@@ -196,19 +196,12 @@ class RGB(Extension):
             for n, pixels in enumerate(self.pixels):
                 debug(f'pixels[{n}] = {pixels.__class__}[{len(pixels)}]')
 
-        self._task = create_task(self.animate, period_ms=(1000 // self.refresh_rate))
-
-    def before_matrix_scan(self, sandbox):
-        return
-
-    def after_matrix_scan(self, sandbox):
-        return
-
-    def before_hid_send(self, sandbox):
-        return
-
-    def after_hid_send(self, sandbox):
-        pass
+        self._task = create_task(
+            self.animate,
+            period_ms=(1000 // self.refresh_rate),
+            owner=self,
+            priority=Priority.BACKGROUND,
+        )
 
     def on_powersave_enable(self, sandbox):
         return
@@ -25,18 +25,7 @@ class StringyKeymaps(Extension):
                     elif self.debug_enabled:
                         print(f"Replacing '{key}' with {replacement}")
                     layer[key_idx] = replacement
-
-    def before_matrix_scan(self, keyboard):
-        return
-
-    def after_matrix_scan(self, keyboard):
-        return
-
-    def before_hid_send(self, keyboard):
-        return
-
-    def after_hid_send(self, keyboard):
-        return
+        keyboard.invalidate_keymap_cache()
 
     def on_powersave_enable(self, keyboard):
         return
@@ -1,11 +1,13 @@
 import supervisor
 import usb_hid
 from micropython import const
+from supervisor import ticks_ms
 
-from struct import pack, pack_into
+from struct import pack_into, unpack_from
 
 from kmk.keys import Axis, ConsumerKey, KeyboardKey, ModifierKey, MouseKey
-from kmk.scheduler import cancel_task, create_task
+from kmk.kmktime import ticks_add, ticks_diff
+from kmk.scheduler import Priority, Task, cancel_task, create_task
 from kmk.utils import Debug, clamp
 
 try:
@@ -45,37 +47,98 @@ _REPORT_SIZE_KEYBOARD_NKRO = const(16)
 _REPORT_SIZE_MOUSE = const(4)
 _REPORT_SIZE_MOUSE_HSCROLL = const(5)
 _REPORT_SIZE_SYSCONTROL = const(8)
+_REPORT_SIZE_MAX = const(16)
 
+# Trace records: usage page (16 bit), usage, length, ticks (32 bit), data.
+_TRACE_HEADER = const(8)
+_TRACE_RECORD = const(_TRACE_HEADER + _REPORT_SIZE_MAX)
 
-def find_device(devices, usage_page, usage):
-    for device in devices:
+# Key codes covered by the NKRO report descriptor.
+_NKRO_KEYS = const(120)
+
+
+def find_devices(devices, usage_page, usage):
+    return [
+        device
+        for device in devices
         if (
             device.usage_page == usage_page
             and device.usage == usage
             and hasattr(device, 'send_report')
-        ):
-            return device
+        )
+    ]
+
+
+def find_device(devices, usage_page, usage):
+    for device in find_devices(devices, usage_page, usage):
+        return device
+
+
+def _copy(src, dst):
+    # Copy byte by byte, slicing allocates. Queue entries are larger than most
+    # reports, copy what fits.
+    for idx in range(min(len(src), len(dst))):
+        dst[idx] = src[idx]
 
 
 class Report:
+    # Number of leading bytes that are bit fields, i.e. modifiers or buttons.
+    bitfields = 0
+    # Whether `queued_buffer` holds a report that is waiting to be sent.
+    queued = False
+
     def __init__(self, size):
         self.buffer = bytearray(size)
+        # Last report sent to the host.
+        self.prev_buffer = bytearray(size)
         self.pending = False
 
     def clear(self):
-        for k, v in enumerate(self.buffer):
-            if v:
-                self.buffer[k] = 0x00
+        buffer = self.buffer
+        for k in range(len(buffer)):
+            if buffer[k]:
+                buffer[k] = 0x00
                 self.pending = True
 
+    def clear_motion(self):
+        '''
+        Clear relative values, i.e. pointer motion, which are only sent once.
+        Used instead of `clear` by incremental updates.
+        '''
+        pass
+
+    def coalesces(self, sent, queued, new):
+        '''
+        Whether report `new` can replace `queued`, a report that hasn't been
+        sent yet, without hiding a change from the host, which last got
+        `sent`: a key that was pressed and released again, or released and
+        pressed again.
+        '''
+        bitfields = self.bitfields
+        for idx in range(len(self.buffer)):
+            change = sent[idx] ^ queued[idx]
+            if idx < bitfields:
+                if change & (queued[idx] ^ new[idx]):
+                    return False
+            elif change and queued[idx] != new[idx]:
+                return False
+        return True
+
     def get_action_map(self):
         return {}
 
+    def get_release_map(self):
+        return {}
+
 
 class KeyboardReport(Report):
+    bitfields = 1
+
     def __init__(self, size=_REPORT_SIZE_KEYBOARD):
         self.buffer = bytearray(size)
         self.prev_buffer = bytearray(size)
+        # Slot of every key code in the report, 0 if it isn't in the report.
+        self.slots = bytearray(256)
 
     @property
     def pending(self):
@@ -83,25 +146,42 @@ class KeyboardReport(Report):
 
     @pending.setter
     def pending(self, v):
-        if v is False:
-            self.prev_buffer[:] = self.buffer[:]
+        # `prev_buffer` is updated by the transport, once the report is sent.
+        pass
 
     def clear(self):
-        for idx in range(len(self.buffer)):
-            self.buffer[idx] = 0x00
+        buffer = self.buffer
+        slots = self.slots
+        buffer[0] = 0x00
+        for idx in range(2, len(buffer)):
+            if buffer[idx]:
+                slots[buffer[idx]] = 0
+                buffer[idx] = 0x00
 
     def add_key(self, key):
-        # Find the first empty slot in the key report, and fill it; drop key if
-        # report is full.
-        idx = self.buffer.find(b'\x00', 2)
+        code = key.code
+        if self.slots[code]:
+            return
 
-        if 0 < idx < _REPORT_SIZE_KEYBOARD:
-            self.buffer[idx] = key.code
+        # Fill the first empty slot in the key report; drop key if report is
+        # full.
+        if idx := self.free_slot():
+            self.buffer[idx] = code
+            self.slots[code] = idx
+        elif debug.enabled:
+            debug('rollover: dropped ', key)
+
+    def free_slot(self):
+        '''Return the index of the first empty key slot, 0 if there's none.'''
+        idx = self.buffer.find(b'\x00', 2)
+        return idx if 0 < idx < _REPORT_SIZE_KEYBOARD else 0
 
     def remove_key(self, key):
-        idx = self.buffer.find(pack('B', key.code), 2)
-        if 0 < idx:
+        code = key.code
+        idx = self.slots[code]
+        if idx:
             self.buffer[idx] = 0x00
+            self.slots[code] = 0
 
     def add_modifier(self, modifier):
         self.buffer[0] |= modifier.code
@@ -112,16 +192,84 @@ class KeyboardReport(Report):
     def get_action_map(self):
         return {KeyboardKey: self.add_key, ModifierKey: self.add_modifier}
 
+    def get_release_map(self):
+        return {KeyboardKey: self.remove_key, ModifierKey: self.remove_modifier}
+
 
 class NKROKeyboardReport(KeyboardReport):
+    bitfields = _REPORT_SIZE_KEYBOARD_NKRO
+
     def __init__(self):
-        super().__init__(_REPORT_SIZE_KEYBOARD_NKRO)
+        self.buffer = bytearray(_REPORT_SIZE_KEYBOARD_NKRO)
+        self.prev_buffer = bytearray(_REPORT_SIZE_KEYBOARD_NKRO)
+        # Number of keys in the report.
+        self.keys = 0
+
+    def clear(self):
+        buffer = self.buffer
+        for idx in range(len(buffer)):
+            buffer[idx] = 0x00
+        self.keys = 0
+
+    def has_key(self, key):
+        return self.buffer[(key.code >> 3) + 1] & (1 << (key.code & 0x07))
 
     def add_key(self, key):
-        self.buffer[(key.code >> 3) + 1] |= 1 << (key.code & 0x07)
+        if not self.has_key(key):
+            self.buffer[(key.code >> 3) + 1] |= 1 << (key.code & 0x07)
+            self.keys += 1
 
     def remove_key(self, key):
-        self.buffer[(key.code >> 3) + 1] &= ~(1 << (key.code & 0x07))
+        if self.has_key(key):
+            self.buffer[(key.code >> 3) + 1] &= ~(1 << (key.code & 0x07))
+            self.keys -= 1
+
+
+class RolloverKeyboardReport:
+    '''
+    Escalate from a 6KRO to an NKRO keyboard report: keys go to the 6KRO
+    report until it's full, and to the NKRO report from then on, until all
+    keys in the NKRO report are released. Without NKRO, i.e. when the host
+    uses the boot protocol, keys that don't fit are dropped.
+
+    Keys stay in the report they were added to until they're released, so
+    that the host sees exactly one press and one release for every key, in
+    order.
+    '''
+
+    def __init__(self, report, nkro_report, boot_protocol):
+        self.report = report
+        self.nkro_report = nkro_report
+        self.boot_protocol = boot_protocol
+
+    def add_key(self, key):
+        report = self.report
+        nkro_report = self.nkro_report
+        code = key.code
+        if report.slots[code] or (code < _NKRO_KEYS and nkro_report.has_key(key)):
+            return
+
+        if not nkro_report.keys and report.free_slot():
+            report.add_key(key)
+        elif code < _NKRO_KEYS and not self.boot_protocol():
+            nkro_report.add_key(key)
+        elif debug.enabled:
+            debug('rollover: dropped ', key)
+
+    def remove_key(self, key):
+        if self.report.slots[key.code]:
+            self.report.remove_key(key)
+        elif key.code < _NKRO_KEYS:
+            self.nkro_report.remove_key(key)
+
+    def get_action_map(self):
+        return {KeyboardKey: self.add_key, ModifierKey: self.report.add_modifier}
+
+    def get_release_map(self):
+        return {
+            KeyboardKey: self.remove_key,
+            ModifierKey: self.report.remove_modifier,
+        }
 
 
 class ConsumerControlReport(Report):
@@ -137,11 +285,23 @@ class ConsumerControlReport(Report):
             self.buffer = b'\x00\x00'
             self.pending = True
 
+    def release_cc(self, cc):
+        buffer = self.buffer
+        if buffer[0] | buffer[1] << 8 == cc.code:
+            buffer[0] = 0x00
+            buffer[1] = 0x00
+            self.pending = True
+
     def get_action_map(self):
         return {ConsumerKey: self.add_cc}
 
+    def get_release_map(self):
+        return {ConsumerKey: self.release_cc}
+
 
 class PointingDeviceReport(Report):
+    bitfields = 1
+
     def __init__(self, size=_REPORT_SIZE_MOUSE):
         super().__init__(size)
 
@@ -153,6 +313,20 @@ class PointingDeviceReport(Report):
         self.buffer[0] &= ~key.code
         self.pending = True
 
+    def clear_motion(self):
+        buffer = self.buffer
+        for idx in range(1, len(buffer)):
+            if buffer[idx]:
+                buffer[idx] = 0x00
+                self.pending = True
+
+    def coalesces(self, sent, queued, new):
+        # Motion is relative, replacing it would lose it.
+        for idx in range(1, len(self.buffer)):
+            if queued[idx]:
+                return False
+        return not ((sent[0] ^ queued[0]) & (queued[0] ^ new[0]))
+
     def move_axis(self, axis):
         delta = clamp(axis.delta, -127, 127)
         axis.delta -= delta
@@ -166,34 +340,335 @@ class PointingDeviceReport(Report):
     def get_action_map(self):
         return {Axis: self.move_axis, MouseKey: self.add_button}
 
+    def get_release_map(self):
+        return {MouseKey: self.remove_button}
+
 
 class HSPointingDeviceReport(PointingDeviceReport):
     def __init__(self):
         super().__init__(_REPORT_SIZE_MOUSE_HSCROLL)
 
 
+class ReportQueue:
+    '''
+    Queue of outgoing reports, for transports that can't take every report
+    right away, like BLE.
+
+    Every report has at most one entry, queued behind the entries of the
+    reports that were waiting already. New state of a report is merged into
+    its entry, so the queue can't overflow, and no keyboard or consumer
+    control report is ever dropped: the last state, and with it every
+    release, always reaches the host. A change that is undone before its
+    entry was sent, like a tap shorter than a connection interval, or pointer
+    motion, is superseded though. `drain` sends at most `drain_limit` entries
+    per call, and retries a failed send on the next call. The `prev_buffer`
+    of a report is only updated once the device took it.
+    '''
+
+    def __init__(self, drain_limit=1):
+        self.drain_limit = drain_limit
+        # Reports with an entry, in the order they were queued. There's at
+        # most one entry per report, so this stays short.
+        self._reports = []
+        self._devices = {}
+        self._buffers = {}
+        self.sent = 0
+        self.merged = 0
+        self.superseded = 0
+        self.retries = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self._reports)
+
+    def put(self, report, device, buffer):
+        queued = self._buffers.get(report)
+        if queued is None:
+            queued = self._buffers[report] = bytearray(len(report.buffer))
+
+        if report in self._reports:
+            if not report.coalesces(report.prev_buffer, queued, buffer):
+                self.superseded += 1
+                if debug.enabled:
+                    debug('report queue: superseded ', queued)
+            self.merged += 1
+        else:
+            self._reports.append(report)
+            self._devices[report] = device
+
+        _copy(buffer, queued)
+
+    def drain(self):
+        '''
+        Send up to `drain_limit` queued reports. Return False if a send
+        failed.
+        '''
+        reports = self._reports
+        for _ in range(self.drain_limit):
+            if not reports:
+                break
+
+            report = reports[0]
+            buffer = self._buffers[report]
+            try:
+                self._devices[report].send_report(buffer)
+            except Exception as e:
+                self.retries += 1
+                if debug.enabled:
+                    debug(type(e), ':', e)
+                return False
+
+            _copy(buffer, report.prev_buffer)
+            reports.pop(0)
+            self.sent += 1
+
+        return True
+
+    def clear(self):
+        '''Drop all queued reports.'''
+        self.dropped += len(self._reports)
+        self._reports.clear()
+
+
+class ReportTrace:
+    '''
+    Record the reports sent, and the key events that caused them, into a
+    preallocated ring buffer of `size` records.
+
+    Every record takes 24 bytes: the usage page and usage of the device, the
+    report length, the tick timestamp, and up to 16 bytes of report. Key
+    events are recorded with usage page 0, the pressed state as usage, and the
+    key number as report. Once the buffer is full, the oldest records are
+    overwritten.
+
+    `dump` prints the records, oldest first, one per line:
+
+        # kmk hid trace: 3 records, 0 overwritten
+        1200 key 4 1
+        1201 report 01:06 0000040000000000
+        1275 key 4 0
+
+    `util/hid_trace.py` replays and compares dumps on the host.
+    '''
+
+    def __init__(self, size=256):
+        self.size = size
+        self.buffer = bytearray(size * _TRACE_RECORD)
+        # Number of records since the trace was started or cleared.
+        self.count = 0
+
+    def _offset(self):
+        offset = (self.count % self.size) * _TRACE_RECORD
+        self.count += 1
+        return offset
+
+    def record_report(self, device, report):
+        buffer = self.buffer
+        length = len(report)
+        if length > _REPORT_SIZE_MAX:
+            length = _REPORT_SIZE_MAX
+        offset = self._offset()
+        pack_into(
+            '<HBBI', buffer, offset, device.usage_page, device.usage, length, ticks_ms()
+        )
+        offset += _TRACE_HEADER
+        for idx in range(length):
+            buffer[offset + idx] = report[idx]
+
+    def record_event(self, key_number, pressed):
+        pack_into(
+            '<HBBIH',
+            self.buffer,
+            self._offset(),
+            0,
+            1 if pressed else 0,
+            2,
+            ticks_ms(),
+            key_number,
+        )
+
+    def clear(self):
+        self.count = 0
+
+    def dump(self):
+        count = self.count
+        size = self.size
+        records = count if count < size else size
+        print(f'# kmk hid trace: {records} records, {count - records} overwritten')
+
+        buffer = self.buffer
+        for n in range(count - records, count):
+            offset = (n % size) * _TRACE_RECORD
+            usage_page, usage, length, ticks = unpack_from('<HBBI', buffer, offset)
+            offset += _TRACE_HEADER
+            if not usage_page:
+                key_number = unpack_from('<H', buffer, offset)[0]
+                print(f'{ticks} key {key_number} {usage}')
+            else:
+                data = ''.join(
+                    f'{buffer[idx]:02x}' for idx in range(offset, offset + length)
+                )
+                print(f'{ticks} report {usage_page:02x}:{usage:02x} {data}')
+
+
 class AbstractHID:
-    def __init__(self):
+    # Trace of the reports sent, if enabled.
+    trace = None
+
+    def __init__(self, incremental_reports=False, poll_interval_ms=0, trace_size=0):
         self.report_map = {}
+        self.release_map = {}
         self.device_map = {}
-        self._setup_task = create_task(self.setup, period_ms=100)
+        # Update reports by the keys pressed and released since the last
+        # report, instead of rebuilding them from scratch.
+        self.incremental_reports = incremental_reports
+        # Keys applied to the reports, in the order they were pressed; only
+        # tracked for incremental updates.
+        self._keys = []
+        self._resync = True
+        # Send reports at most once per poll interval of the endpoint, or
+        # right away if 0.
+        self.poll_interval_ms = poll_interval_ms
+        self._next_send = ticks_ms()
+        self.reports_sent = 0
+        self.reports_coalesced = 0
+        self.reports_split = 0
+        self.reports_queued = 0
+        if trace_size:
+            self.trace = ReportTrace(trace_size)
+        self._setup_task = create_task(
+            self.setup, period_ms=100, owner=self, priority=Priority.BACKGROUND
+        )
 
     def __repr__(self):
         return self.__class__.__name__
 
     def create_report(self, keys):
-        for report in self.device_map.keys():
+        if self.incremental_reports and not self._resync:
+            self.update_report(keys)
+        else:
+            self.rebuild_report(keys)
+
+    def rebuild_report(self, keys):
+        '''Clear all reports and add all `keys`.'''
+        # Iterate over the dicts directly, views like `keys()` are allocated.
+        for report in self.device_map:
             report.clear()
 
+        applied = self._keys
+        if applied:
+            applied.clear()
+        incremental = self.incremental_reports
         for key in keys:
             if action := self.report_map.get(type(key)):
                 action(key)
+                if incremental and not isinstance(key, Axis):
+                    applied.append(key)
+
+        self._resync = False
+
+    def update_report(self, keys):
+        '''
+        Apply the keys released from and pressed to `keys` since the last
+        report. Pointer motion is relative and sent with every report.
+        '''
+        applied = self._keys
+        release_map = self.release_map
+
+        released = False
+        idx = len(applied)
+        while idx:
+            idx -= 1
+            key = applied[idx]
+            if key not in keys:
+                applied.pop(idx)
+                if action := release_map.get(type(key)):
+                    action(key)
+                    released = True
+
+        report_map = self.report_map
+        if released:
+            # Releases may clear state shared with keys that are still held:
+            # modifier and button bits, or key codes. Adding is idempotent.
+            for key in applied:
+                report_map[type(key)](key)
+
+        for report in self.device_map:
+            report.clear_motion()
 
-    def send(self):
-        for report in self.device_map.keys():
-            if report.pending:
-                self.device_map[report].send_report(report.buffer)
+        for key in keys:
+            if isinstance(key, Axis):
+                if action := report_map.get(Axis):
+                    action(key)
+            elif key not in applied:
+                if action := report_map.get(type(key)):
+                    action(key)
+                    applied.append(key)
+
+    def resync(self):
+        '''Rebuild all reports from scratch on the next update.'''
+        self._resync = True
+
+    def send(self, flush=False):
+        '''
+        Send all pending reports.
+
+        With a poll interval, reports are sent at most once per interval.
+        Reports that change within an interval are queued and coalesced into a
+        single report per device, unless that would hide a change from the
+        host. Then the queued report is sent right away, i.e. the interval is
+        split. `flush` sends queued reports right away.
+        '''
+        interval = self.poll_interval_ms
+        if interval:
+            now = ticks_ms()
+            due = flush or ticks_diff(now, self._next_send) >= 0
+        else:
+            due = True
+
+        sent = False
+        queued = 0
+        for report in self.device_map:
+            split = False
+            if report.queued:
+                report.queued = False
+                buffer = report.queued_buffer
+                if report.buffer != buffer:
+                    if report.coalesces(report.prev_buffer, buffer, report.buffer):
+                        self.reports_coalesced += 1
+                    else:
+                        self._transmit(report, buffer)
+                        self.reports_split += 1
+                        split = sent = True
+
+            if not report.pending:
+                continue
+
+            if flush or (due and not split):
+                self._transmit(report, report.buffer)
                 report.pending = False
+                sent = True
+            else:
+                _copy(report.buffer, report.queued_buffer)
+                report.queued = True
+                queued += 1
+
+        self.reports_queued = queued
+        if sent and interval:
+            self._next_send = ticks_add(now, interval)
+
+    def send_delay_ms(self):
+        '''Return the time until queued reports are due.'''
+        delay = ticks_diff(self._next_send, ticks_ms())
+        return delay if delay > 0 else 0
+
+    def _transmit(self, report, buffer):
+        device = self.device_map[report]
+        device.send_report(buffer)
+        _copy(buffer, report.prev_buffer)
+        self.reports_sent += 1
+        if self.trace is not None:
+            self.trace.record_report(device, buffer)
 
     def setup(self):
         if not self.connected:
@@ -214,7 +689,8 @@ class AbstractHID:
                 debug(type(e), ':', e)
 
     def setup_keyboard_hid(self):
-        if device := find_device(self.devices, _USAGE_PAGE_KEYBOARD, _USAGE_KEYBOARD):
+        reports = {}
+        for device in find_devices(self.devices, _USAGE_PAGE_KEYBOARD, _USAGE_KEYBOARD):
             # bodgy NKRO autodetect
             try:
                 report = KeyboardReport()
@@ -222,14 +698,27 @@ class AbstractHID:
             except ValueError:
                 report = NKROKeyboardReport()
 
-            self.report_map.update(report.get_action_map())
-            self.device_map[report] = device
+            if type(report) not in reports:
+                reports[type(report)] = (report, device)
+
+        for report, device in reports.values():
+            self.add_report(report, device)
+
+        if len(reports) == 2:
+            self.add_report(
+                RolloverKeyboardReport(
+                    reports[KeyboardReport][0],
+                    reports[NKROKeyboardReport][0],
+                    self.boot_protocol,
+                )
+            )
+            # Rebuilding the reports from the unordered set of pressed keys
+            # could move held keys between the reports.
+            self.incremental_reports = True
 
     def setup_consumer_control(self):
         if device := find_device(self.devices, _USAGE_PAGE_CONSUMER, _USAGE_CONSUMER):
-            report = ConsumerControlReport()
-            self.report_map.update(report.get_action_map())
-            self.device_map[report] = device
+            self.add_report(ConsumerControlReport(), device)
 
     def setup_mouse_hid(self):
         if device := find_device(self.devices, _USAGE_PAGE_MOUSE, _USAGE_MOUSE):
@@ -240,8 +729,19 @@ class AbstractHID:
             except ValueError:
                 report = HSPointingDeviceReport()
 
-            self.report_map.update(report.get_action_map())
+            self.add_report(report, device)
+
+    def add_report(self, report, device=None):
+        self.report_map.update(report.get_action_map())
+        self.release_map.update(report.get_release_map())
+        if device is not None:
             self.device_map[report] = device
+            report.queued_buffer = bytearray(len(report.buffer))
+        self.resync()
+
+    def boot_protocol(self):
+        '''Whether the host uses the boot protocol for the keyboard.'''
+        return False
 
     def show_debug(self):
         for report in self.device_map.keys():
@@ -257,10 +757,25 @@ class USBHID(AbstractHID):
     def devices(self):
         return usb_hid.devices
 
+    def boot_protocol(self):
+        # Only indicative: the host isn't required to use the boot device it
+        # requested.
+        return usb_hid.get_boot_device() == 1
+
 
 class BLEHID(AbstractHID):
-    def __init__(self, ble_name=None):
-        super().__init__()
+    # Delay before retrying a send the radio didn't take, about one
+    # connection interval.
+    retry_delay_ms = 8
+
+    def __init__(self, ble_name=None, **kwargs):
+        super().__init__(**kwargs)
+
+        # Reports are queued, and sent one per main loop cycle, so that a
+        # slow connection never stalls the keyboard.
+        self.report_queue = ReportQueue()
+        self._drain_task = Task(self.drain)
+        self._draining = False
 
         self.ble = BLERadio()
         self.ble.name = ble_name if ble_name else getmount('/').label
@@ -269,7 +784,12 @@ class BLEHID(AbstractHID):
         self.hid = HIDService()
         self.hid.protocol_mode = 0  # Boot protocol
 
-        create_task(self.ble_monitor, period_ms=1000)
+        create_task(
+            self.ble_monitor,
+            period_ms=1000,
+            owner=self,
+            priority=Priority.BACKGROUND,
+        )
 
     @property
     def connected(self):
@@ -279,10 +799,35 @@ class BLEHID(AbstractHID):
     def devices(self):
         return self.hid.devices
 
+    def _transmit(self, report, buffer):
+        device = self.device_map[report]
+        self.report_queue.put(report, device, buffer)
+        self.reports_sent += 1
+        if self.trace is not None:
+            self.trace.record_report(device, buffer)
+        if not self._draining:
+            self._draining = True
+            create_task(self._drain_task)
+
+    def drain(self):
+        # Sending is still synchronous, and blocks while the radio's transmit
+        # buffer is full. Back off after a failed send instead of trying again
+        # on every tick.
+        after_ms = 1
+        if not self.connected:
+            self.report_queue.clear()
+        elif not self.report_queue.drain():
+            after_ms = self.retry_delay_ms
+
+        if self.report_queue:
+            create_task(self._drain_task, after_ms=after_ms)
+        else:
+            self._draining = False
+
     def ble_monitor(self):
         if self.ble_connected != self.connected:
             self.ble_connected = self.connected
-            if self._connected:
+            if self.ble_connected:
                 if debug.enabled:
                     debug('BLE connected')
             else:
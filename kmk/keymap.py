@@ -0,0 +1,78 @@
+try:
+    from typing import Optional, Sequence
+except ImportError:
+    pass
+
+from kmk.keys import Key
+
+
+class Layer:
+    '''
+    Read-only view of a keymap layer, stored as indices into a shared tuple of
+    keys: one or two bytes per position instead of a pointer.
+    '''
+
+    def __init__(self, keys: Sequence[Key], indices: Sequence[int]):
+        self.keys = keys
+        self.indices = indices
+
+    def __getitem__(self, idx: int) -> Key:
+        return self.keys[self.indices[idx]]
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __iter__(self):
+        keys = self.keys
+        for i in self.indices:
+            yield keys[i]
+
+
+class CompiledKeymap:
+    '''
+    Keymap generated by `util/keymap_compiler.py`.
+
+    Behaves like a list of layers. In addition, `resolved` holds every layer
+    with transparent keys already resolved against the default layer `base`,
+    which covers the layer stacks `[base]` and `[layer, base]`.
+    '''
+
+    def __init__(
+        self,
+        keys: Sequence[Key],
+        layers: Sequence[Sequence[int]],
+        resolved: Sequence[Sequence[int]],
+        base: int = 0,
+    ):
+        self.layers = tuple(Layer(keys, layer) for layer in layers)
+        self.resolved_layers = tuple(Layer(keys, layer) for layer in resolved)
+        self.base = base
+
+        # The keyboard only fills in missing keys of its own lists, resolved
+        # layers are read-only.
+        for layer in self.resolved_layers:
+            for key in layer:
+                if key is None:
+                    raise ValueError('resolved layers must not contain None')
+
+    def __getitem__(self, layer: int) -> Layer:
+        return self.layers[layer]
+
+    def __len__(self) -> int:
+        return len(self.layers)
+
+    def __iter__(self):
+        return iter(self.layers)
+
+    def resolved(self, active_layers: Sequence[int]) -> Optional[Layer]:
+        '''
+        Return the precomputed layer for the given layer stack, or `None` if
+        it has to be resolved key by key.
+        '''
+        n = len(active_layers)
+        if not 0 < n < 3 or active_layers[-1] != self.base:
+            return None
+        layer = active_layers[0]
+        if layer < len(self.resolved_layers):
+            return self.resolved_layers[layer]
+        return None
@@ -43,299 +43,203 @@ class AX:
     Y = Axis(1)
 
 
-def maybe_make_key(
-    names: Tuple[str, ...],
-    *args,
-    **kwargs,
-) -> Callable[[str], Key]:
-    def closure(candidate):
-        if candidate in names:
-            return make_key(names=names, *args, **kwargs)
-
-    return closure
-
-
-def maybe_make_argumented_key(
-    names: Tuple[str, ...],
-    constructor: [Key, Callable[[...], Key]],
-    **kwargs,
-) -> Callable[[str], Key]:
-    def closure(candidate):
-        if candidate in names:
-            return make_argumented_key(
-                names=names,
-                constructor=constructor,
-                **kwargs,
-            )
-
-    return closure
-
-
-def maybe_make_no_key(candidate: str) -> Optional[Key]:
+# Tables of standard keys: `(argument, names)` rows, where the meaning of the
+# argument depends on the table, see `_KEY_TABLES`.
+NO_KEYS = (
     # NO and TRNS are functionally identical in how they (don't) mutate
     # the state, but are tracked semantically separately, so create
     # two keys with the exact same functionality
-    keys = (
-        ('NO', 'XXXXXXX'),
-        ('TRANSPARENT', 'TRNS'),
-    )
-
-    for names in keys:
-        if candidate in names:
-            return make_key(
-                names=names,
-                on_press=handlers.passthrough,
-                on_release=handlers.passthrough,
-            )
-
-
-def maybe_make_alpha_key(candidate: str) -> Optional[Key]:
-    if len(candidate) != 1:
-        return
-
-    candidate_upper = candidate.upper()
-    if candidate_upper in ALL_ALPHAS:
-        return make_key(
-            names=(candidate_upper, candidate.lower()),
-            constructor=KeyboardKey,
-            code=4 + ALL_ALPHAS.index(candidate_upper),
-        )
-
+    (None, ('NO', 'XXXXXXX')),
+    (None, ('TRANSPARENT', 'TRNS')),
+)
 
-def maybe_make_numeric_key(candidate: str) -> Optional[Key]:
-    if candidate in ALL_NUMBERS or candidate in ALL_NUMBER_ALIASES:
-        try:
-            offset = ALL_NUMBERS.index(candidate)
-        except ValueError:
-            offset = ALL_NUMBER_ALIASES.index(candidate)
-
-        return make_key(
-            names=(ALL_NUMBERS[offset], ALL_NUMBER_ALIASES[offset]),
-            constructor=KeyboardKey,
-            code=30 + offset,
-        )
+ALPHA_KEYS = tuple((4 + i, (char, char.lower())) for i, char in enumerate(ALL_ALPHAS))
 
+NUMERIC_KEYS = tuple(
+    (30 + i, (char, ALL_NUMBER_ALIASES[i])) for i, char in enumerate(ALL_NUMBERS)
+)
 
-def maybe_make_mod_key(candidate: str) -> Optional[Key]:
-    # MEH = LCTL | LALT | LSFT
-    # HYPR = LCTL | LALT | LSFT | LGUI
-    mods = (
-        (0x01, ('LEFT_CONTROL', 'LCTRL', 'LCTL')),
-        (0x02, ('LEFT_SHIFT', 'LSHIFT', 'LSFT')),
-        (0x04, ('LEFT_ALT', 'LALT', 'LOPT')),
-        (0x08, ('LEFT_SUPER', 'LGUI', 'LCMD', 'LWIN')),
-        (0x10, ('RIGHT_CONTROL', 'RCTRL', 'RCTL')),
-        (0x20, ('RIGHT_SHIFT', 'RSHIFT', 'RSFT')),
-        (0x40, ('RIGHT_ALT', 'RALT', 'ROPT')),
-        (0x80, ('RIGHT_SUPER', 'RGUI', 'RCMD', 'RWIN')),
-        (0x07, ('MEH',)),
-        (0x0F, ('HYPER', 'HYPR')),
-    )
-
-    for code, names in mods:
-        if candidate in names:
-            return make_key(names=names, constructor=ModifierKey, code=code)
-
-
-def maybe_make_more_ascii(candidate: str) -> Optional[Key]:
-    codes = (
-        (40, ('ENTER', 'ENT', '\n')),
-        (41, ('ESCAPE', 'ESC')),
-        (42, ('BACKSPACE', 'BSPACE', 'BSPC', 'BKSP')),
-        (43, ('TAB', '\t')),
-        (44, ('SPACE', 'SPC', ' ')),
-        (45, ('MINUS', 'MINS', '-')),
-        (46, ('EQUAL', 'EQL', '=')),
-        (47, ('LBRACKET', 'LBRC', '[')),
-        (48, ('RBRACKET', 'RBRC', ']')),
-        (49, ('BACKSLASH', 'BSLASH', 'BSLS', '\\')),
-        (51, ('SEMICOLON', 'SCOLON', 'SCLN', ';')),
-        (52, ('QUOTE', 'QUOT', "'")),
-        (53, ('GRAVE', 'GRV', 'ZKHK', '`')),
-        (54, ('COMMA', 'COMM', ',')),
-        (55, ('DOT', '.')),
-        (56, ('SLASH', 'SLSH', '/')),
-    )
-
-    for code, names in codes:
-        if candidate in names:
-            return make_key(names=names, constructor=KeyboardKey, code=code)
-
-
-def maybe_make_fn_key(candidate: str) -> Optional[Key]:
-    codes = (
-        (58, ('F1',)),
-        (59, ('F2',)),
-        (60, ('F3',)),
-        (61, ('F4',)),
-        (62, ('F5',)),
-        (63, ('F6',)),
-        (64, ('F7',)),
-        (65, ('F8',)),
-        (66, ('F9',)),
-        (67, ('F10',)),
-        (68, ('F11',)),
-        (69, ('F12',)),
-        (104, ('F13',)),
-        (105, ('F14',)),
-        (106, ('F15',)),
-        (107, ('F16',)),
-        (108, ('F17',)),
-        (109, ('F18',)),
-        (110, ('F19',)),
-        (111, ('F20',)),
-        (112, ('F21',)),
-        (113, ('F22',)),
-        (114, ('F23',)),
-        (115, ('F24',)),
-    )
-
-    for code, names in codes:
-        if candidate in names:
-            return make_key(names=names, constructor=KeyboardKey, code=code)
-
-
-def maybe_make_navlock_key(candidate: str) -> Optional[Key]:
-    codes = (
-        (57, ('CAPS_LOCK', 'CAPSLOCK', 'CLCK', 'CAPS')),
-        # FIXME: Investigate whether this key actually works, and
-        #        uncomment when/if it does.
-        # (130, ('LOCKING_CAPS', 'LCAP')),
-        (70, ('PRINT_SCREEN', 'PSCREEN', 'PSCR')),
-        (71, ('SCROLL_LOCK', 'SCROLLLOCK', 'SLCK')),
-        # FIXME: Investigate whether this key actually works, and
-        #        uncomment when/if it does.
-        # (132, ('LOCKING_SCROLL', 'LSCRL')),
-        (72, ('PAUSE', 'PAUS', 'BRK')),
-        (73, ('INSERT', 'INS')),
-        (74, ('HOME',)),
-        (75, ('PGUP',)),
-        (76, ('DELETE', 'DEL')),
-        (77, ('END',)),
-        (78, ('PGDOWN', 'PGDN')),
-        (79, ('RIGHT', 'RGHT')),
-        (80, ('LEFT',)),
-        (81, ('DOWN',)),
-        (82, ('UP',)),
-    )
-
-    for code, names in codes:
-        if candidate in names:
-            return make_key(names=names, constructor=KeyboardKey, code=code)
-
-
-def maybe_make_numpad_key(candidate: str) -> Optional[Key]:
-    codes = (
-        (83, ('NUM_LOCK', 'NUMLOCK', 'NLCK')),
-        (84, ('KP_SLASH', 'NUMPAD_SLASH', 'PSLS')),
-        (85, ('KP_ASTERISK', 'NUMPAD_ASTERISK', 'PAST')),
-        (86, ('KP_MINUS', 'NUMPAD_MINUS', 'PMNS')),
-        (87, ('KP_PLUS', 'NUMPAD_PLUS', 'PPLS')),
-        (88, ('KP_ENTER', 'NUMPAD_ENTER', 'PENT')),
-        (89, ('KP_1', 'P1', 'NUMPAD_1')),
-        (90, ('KP_2', 'P2', 'NUMPAD_2')),
-        (91, ('KP_3', 'P3', 'NUMPAD_3')),
-        (92, ('KP_4', 'P4', 'NUMPAD_4')),
-        (93, ('KP_5', 'P5', 'NUMPAD_5')),
-        (94, ('KP_6', 'P6', 'NUMPAD_6')),
-        (95, ('KP_7', 'P7', 'NUMPAD_7')),
-        (96, ('KP_8', 'P8', 'NUMPAD_8')),
-        (97, ('KP_9', 'P9', 'NUMPAD_9')),
-        (98, ('KP_0', 'P0', 'NUMPAD_0')),
-        (99, ('KP_DOT', 'PDOT', 'NUMPAD_DOT')),
-        (103, ('KP_EQUAL', 'PEQL', 'NUMPAD_EQUAL')),
-        (133, ('KP_COMMA', 'PCMM', 'NUMPAD_COMMA')),
-        (134, ('KP_EQUAL_AS400', 'NUMPAD_EQUAL_AS400')),
-    )
-
-    for code, names in codes:
-        if candidate in names:
-            return make_key(names=names, constructor=KeyboardKey, code=code)
-
-
-def maybe_make_shifted_key(candidate: str) -> Optional[Key]:
-    codes = (
-        ('1', ('EXCLAIM', 'EXLM', '!')),
-        ('2', ('AT', '@')),
-        ('3', ('HASH', 'POUND', '#')),
-        ('4', ('DOLLAR', 'DLR', '$')),
-        ('5', ('PERCENT', 'PERC', '%')),
-        ('6', ('CIRCUMFLEX', 'CIRC', '^')),
-        ('7', ('AMPERSAND', 'AMPR', '&')),
-        ('8', ('ASTERISK', 'ASTR', '*')),
-        ('9', ('LEFT_PAREN', 'LPRN', '(')),
-        ('0', ('RIGHT_PAREN', 'RPRN', ')')),
-        ('-', ('UNDERSCORE', 'UNDS', '_')),
-        ('=', ('PLUS', '+')),
-        ('[', ('LEFT_CURLY_BRACE', 'LCBR', '{')),
-        (']', ('RIGHT_CURLY_BRACE', 'RCBR', '}')),
-        ('\\', ('PIPE', '|')),
-        (';', ('COLON', 'COLN', ':')),
-        ("'", ('DOUBLE_QUOTE', 'DQUO', 'DQT', '"')),
-        ('`', ('TILDE', 'TILD', '~')),
-        (',', ('LEFT_ANGLE_BRACKET', 'LABK', '<')),
-        ('.', ('RIGHT_ANGLE_BRACKET', 'RABK', '>')),
-        ('/', ('QUESTION', 'QUES', '?')),
-    )
-
-    for unshifted, names in codes:
-        if candidate in names:
-            return make_key(
-                names=names,
-                constructor=ModifiedKey,
-                code=KC[unshifted],
-                modifier=KC.LSFT,
-            )
-
-
-def maybe_make_firmware_key(candidate: str) -> Optional[Key]:
-    keys = (
-        ((('BLE_REFRESH',), handlers.ble_refresh)),
-        ((('BLE_DISCONNECT',), handlers.ble_disconnect)),
-        ((('BOOTLOADER',), handlers.bootloader)),
-        ((('HID_SWITCH', 'HID'), handlers.hid_switch)),
-        ((('RELOAD', 'RLD'), handlers.reload)),
-        ((('RESET',), handlers.reset)),
-        ((('ANY',), handlers.any_pressed)),
-    )
-
-    for names, handler in keys:
-        if candidate in names:
-            return make_key(names=names, on_press=handler)
-
-
-KEY_GENERATORS = (
-    maybe_make_no_key,
-    maybe_make_alpha_key,
-    maybe_make_numeric_key,
-    maybe_make_firmware_key,
-    maybe_make_key(
+FIRMWARE_KEYS = (
+    (handlers.ble_refresh, ('BLE_REFRESH',)),
+    (handlers.ble_disconnect, ('BLE_DISCONNECT',)),
+    (handlers.bootloader, ('BOOTLOADER',)),
+    (handlers.hid_switch, ('HID_SWITCH', 'HID')),
+    (handlers.reload, ('RELOAD', 'RLD')),
+    (handlers.reset, ('RESET',)),
+    (handlers.any_pressed, ('ANY',)),
+    (
+        (handlers.bkdl_pressed, handlers.bkdl_released),
         ('BKDL',),
-        on_press=handlers.bkdl_pressed,
-        on_release=handlers.bkdl_released,
     ),
-    maybe_make_key(
+    (
+        (handlers.gesc_pressed, handlers.gesc_released),
         ('GESC', 'GRAVE_ESC'),
-        on_press=handlers.gesc_pressed,
-        on_release=handlers.gesc_released,
     ),
-    maybe_make_mod_key,
+)
+
+MODIFIER_KEYS = (
+    (0x01, ('LEFT_CONTROL', 'LCTRL', 'LCTL')),
+    (0x02, ('LEFT_SHIFT', 'LSHIFT', 'LSFT')),
+    (0x04, ('LEFT_ALT', 'LALT', 'LOPT')),
+    (0x08, ('LEFT_SUPER', 'LGUI', 'LCMD', 'LWIN')),
+    (0x10, ('RIGHT_CONTROL', 'RCTRL', 'RCTL')),
+    (0x20, ('RIGHT_SHIFT', 'RSHIFT', 'RSFT')),
+    (0x40, ('RIGHT_ALT', 'RALT', 'ROPT')),
+    (0x80, ('RIGHT_SUPER', 'RGUI', 'RCMD', 'RWIN')),
+    (0x07, ('MEH',)),
+    (0x0F, ('HYPER', 'HYPR')),
+)
+
+KEYBOARD_KEYS = (
     # More ASCII standard keys
-    maybe_make_more_ascii,
+    (40, ('ENTER', 'ENT', '\n')),
+    (41, ('ESCAPE', 'ESC')),
+    (42, ('BACKSPACE', 'BSPACE', 'BSPC', 'BKSP')),
+    (43, ('TAB', '\t')),
+    (44, ('SPACE', 'SPC', ' ')),
+    (45, ('MINUS', 'MINS', '-')),
+    (46, ('EQUAL', 'EQL', '=')),
+    (47, ('LBRACKET', 'LBRC', '[')),
+    (48, ('RBRACKET', 'RBRC', ']')),
+    (49, ('BACKSLASH', 'BSLASH', 'BSLS', '\\')),
+    (51, ('SEMICOLON', 'SCOLON', 'SCLN', ';')),
+    (52, ('QUOTE', 'QUOT', "'")),
+    (53, ('GRAVE', 'GRV', 'ZKHK', '`')),
+    (54, ('COMMA', 'COMM', ',')),
+    (55, ('DOT', '.')),
+    (56, ('SLASH', 'SLSH', '/')),
     # Function Keys
-    maybe_make_fn_key,
+    (58, ('F1',)),
+    (59, ('F2',)),
+    (60, ('F3',)),
+    (61, ('F4',)),
+    (62, ('F5',)),
+    (63, ('F6',)),
+    (64, ('F7',)),
+    (65, ('F8',)),
+    (66, ('F9',)),
+    (67, ('F10',)),
+    (68, ('F11',)),
+    (69, ('F12',)),
+    (104, ('F13',)),
+    (105, ('F14',)),
+    (106, ('F15',)),
+    (107, ('F16',)),
+    (108, ('F17',)),
+    (109, ('F18',)),
+    (110, ('F19',)),
+    (111, ('F20',)),
+    (112, ('F21',)),
+    (113, ('F22',)),
+    (114, ('F23',)),
+    (115, ('F24',)),
     # Lock Keys, Navigation, etc.
-    maybe_make_navlock_key,
+    (57, ('CAPS_LOCK', 'CAPSLOCK', 'CLCK', 'CAPS')),
+    # FIXME: Investigate whether this key actually works, and
+    #        uncomment when/if it does.
+    # (130, ('LOCKING_CAPS', 'LCAP')),
+    (70, ('PRINT_SCREEN', 'PSCREEN', 'PSCR')),
+    (71, ('SCROLL_LOCK', 'SCROLLLOCK', 'SLCK')),
+    # FIXME: Investigate whether this key actually works, and
+    #        uncomment when/if it does.
+    # (132, ('LOCKING_SCROLL', 'LSCRL')),
+    (72, ('PAUSE', 'PAUS', 'BRK')),
+    (73, ('INSERT', 'INS')),
+    (74, ('HOME',)),
+    (75, ('PGUP',)),
+    (76, ('DELETE', 'DEL')),
+    (77, ('END',)),
+    (78, ('PGDOWN', 'PGDN')),
+    (79, ('RIGHT', 'RGHT')),
+    (80, ('LEFT',)),
+    (81, ('DOWN',)),
+    (82, ('UP',)),
     # Numpad
     # FIXME: Investigate whether this key actually works, and
     #        uncomment when/if it does.
-    # maybe_make_key(131, ('LOCKING_NUM', 'LNUM')),
-    maybe_make_numpad_key,
-    # Making life better for folks on tiny keyboards especially: exposes
-    # the 'shifted' keys as raw keys. Under the hood we're still
-    # sending Shift+(whatever key is normally pressed) to get these, so
-    # for example `KC_AT` will hold shift and press 2.
-    maybe_make_shifted_key,
+    # (131, ('LOCKING_NUM', 'LNUM')),
+    (83, ('NUM_LOCK', 'NUMLOCK', 'NLCK')),
+    (84, ('KP_SLASH', 'NUMPAD_SLASH', 'PSLS')),
+    (85, ('KP_ASTERISK', 'NUMPAD_ASTERISK', 'PAST')),
+    (86, ('KP_MINUS', 'NUMPAD_MINUS', 'PMNS')),
+    (87, ('KP_PLUS', 'NUMPAD_PLUS', 'PPLS')),
+    (88, ('KP_ENTER', 'NUMPAD_ENTER', 'PENT')),
+    (89, ('KP_1', 'P1', 'NUMPAD_1')),
+    (90, ('KP_2', 'P2', 'NUMPAD_2')),
+    (91, ('KP_3', 'P3', 'NUMPAD_3')),
+    (92, ('KP_4', 'P4', 'NUMPAD_4')),
+    (93, ('KP_5', 'P5', 'NUMPAD_5')),
+    (94, ('KP_6', 'P6', 'NUMPAD_6')),
+    (95, ('KP_7', 'P7', 'NUMPAD_7')),
+    (96, ('KP_8', 'P8', 'NUMPAD_8')),
+    (97, ('KP_9', 'P9', 'NUMPAD_9')),
+    (98, ('KP_0', 'P0', 'NUMPAD_0')),
+    (99, ('KP_DOT', 'PDOT', 'NUMPAD_DOT')),
+    (103, ('KP_EQUAL', 'PEQL', 'NUMPAD_EQUAL')),
+    (133, ('KP_COMMA', 'PCMM', 'NUMPAD_COMMA')),
+    (134, ('KP_EQUAL_AS400', 'NUMPAD_EQUAL_AS400')),
+)
+
+# Making life better for folks on tiny keyboards especially: exposes
+# the 'shifted' keys as raw keys. Under the hood we're still
+# sending Shift+(whatever key is normally pressed) to get these, so
+# for example `KC_AT` will hold shift and press 2.
+SHIFTED_KEYS = (
+    ('1', ('EXCLAIM', 'EXLM', '!')),
+    ('2', ('AT', '@')),
+    ('3', ('HASH', 'POUND', '#')),
+    ('4', ('DOLLAR', 'DLR', '$')),
+    ('5', ('PERCENT', 'PERC', '%')),
+    ('6', ('CIRCUMFLEX', 'CIRC', '^')),
+    ('7', ('AMPERSAND', 'AMPR', '&')),
+    ('8', ('ASTERISK', 'ASTR', '*')),
+    ('9', ('LEFT_PAREN', 'LPRN', '(')),
+    ('0', ('RIGHT_PAREN', 'RPRN', ')')),
+    ('-', ('UNDERSCORE', 'UNDS', '_')),
+    ('=', ('PLUS', '+')),
+    ('[', ('LEFT_CURLY_BRACE', 'LCBR', '{')),
+    (']', ('RIGHT_CURLY_BRACE', 'RCBR', '}')),
+    ('\\', ('PIPE', '|')),
+    (';', ('COLON', 'COLN', ':')),
+    ("'", ('DOUBLE_QUOTE', 'DQUO', 'DQT', '"')),
+    ('`', ('TILDE', 'TILD', '~')),
+    (',', ('LEFT_ANGLE_BRACKET', 'LABK', '<')),
+    ('.', ('RIGHT_ANGLE_BRACKET', 'RABK', '>')),
+    ('/', ('QUESTION', 'QUES', '?')),
+)
+
+
+def _make_no_key(arg):
+    return Key()
+
+
+def _make_firmware_key(arg):
+    if isinstance(arg, tuple):
+        return Key(on_press=arg[0], on_release=arg[1])
+    return Key(on_press=arg)
+
+
+def _make_modifier_key(arg):
+    return ModifierKey(code=arg)
+
+
+def _make_keyboard_key(arg):
+    return KeyboardKey(code=arg)
+
+
+def _make_shifted_key(arg):
+    return ModifiedKey(code=KC[arg], modifier=KC.LSFT)
+
+
+# Key factories and their tables, in order of precedence.
+_KEY_TABLES = (
+    (_make_no_key, NO_KEYS),
+    (_make_keyboard_key, ALPHA_KEYS),
+    (_make_keyboard_key, NUMERIC_KEYS),
+    (_make_firmware_key, FIRMWARE_KEYS),
+    (_make_modifier_key, MODIFIER_KEYS),
+    (_make_keyboard_key, KEYBOARD_KEYS),
+    (_make_shifted_key, SHIFTED_KEYS),
 )
 
 
@@ -347,12 +251,21 @@ class KeyAttrDict:
     # (https://github.com/adafruit/circuitpython/blob/main/py/map.c, 2023-02)
     __partition_size = 37
     __cache = [{}]
+    # Index of standard key names, partitioned by hash. Built on the first
+    # cache miss.
+    __index = None
 
     def __iter__(self):
         for partition in self.__cache:
             for name in partition:
                 yield name
 
+    def __contains__(self, name: str):
+        for partition in self.__cache:
+            if name in partition:
+                return True
+        return False
+
     def __setitem__(self, name: str, key: Key):
         # Overwrite existing reference.
         for partition in self.__cache:
@@ -379,39 +292,109 @@ class KeyAttrDict:
         self.__cache.clear()
         self.__cache.append({})
 
+    def __build_index(self):
+        count = 0
+        for _, table in _KEY_TABLES:
+            for _, names in table:
+                count += len(names)
+
+        index = [{} for _ in range(count // self.__partition_size + 1)]
+        for factory, table in _KEY_TABLES:
+            for arg, names in table:
+                entry = (factory, arg, names)
+                for name in names:
+                    partition = index[hash(name) % len(index)]
+                    # Earlier tables take precedence.
+                    if name not in partition:
+                        partition[name] = entry
+
+        KeyAttrDict.__index = index
+        return index
+
     def __getitem__(self, name: str):
         for partition in self.__cache:
             if name in partition:
                 return partition[name]
 
-        for func in KEY_GENERATORS:
-            maybe_key = func(name)
-            if maybe_key:
-                break
-
-        if not maybe_key:
+        index = self.__index or self.__build_index()
+        try:
+            factory, arg, names = index[hash(name) % len(index)][name]
+        except KeyError:
             if debug.enabled:
                 debug('Invalid key: ', name)
             return KC.NO
 
-        return maybe_key
+        # Register the new key under all of its names, unless they have been
+        # claimed by `make_key` already.
+        key = factory(arg)
+        for alias in names:
+            if alias not in self:
+                self[alias] = key
+
+        return key
 
 
 # Global state, will be filled in throughout this file, and
 # anywhere the user creates custom keys
 KC = KeyAttrDict()
 
+# Shared instances of argumented and modified keys, if enabled.
+_interned = None
+
+
+def intern_keys(enable: bool = True) -> None:
+    '''
+    Make identical calls of argumented and modified keys, like `KC.MO(1)` or
+    `KC.LSFT(KC.N1)`, return one shared instance instead of a new one each.
+    Only key types without per-instance state opt in, see `Key.interned`.
+    Has to be enabled before the keymap is defined.
+    '''
+    global _interned
+    _interned = {} if enable else None
+
+
+def _intern(ident, make, args, kwargs):
+    try:
+        ident = (ident, args, tuple(sorted(kwargs.items())))
+        key = _interned.get(ident)
+    except TypeError:
+        # Unhashable arguments, i.e. lists.
+        return make(*args, **kwargs)
+
+    if key is None:
+        key = make(*args, **kwargs)
+        if getattr(key, 'interned', False):
+            _interned[ident] = key
+    return key
+
 
 class Key:
-    '''Generic Key class with assignable handlers.'''
+    '''
+    Generic Key class with assignable handlers.
+
+    Every attribute of an instance costs heap: the Key hierarchy keeps
+    defaults on the class and only stores what differs per instance.
+    State that changes while keys are handled is the exception. It's assigned
+    in the constructor, otherwise the first press grows the instance.
+    '''
+
+    _on_press = staticmethod(handlers.passthrough)
+    _on_release = staticmethod(handlers.passthrough)
+
+    # Instances may be shared between identical calls of argumented keys, see
+    # `intern_keys`. Only true for stateless keys: neither the key itself nor
+    # a module may keep state per key instance, like HoldTap does.
+    interned = False
 
     def __init__(
         self,
         on_press: Callable[[object, Key, Keyboard, ...], None] = handlers.passthrough,
         on_release: Callable[[object, Key, Keyboard, ...], None] = handlers.passthrough,
     ):
-        self._on_press = on_press
-        self._on_release = on_release
+        if on_press is not handlers.passthrough:
+            self._on_press = on_press
+        if on_release is not handlers.passthrough:
+            self._on_release = on_release
 
     def __repr__(self):
         return self.__class__.__name__
@@ -454,6 +437,11 @@ class KeyboardKey(_DefaultKey):
 
 class ModifierKey(_DefaultKey):
     def __call__(self, key: Key) -> Key:
+        if _interned is not None:
+            return _intern(self, self._modify, (key,), {})
+        return self._modify(key)
+
+    def _modify(self, key: Key) -> Key:
         # don't duplicate when applying the same modifier twice
         if (
             isinstance(key, ModifiedKey)
@@ -467,8 +455,10 @@ class ModifierKey(_DefaultKey):
 
 
 class ModifiedKey(Key):
+    interned = True
+
     def __init__(self, code: [Key, int], modifier: [ModifierKey]):
-        # generate from code by maybe_make_shifted_key
+        # a plain keycode stands for the keyboard key with that code
         if isinstance(code, int):
             key = KeyboardKey(code=code)
         else:
@@ -561,7 +551,7 @@ def make_argumented_key(
     **_kwargs,
 ) -> Key:
 
-    def argumented_key(*args, **kwargs) -> Key:
+    def make(*args, **kwargs) -> Key:
         # This is a very ugly workaround for missing syntax in mpy-cross 8.x
         # and, once EOL, can be replaced by:
         # return constructor(*args, **_kwargs, **kwargs)
@@ -569,6 +559,11 @@ def make_argumented_key(
         k.update(**kwargs)
         return constructor(*args, **k)
 
+    def argumented_key(*args, **kwargs) -> Key:
+        if _interned is not None:
+            return _intern(argumented_key, make, args, kwargs)
+        return make(*args, **kwargs)
+
     for name in names:
         KC[name] = argumented_key
 
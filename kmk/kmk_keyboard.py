@@ -3,21 +3,172 @@ try:
 except ImportError:
     pass
 
-from collections import namedtuple
+from supervisor import ticks_ms
+
 from keypad import Event as KeyEvent
+from time import sleep
 
+from kmk.extensions import Extension
 from kmk.hid import BLEHID, USBHID, AbstractHID, HIDModes
 from kmk.keys import KC, Axis, Key
+from kmk.kmktime import ticks_add, ticks_diff
 from kmk.modules import Module
 from kmk.scanners.keypad import MatrixScanner
-from kmk.scheduler import Task, cancel_task, create_task, get_due_task
+from kmk.scheduler import (
+    Task,
+    cancel_task,
+    create_task,
+    next_deadline,
+    run_due_tasks,
+)
 from kmk.utils import Debug
 
 debug = Debug('kmk.keyboard')
 
-KeyBufferFrame = namedtuple(
-    'KeyBufferFrame', ('key', 'is_pressed', 'int_coord', 'index')
-)
+
+class KeyBufferFrame:
+    def __init__(self):
+        # Assigned up front, otherwise the instance attributes are allocated
+        # on first use, while processing key events.
+        self.key = None
+        self.is_pressed = False
+        self.int_coord = None
+        self.index = 0
+
+
+class KeyBuffer:
+    '''
+    Double ended queue of key events, backed by a ring of preallocated,
+    reusable `KeyBufferFrame`s.
+
+    Overflow policy: if the buffer is full, it grows and keeps its size, and
+    the overflow is counted in `overflows`. Dropping an event instead could
+    drop a release, and leave its key stuck until it's pressed again.
+    '''
+
+    def __init__(self, size: int = 32):
+        self._frames = [KeyBufferFrame() for _ in range(size)]
+        self._size = size
+        self._head = 0
+        self._len = 0
+        self.overflows = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def append(
+        self, key: Key, is_pressed: bool, int_coord: Optional[int], index: int
+    ) -> None:
+        if self._len >= self._size:
+            self._grow()
+
+        ksf = self._frames[(self._head + self._len) % self._size]
+        ksf.key = key
+        ksf.is_pressed = is_pressed
+        ksf.int_coord = int_coord
+        ksf.index = index
+        self._len += 1
+
+    def _grow(self) -> None:
+        self.overflows += 1
+        if debug.enabled:
+            debug('resume buffer overflow, growing to ', 2 * self._size or 1)
+
+        frames = self._frames
+        size = self._size
+        head = self._head
+        frames = [frames[(head + i) % size] for i in range(size)]
+        frames.extend(KeyBufferFrame() for _ in range(size or 1))
+        self._frames = frames
+        self._size = len(frames)
+        self._head = 0
+
+    def popleft(self) -> KeyBufferFrame:
+        '''
+        Remove and return the oldest frame. The frame is returned to the pool
+        and may be overwritten by the next `append`.
+        '''
+        if not self._len:
+            raise IndexError('pop from empty buffer')
+
+        ksf = self._frames[self._head]
+        self._head = (self._head + 1) % self._size
+        self._len -= 1
+        return ksf
+
+    def rotate(self, n: int) -> None:
+        '''
+        Move the `n` newest frames to the front, preserving their order.
+        '''
+        frames = self._frames
+        size = self._size
+        for _ in range(n):
+            tail = (self._head + self._len - 1) % size
+            head = (self._head - 1) % size
+            frames[head], frames[tail] = frames[tail], frames[head]
+            self._head = head
+
+    def clear(self) -> None:
+        self._head = 0
+        self._len = 0
+
+
+class UpdateQueue:
+    '''
+    FIFO of matrix updates, backed by a ring of reusable slots. Unlike a list
+    that is appended to and popped from the front, it doesn't allocate once
+    it's large enough; if it overflows, it grows and keeps its size.
+    '''
+
+    def __init__(self, size: int = 2):
+        self._events = [None] * size
+        self._head = 0
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def append(self, event: KeyEvent) -> None:
+        if self._len >= len(self._events):
+            self._grow()
+
+        events = self._events
+        events[(self._head + self._len) % len(events)] = event
+        self._len += 1
+
+    def popleft(self) -> KeyEvent:
+        if not self._len:
+            raise IndexError('pop from empty queue')
+
+        events = self._events
+        event = events[self._head]
+        events[self._head] = None
+        self._head = (self._head + 1) % len(events)
+        self._len -= 1
+        return event
+
+    def _grow(self) -> None:
+        # Kept out of `append`: variables used in a comprehension are put in
+        # cells, which are allocated on every call of the enclosing function.
+        events = self._events
+        size = len(events)
+        head = self._head
+        events = [events[(head + i) % size] for i in range(size)]
+        events.extend([None] * (size or 1))
+        self._events = events
+        self._head = 0
+
+
+def find_hooks(objects: list, base: object, hook: str) -> list:
+    '''
+    Filter `objects` for those, whose class overrides the `hook` method of
+    `base`, i.e. whose hook actually has to be called.
+    '''
+    hooks = []
+    for obj in objects:
+        if getattr(obj.__class__, hook, None) is not getattr(base, hook):
+            hooks.append(obj)
+    return hooks
 
 
 def debug_error(module, message: str, error: Exception):
@@ -30,7 +181,10 @@ def debug_error(module, message: str, error: Exception):
 class Sandbox:
     matrix_update = None
     secondary_matrix_update = None
+    # Snapshot of the active layers. It's replaced, never modified, whenever
+    # the layers change, and `active_layers_version` is incremented.
     active_layers = None
+    active_layers_version = 0
 
 
 class KMKKeyboard:
@@ -60,12 +214,22 @@ class KMKKeyboard:
     hid_pending = False
     matrix_update = None
     secondary_matrix_update = None
-    matrix_update_queue = []
+    matrix_update_queue = UpdateQueue(0)
+    matrix_update_batch = 1
+    idle_latency_ms = 0
     _trigger_powersave_enable = False
     _trigger_powersave_disable = False
     _go_args = None
-    _resume_buffer = []
-    _resume_buffer_x = []
+    # Initial capacity of the resume buffer, which grows if it overflows.
+    resume_buffer_size = 32
+    _resume_buffer = KeyBuffer(0)
+    _coord_index = {}
+    _resolved_keys = []
+    _resolved_layers = None
+    _compiled_keymap = False
+    _hooks = {}
+    _tapped_keys = []
+    _tap_task = None
 
     # this should almost always be PREpended to, replaces
     # former use of reversed_active_layers which had pointless
@@ -75,6 +239,18 @@ class KMKKeyboard:
     def __repr__(self) -> str:
         return self.__class__.__name__
 
+    @property
+    def active_layers_mask(self) -> int:
+        '''
+        Bit `n` is set if layer `n` is in `active_layers`. Derived from the
+        (short) layer stack on access, so that it can't go stale, whoever
+        changes the layers.
+        '''
+        mask = 0
+        for layer in self.active_layers:
+            mask |= 1 << layer
+        return mask
+
     def _send_hid(self) -> None:
         if not self._hid_send_enabled:
             return
@@ -97,17 +273,67 @@ class KMKKeyboard:
 
     def _handle_matrix_report(self, kevent: KeyEvent) -> None:
         if kevent is not None:
+            trace = self._hid_helper.trace
+            if trace is not None:
+                trace.record_event(kevent.key_number, kevent.pressed)
             self._on_matrix_changed(kevent)
 
+    def _process_matrix_updates(self) -> None:
+        '''
+        Handle up to `matrix_update_batch` queued key events, in order.
+
+        Between two events, the resume buffer is processed just like it would
+        be at the start of the next cycle. HID reports are coalesced, unless
+        press and release events are mixed, in which case sending them in
+        one report could reorder them.
+        '''
+        is_pressed = None
+        for _ in range(self.matrix_update_batch):
+            if not self.matrix_update_queue:
+                break
+
+            kevent = self.matrix_update_queue.popleft()
+
+            if is_pressed is not None:
+                self._process_resume_buffer()
+                if self.hid_pending and kevent.pressed != is_pressed:
+                    self._send_hid()
+
+            self._handle_matrix_report(kevent)
+            is_pressed = kevent.pressed
+
     def _find_key_in_map(self, int_coord: int) -> Key:
         try:
-            idx = self.coord_mapping.index(int_coord)
-        except ValueError:
+            idx = self._coord_index[int_coord]
+        except KeyError:
             if debug.enabled:
                 debug('no such int_coord: ', int_coord)
             return None
 
+        # The resolved keys are only valid for the layer stack they were
+        # resolved with. Comparing the (short) layer stack is cheaper than
+        # walking all layers on every key event. Changes to the keymap itself
+        # have to be announced with `invalidate_keymap_cache`.
+        if self.active_layers != self._resolved_layers:
+            self._resolved_layers = self.active_layers.copy()
+            resolved = None
+            if self._compiled_keymap:
+                resolved = self.keymap.resolved(self.active_layers)
+            # Sized by position: `coord_mapping` may contain duplicates.
+            # Precomputed layers are complete, only lists have to be filled in.
+            if resolved is None or len(resolved) < len(self.coord_mapping):
+                resolved = [None] * len(self.coord_mapping)
+            self._resolved_keys = resolved
+
+        key = self._resolved_keys[idx]
+        if key is None:
+            key = self._resolved_keys[idx] = self._resolve_key(idx)
+
+        return key
+
+    def _resolve_key(self, idx: int) -> Key:
         key = None
+        trns = KC.TRNS
         for layer in self.active_layers:
             try:
                 key = self.keymap[layer][idx]
@@ -115,7 +341,7 @@ class KMKKeyboard:
                 if debug.enabled:
                     debug('keymap IndexError: idx=', idx, ' layer=', layer)
 
-            if key and key != KC.TRNS:
+            if key and key != trns:
                 break
 
         return key
@@ -148,41 +374,37 @@ class KMKKeyboard:
         Resume the processing of buffered, delayed, deferred, etc. key events
         emitted by modules.
 
-        We use a copy of the `_resume_buffer` as a working buffer. The working
-        buffer holds all key events in the correct order for processing. If
-        during processing new events are pushed to the `_resume_buffer`, they
-        are prepended to the working buffer (which may not be emptied), in
-        order to preserve key event order.
-        We also double-buffer `_resume_buffer` with `_resume_buffer_x`, only
-        copying the reference to hopefully safe some time on allocations.
+        Events are popped from the front of the `_resume_buffer`. If
+        during processing new events are pushed to the back of the buffer,
+        they are moved to the front, in order to preserve key event order.
         '''
 
-        buffer, self._resume_buffer = self._resume_buffer, self._resume_buffer_x
+        buffer = self._resume_buffer
 
         while buffer:
-            ksf = buffer.pop(0)
+            ksf = buffer.popleft()
             key = ksf.key
+            is_pressed = ksf.is_pressed
+            int_coord = ksf.int_coord
+            index = ksf.index
+            pending = len(buffer)
 
             # Handle any unaccounted-for layer shifts by looking up the key resolution again.
-            if ksf.int_coord is not None:
-                key = self._find_key_in_map(ksf.int_coord)
+            if int_coord is not None:
+                key = self._find_key_in_map(int_coord)
 
             # Resume the processing of the key event and update the HID report
             # when applicable.
-            self.pre_process_key(key, ksf.is_pressed, ksf.int_coord, ksf.index)
+            self.pre_process_key(key, is_pressed, int_coord, index)
 
             if self.hid_pending:
                 self._send_hid()
                 self.hid_pending = False
 
-            # Any newly buffered key events must be prepended to the working
-            # buffer.
-            if self._resume_buffer:
-                self._resume_buffer.extend(buffer)
-                buffer.clear()
-                buffer, self._resume_buffer = self._resume_buffer, buffer
-
-        self._resume_buffer_x = buffer
+            # Any newly buffered key events must be processed before the
+            # remaining ones.
+            if pending:
+                buffer.rotate(len(buffer) - pending)
 
     def pre_process_key(
         self,
@@ -191,7 +413,11 @@ class KMKKeyboard:
         int_coord: Optional[int] = None,
         index: int = 0,
     ) -> None:
-        for module in self.modules[index:]:
+        # Index instead of slicing, a slice is a copy of the list.
+        modules = self.modules
+        while index < len(modules):
+            module = modules[index]
+            index += 1
             try:
                 key = module.process_key(self, key, is_pressed, int_coord)
                 if key is None:
@@ -231,10 +457,7 @@ class KMKKeyboard:
         reprocess: Optional[bool] = False,
     ) -> None:
         index = self.modules.index(module) + (0 if reprocess else 1)
-        ksf = KeyBufferFrame(
-            key=key, is_pressed=is_pressed, int_coord=int_coord, index=index
-        )
-        self._resume_buffer.append(ksf)
+        self._resume_buffer.append(key, is_pressed, int_coord, index)
 
     def remove_key(self, keycode: Key) -> None:
         self.process_key(keycode, False)
@@ -244,8 +467,16 @@ class KMKKeyboard:
 
     def tap_key(self, keycode: Key) -> None:
         self.add_key(keycode)
-        # On the next cycle, we'll remove the key.
-        self.set_timeout(0, lambda: self.remove_key(keycode))
+        # On the next cycle, we'll remove the key. All keys tapped in one cycle
+        # share a single, preallocated task.
+        if not self._tapped_keys:
+            create_task(self._tap_task)
+        self._tapped_keys.append(keycode)
+
+    def _release_tapped_keys(self) -> None:
+        tapped_keys = self._tapped_keys
+        while tapped_keys:
+            self.remove_key(tapped_keys.pop(0))
 
     def set_timeout(self, after_ticks: int, callback: Callable[[None], None]) -> [Task]:
         return create_task(callback, after_ms=after_ticks)
@@ -254,27 +485,47 @@ class KMKKeyboard:
         cancel_task(timeout_key)
 
     def _process_timeouts(self) -> None:
-        for task in get_due_task():
-            task()
+        run_due_tasks()
 
     def _init_coord_mapping(self) -> None:
         '''
         Attempt to sanely guess a coord_mapping if one is not provided. No-op
         if `kmk.extensions.split.Split` is used, it provides equivalent
-        functionality in `on_bootup`
+        functionality in `during_bootup`.
 
         To save RAM on boards that don't use Split, we don't import Split
         and do an isinstance check, but instead do string detection
-        '''
-        if any(x.__class__.__module__ == 'kmk.modules.split' for x in self.modules):
-            return
 
-        if not self.coord_mapping:
+        Also build the reverse index from int_coord to keymap index, which
+        is used for the key lookup on every key event.
+        '''
+        if not self.coord_mapping and not any(
+            x.__class__.__module__ == 'kmk.modules.split' for x in self.modules
+        ):
             cm = []
             for m in self.matrix:
                 cm.extend(m.coord_mapping)
             self.coord_mapping = tuple(cm)
 
+        self._coord_index = {}
+        if self.coord_mapping:
+            for idx, int_coord in enumerate(self.coord_mapping):
+                # Keep the first occurrence, same as `coord_mapping.index()`.
+                if int_coord not in self._coord_index:
+                    self._coord_index[int_coord] = idx
+
+        self.invalidate_keymap_cache()
+
+    def invalidate_keymap_cache(self) -> None:
+        '''
+        Drop the keys resolved for the current layer stack. Has to be called
+        after replacing the keymap, or changing one of its layers, at runtime.
+        '''
+        self._resolved_keys = []
+        self._resolved_layers = None
+        # Keymaps from `util/keymap_compiler.py` come with precomputed layers.
+        self._compiled_keymap = hasattr(self.keymap, 'resolved')
+
     def _init_hid(self) -> None:
         if self.hid_type == HIDModes.NOOP:
             self._hid_helper = AbstractHID
@@ -293,7 +544,7 @@ class KMKKeyboard:
     def _deinit_hid(self) -> None:
         try:
             self._hid_helper.create_report({})
-            self._hid_helper.send()
+            self._hid_helper.send(flush=True)
         except Exception as e:
             debug_error(self, '_deinit_hid', e)
 
@@ -346,58 +597,100 @@ class KMKKeyboard:
         if debug.enabled:
             debug('extensions=', [_.__class__.__name__ for _ in self.extensions])
 
+        # Build dispatch tables for hooks that are called on every cycle;
+        # modules and extensions that don't implement a hook are skipped.
+        self._hooks = {}
+        for hook in (
+            'before_matrix_scan',
+            'after_matrix_scan',
+            'before_hid_send',
+            'after_hid_send',
+            'on_layers_changed',
+        ):
+            self._hooks[hook] = (
+                find_hooks(self.modules, Module, hook),
+                find_hooks(self.extensions, Extension, hook),
+            )
+
     def before_matrix_scan(self) -> None:
-        for module in self.modules:
+        modules, extensions = self._hooks['before_matrix_scan']
+
+        for module in modules:
             try:
                 module.before_matrix_scan(self)
             except Exception as err:
                 debug_error(module, 'before_matrix_scan', err)
 
-        for ext in self.extensions:
+        for ext in extensions:
             try:
                 ext.before_matrix_scan(self.sandbox)
             except Exception as err:
                 debug_error(ext, 'before_matrix_scan', err)
 
     def after_matrix_scan(self) -> None:
-        for module in self.modules:
+        modules, extensions = self._hooks['after_matrix_scan']
+
+        for module in modules:
             try:
                 module.after_matrix_scan(self)
             except Exception as err:
                 debug_error(module, 'after_matrix_scan', err)
 
-        for ext in self.extensions:
+        for ext in extensions:
             try:
                 ext.after_matrix_scan(self.sandbox)
             except Exception as err:
                 debug_error(ext, 'after_matrix_scan', err)
 
     def before_hid_send(self) -> None:
-        for module in self.modules:
+        modules, extensions = self._hooks['before_hid_send']
+
+        for module in modules:
             try:
                 module.before_hid_send(self)
             except Exception as err:
                 debug_error(module, 'before_hid_send', err)
 
-        for ext in self.extensions:
+        for ext in extensions:
             try:
                 ext.before_hid_send(self.sandbox)
             except Exception as err:
                 debug_error(ext, 'before_hid_send', err)
 
     def after_hid_send(self) -> None:
-        for module in self.modules:
+        modules, extensions = self._hooks['after_hid_send']
+
+        for module in modules:
             try:
                 module.after_hid_send(self)
             except Exception as err:
                 debug_error(module, 'after_hid_send', err)
 
-        for ext in self.extensions:
+        for ext in extensions:
             try:
                 ext.after_hid_send(self.sandbox)
             except Exception as err:
                 debug_error(ext, 'after_hid_send', err)
 
+    def on_layers_changed(self) -> None:
+        sandbox = self.sandbox
+        sandbox.active_layers = self.active_layers.copy()
+        sandbox.active_layers_version += 1
+
+        modules, extensions = self._hooks['on_layers_changed']
+
+        for module in modules:
+            try:
+                module.on_layers_changed(self)
+            except Exception as err:
+                debug_error(module, 'on_layers_changed', err)
+
+        for ext in extensions:
+            try:
+                ext.on_layers_changed(sandbox)
+            except Exception as err:
+                debug_error(ext, 'on_layers_changed', err)
+
     def powersave_enable(self) -> None:
         for module in self.modules:
             try:
@@ -446,6 +739,8 @@ class KMKKeyboard:
             )
             while True:
                 self._main_loop()
+                if self.idle_latency_ms:
+                    self._idle()
         except Exception as err:
             import traceback
 
@@ -474,10 +769,16 @@ class KMKKeyboard:
         if debug.enabled:
             debug('Initialising ', self)
 
+        self._resume_buffer = KeyBuffer(self.resume_buffer_size)
+        self.matrix_update_queue = UpdateQueue(self.matrix_update_batch + 1)
+        self._tapped_keys = []
+        self._tap_task = Task(self._release_tapped_keys)
+
         self._init_hid()
         self._init_matrix()
-        self._init_coord_mapping()
         self.during_bootup()
+        # Split may provide the coord_mapping during bootup.
+        self._init_coord_mapping()
 
         if debug.enabled:
             import gc
@@ -485,34 +786,84 @@ class KMKKeyboard:
             gc.collect()
             debug('mem_info used:', gc.mem_alloc(), ' free:', gc.mem_free())
 
+    def _idle_ms(self) -> int:
+        '''
+        Return for how long the keyboard may sleep: 0 if there's work left to
+        do, otherwise the time until the next scheduled task, but at most
+        `idle_latency_ms`.
+        '''
+        if (
+            self.matrix_update_queue
+            or self._resume_buffer
+            or self.hid_pending
+            or self._trigger_powersave_enable
+            or self._trigger_powersave_disable
+        ):
+            return 0
+
+        ms = next_deadline()
+        if self._hid_send_enabled and self._hid_helper.reports_queued:
+            send_ms = self._hid_helper.send_delay_ms()
+            if ms is None or send_ms < ms:
+                ms = send_ms
+        if ms is None or ms > self.idle_latency_ms:
+            return self.idle_latency_ms
+        return ms
+
+    def _idle(self) -> None:
+        '''
+        Sleep until either the next scheduled task is due, a key event is
+        pending, or `idle_latency_ms` have passed, whichever comes first.
+        '''
+        ms = self._idle_ms()
+        if ms <= 0:
+            return
+
+        deadline = ticks_add(ticks_ms(), ms)
+        while ticks_diff(deadline, ticks_ms()) > 0:
+            for matrix in self.matrix:
+                if matrix.events_pending:
+                    return
+            sleep(0.001)
+
     def _main_loop(self) -> None:
-        self.sandbox.active_layers = self.active_layers.copy()
+        # Comparing doesn't allocate, only copy when the layers have changed.
+        if self.active_layers != self.sandbox.active_layers:
+            self.on_layers_changed()
 
         self.before_matrix_scan()
 
         self._process_resume_buffer()
 
-        for matrix in self.matrix:
-            update = matrix.scan_for_changes()
-            if update:
-                self.matrix_update = update
-                break
-        self.sandbox.matrix_update = self.matrix_update
-        self.sandbox.secondary_matrix_update = self.secondary_matrix_update
+        # Only handle one key per cycle, unless batching is enabled: then keep
+        # scanning until either nothing changed anymore or the batch is full.
+        # `after_matrix_scan` runs after every scan, i.e. once for every key
+        # event, which is what split keyboards rely on to forward them all.
+        for _ in range(self.matrix_update_batch):
+            for matrix in self.matrix:
+                update = matrix.scan_for_changes()
+                if update:
+                    self.matrix_update = update
+                    break
+            self.sandbox.matrix_update = self.matrix_update
+            self.sandbox.secondary_matrix_update = self.secondary_matrix_update
 
-        self.after_matrix_scan()
+            self.after_matrix_scan()
 
-        if self.secondary_matrix_update:
-            self.matrix_update_queue.append(self.secondary_matrix_update)
-            self.secondary_matrix_update = None
+            if self.secondary_matrix_update:
+                self.matrix_update_queue.append(self.secondary_matrix_update)
+                self.secondary_matrix_update = None
+
+            if not self.matrix_update:
+                break
 
-        if self.matrix_update:
             self.matrix_update_queue.append(self.matrix_update)
             self.matrix_update = None
 
-        # only handle one key per cycle.
-        if self.matrix_update_queue:
-            self._handle_matrix_report(self.matrix_update_queue.pop(0))
+            if len(self.matrix_update_queue) >= self.matrix_update_batch:
+                break
+
+        self._process_matrix_updates()
 
         self.before_hid_send()
 
@@ -523,6 +874,9 @@ class KMKKeyboard:
 
         if self.hid_pending:
             self._send_hid()
+        elif self._hid_helper.reports_queued:
+            # Send reports queued for the next poll interval, once it's due.
+            self._hid_helper.send()
 
         self.after_hid_send()
 
@@ -10,7 +10,10 @@ class Module:
     consistant manner.
     '''
 
-    # The below methods should be implemented by subclasses
+    # Subclasses have to implement during_bootup, all other hooks are optional.
+    # Per-cycle hooks (before/after_matrix_scan, before/after_hid_send) and
+    # on_layers_changed that aren't overridden are skipped by the keyboard and
+    # don't cost any time. They do nothing, and are safe to call with super().
 
     def during_bootup(self, keyboard):
         raise NotImplementedError
@@ -19,28 +22,35 @@ class Module:
         '''
         Return value will be injected as an extra matrix update
         '''
-        raise NotImplementedError
+        return
 
     def after_matrix_scan(self, keyboard):
         '''
         Return value will be replace matrix update if supplied
         '''
-        raise NotImplementedError
+        return
 
     def process_key(self, keyboard, key, is_pressed, int_coord):
         return key
 
     def before_hid_send(self, keyboard):
-        raise NotImplementedError
+        return
 
     def after_hid_send(self, keyboard):
-        raise NotImplementedError
+        return
+
+    def on_layers_changed(self, keyboard):
+        '''
+        Called at the start of a cycle, whenever the active layers have
+        changed since the last cycle.
+        '''
+        pass
 
     def on_powersave_enable(self, keyboard):
-        raise NotImplementedError
+        return
 
     def on_powersave_disable(self, keyboard):
-        raise NotImplementedError
+        return
 
     def deinit(self, keyboard):
         pass
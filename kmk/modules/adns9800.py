@@ -214,15 +214,6 @@ class ADNS9800(Module):
             if debug.enabled:
                 debug('Delta: ', delta_x, ' ', delta_y)
 
-    def after_matrix_scan(self, keyboard):
-        return
-
-    def before_hid_send(self, keyboard):
-        return
-
-    def after_hid_send(self, keyboard):
-        return
-
     def on_powersave_enable(self, keyboard):
         return
 
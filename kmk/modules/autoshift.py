@@ -17,12 +17,6 @@ class Autoshift(Module):
     def during_bootup(self, keyboard):
         self._task = create_task(lambda: self._shift(keyboard), after_ms=-1)
 
-    def before_matrix_scan(self, keyboard):
-        pass
-
-    def after_matrix_scan(self, keyboard):
-        pass
-
     def process_key(self, keyboard, key, is_pressed, int_coord):
         # Unshift on any key event
         if self._active:
@@ -55,12 +49,6 @@ class Autoshift(Module):
                 keyboard.resume_process_key(self, key, True)
             self._key = None
 
-    def before_hid_send(self, keyboard):
-        pass
-
-    def after_hid_send(self, keyboard):
-        pass
-
     def on_powersave_enable(self, keyboard):
         pass
 
@@ -28,9 +28,6 @@ class CgSwap(Module):
     def matrix_detected_press(self, keyboard):
         return keyboard.matrix_update is None
 
-    def before_matrix_scan(self, keyboard):
-        return
-
     def process_key(self, keyboard, key, is_pressed, int_coord):
         if is_pressed:
             # enables or disables or toggles cg swap
@@ -54,17 +51,8 @@ class CgSwap(Module):
 
         return key
 
-    def before_hid_send(self, keyboard):
-        return
-
-    def after_hid_send(self, keyboard):
-        return
-
     def on_powersave_enable(self, keyboard):
         return
 
     def on_powersave_disable(self, keyboard):
         return
-
-    def after_matrix_scan(self, keyboard):
-        return
@@ -7,6 +7,7 @@ from micropython import const
 from kmk.keys import Key, make_key
 from kmk.kmk_keyboard import KMKKeyboard
 from kmk.modules import Module
+from kmk.scheduler import Timer
 from kmk.utils import Debug
 
 debug = Debug(__name__)
@@ -108,20 +109,11 @@ class Combos(Module):
         make_key(names=('LEADER', 'LDR'))
 
     def during_bootup(self, keyboard):
+        # Timer callbacks, created once: closures allocate.
+        self._reset_timeout = lambda combo: self.reset_combo(keyboard, combo)
+        self._match_timeout = lambda combo: self.on_timeout(keyboard, combo)
         self.reset(keyboard)
 
-    def before_matrix_scan(self, keyboard):
-        return
-
-    def after_matrix_scan(self, keyboard):
-        return
-
-    def before_hid_send(self, keyboard):
-        return
-
-    def after_hid_send(self, keyboard):
-        return
-
     def on_powersave_enable(self, keyboard):
         return
 
@@ -148,11 +140,7 @@ class Combos(Module):
             if combo.matches(key, int_coord):
                 continue
             combo._state = _ComboState.IDLE
-            if combo._timeout:
-                keyboard.cancel_timeout(combo._timeout)
-            combo._timeout = keyboard.set_timeout(
-                combo.timeout, lambda c=combo: self.reset_combo(keyboard, c)
-            )
+            self.start_timeout(combo, self._reset_timeout)
 
         match_count = self.count_matching()
 
@@ -169,9 +157,7 @@ class Combos(Module):
             if match_count == 1 and not any(first_match._remaining):
                 combo = first_match
                 self.activate(keyboard, combo)
-                if combo._timeout:
-                    keyboard.cancel_timeout(combo._timeout)
-                    combo._timeout = None
+                self.cancel_timeout(combo)
                 self._key_buffer = []
                 self.reset(keyboard)
 
@@ -179,14 +165,13 @@ class Combos(Module):
             for combo in self.combos:
                 if combo._state != _ComboState.MATCHING:
                     continue
-                if combo._timeout:
-                    if combo.per_key_timeout:
-                        keyboard.cancel_timeout(combo._timeout)
-                    else:
-                        continue
-                combo._timeout = keyboard.set_timeout(
-                    combo.timeout, lambda c=combo: self.on_timeout(keyboard, c)
-                )
+                if (
+                    combo._timeout is not None
+                    and combo._timeout.active
+                    and not combo.per_key_timeout
+                ):
+                    continue
+                self.start_timeout(combo, self._match_timeout)
         else:
             # There's no matching combo: send and reset key buffer
             if self._key_buffer:
@@ -227,7 +212,7 @@ class Combos(Module):
 
                 # Combo matches, but first key released before timeout.
                 elif not any(combo._remaining) and self.count_matching() == 1:
-                    keyboard.cancel_timeout(combo._timeout)
+                    self.cancel_timeout(combo)
                     self.activate(keyboard, combo)
                     self._key_buffer = []
                     keyboard._send_hid()
@@ -277,8 +262,6 @@ class Combos(Module):
     def on_timeout(self, keyboard, combo):
         # If combo reaches timeout and has no remaining keys, activate it;
         # else, drop it from the match list.
-        combo._timeout = None
-
         if not any(combo._remaining):
             self.activate(keyboard, combo)
             # check if the last buffered key event was a 'release'
@@ -312,11 +295,20 @@ class Combos(Module):
 
     def reset_combo(self, keyboard, combo):
         combo.reset()
-        if combo._timeout is not None:
-            keyboard.cancel_timeout(combo._timeout)
-            combo._timeout = None
+        self.cancel_timeout(combo)
         combo._state = _ComboState.RESET
 
+    def start_timeout(self, combo, callback):
+        # Every combo gets a single timer on first use, which is then
+        # restarted for both, its match and its reset timeout.
+        if combo._timeout is None:
+            combo._timeout = Timer(callback, combo)
+        combo._timeout.start(combo.timeout, callback)
+
+    def cancel_timeout(self, combo):
+        if combo._timeout is not None:
+            combo._timeout.cancel()
+
     def reset(self, keyboard):
         for combo in self.combos:
             if combo._state != _ComboState.ACTIVE:
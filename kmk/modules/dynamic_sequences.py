@@ -9,9 +9,13 @@ from kmk.modules import Module
 
 
 class DynamicSequenceKey(Key):
+    interned = True
+    sequence_select = None
+
     def __init__(self, sequence_select=None, **kwargs):
         super().__init__(**kwargs)
-        self.sequence_select = sequence_select
+        if sequence_select is not None:
+            self.sequence_select = sequence_select
 
 
 class SequenceStatus:
@@ -228,12 +232,6 @@ class DynamicSequences(Module):
     def during_bootup(self, keyboard):
         return
 
-    def before_matrix_scan(self, keyboard):
-        return
-
-    def after_matrix_scan(self, keyboard):
-        return
-
     def before_hid_send(self, keyboard):
 
         if not self.status:
@@ -251,9 +249,6 @@ class DynamicSequences(Module):
         ):
             self.config_mode(keyboard)
 
-    def after_hid_send(self, keyboard):
-        return
-
     def on_powersave_enable(self, keyboard):
         return
 
@@ -2,6 +2,7 @@ from micropython import const
 
 from kmk.keys import Key, make_argumented_key
 from kmk.modules import Module
+from kmk.scheduler import Timer
 from kmk.utils import Debug
 
 debug = Debug(__name__)
@@ -23,14 +24,23 @@ class HoldTapRepeat:
 
 
 class HoldTapKeyState:
-    def __init__(self, timeout_key, *args, **kwargs):
-        self.timeout_key = timeout_key
-        self.args = args
-        self.kwargs = kwargs
+    def __init__(self, key, callback):
+        self.key = key
+        self.keyboard = None
+        self.args = ()
+        self.kwargs = None
         self.activated = ActivationType.PRESSED
+        # The tap dance key this state belongs to, if any.
+        self.tap_dance = None
+        self.timer = Timer(callback, self)
 
 
 class HoldTapKey(Key):
+    prefer_hold = True
+    tap_interrupted = False
+    tap_time = None
+    repeat = HoldTapRepeat.NONE
+
     def __init__(
         self,
         tap,
@@ -44,10 +54,14 @@ class HoldTapKey(Key):
         super().__init__(**kwargs)
         self.tap = tap
         self.hold = hold
-        self.prefer_hold = prefer_hold
-        self.tap_interrupted = tap_interrupted
-        self.tap_time = tap_time
-        self.repeat = repeat
+        if not prefer_hold:
+            self.prefer_hold = prefer_hold
+        if tap_interrupted:
+            self.tap_interrupted = tap_interrupted
+        if tap_time is not None:
+            self.tap_time = tap_time
+        if repeat != HoldTapRepeat.NONE:
+            self.repeat = repeat
 
 
 class HoldTap(Module):
@@ -56,6 +70,11 @@ class HoldTap(Module):
     def __init__(self, _make_key=True):
         self.key_buffer = []
         self.key_states = {}
+        # States are reused on every press of their key, together with their
+        # timer. Timer callbacks are bound once, binding methods allocates.
+        self._states = {}
+        self._tap_time_expired = self._on_tap_time
+        self._repeat_time_expired = self._on_repeat_time
 
         if _make_key:
             make_argumented_key(
@@ -68,21 +87,17 @@ class HoldTap(Module):
     def during_bootup(self, keyboard):
         return
 
-    def before_matrix_scan(self, keyboard):
-        return
-
-    def after_matrix_scan(self, keyboard):
-        return
-
     def process_key(self, keyboard, key, is_pressed, int_coord):
         '''Handle holdtap being interrupted by another key press/release.'''
         current_key = key
         send_buffer = False
         append_buffer = False
 
-        for key, state in self.key_states.items():
+        # Iterate over the dict itself, `items()` allocates.
+        for key in self.key_states:
             if key == current_key:
                 continue
+            state = self.key_states[key]
             if state.activated != ActivationType.PRESSED:
                 continue
 
@@ -96,7 +111,7 @@ class HoldTap(Module):
                 not is_pressed and key.tap_interrupted and self.key_buffer
             ):
 
-                keyboard.cancel_timeout(state.timeout_key)
+                state.timer.cancel()
                 self.key_states[key].activated = ActivationType.INTERRUPTED
                 self.ht_activate_on_interrupt(
                     key,
@@ -123,12 +138,6 @@ class HoldTap(Module):
 
         return current_key
 
-    def before_hid_send(self, keyboard):
-        return
-
-    def after_hid_send(self, keyboard):
-        return
-
     def on_powersave_enable(self, keyboard):
         return
 
@@ -139,7 +148,7 @@ class HoldTap(Module):
         '''Unless in repeat mode, do nothing yet, action resolves when key is released, timer expires or other key is pressed.'''
         if key in self.key_states:
             state = self.key_states[key]
-            keyboard.cancel_timeout(self.key_states[key].timeout_key)
+            state.timer.cancel()
 
             if state.activated == ActivationType.RELEASED:
                 state.activated = ActivationType.REPEAT
@@ -154,11 +163,17 @@ class HoldTap(Module):
             tap_time = self.tap_time
         else:
             tap_time = key.tap_time
-        timeout_key = keyboard.set_timeout(
-            tap_time,
-            lambda: self.on_tap_time_expired(key, keyboard, *args, **kwargs),
-        )
-        self.key_states[key] = HoldTapKeyState(timeout_key, *args, **kwargs)
+
+        try:
+            state = self._states[key]
+        except KeyError:
+            state = self._states[key] = HoldTapKeyState(key, self._tap_time_expired)
+        state.keyboard = keyboard
+        state.args = args
+        state.kwargs = kwargs
+        state.activated = ActivationType.PRESSED
+        state.timer.start(tap_time, self._tap_time_expired)
+        self.key_states[key] = state
         return keyboard
 
     def ht_released(self, key, keyboard, *args, **kwargs):
@@ -167,7 +182,7 @@ class HoldTap(Module):
             return keyboard
 
         state = self.key_states[key]
-        keyboard.cancel_timeout(state.timeout_key)
+        state.timer.cancel()
         repeat = key.repeat & HoldTapRepeat.TAP
 
         if state.activated == ActivationType.HOLD_TIMEOUT:
@@ -196,14 +211,18 @@ class HoldTap(Module):
                 tap_time = self.tap_time
             else:
                 tap_time = key.tap_time
-            state.timeout_key = keyboard.set_timeout(
-                tap_time, lambda: self.key_states.pop(key)
-            )
+            state.timer.start(tap_time, self._repeat_time_expired)
         else:
             del self.key_states[key]
 
         return keyboard
 
+    def _on_tap_time(self, state):
+        self.on_tap_time_expired(state.key, state.keyboard, *state.args, **state.kwargs)
+
+    def _on_repeat_time(self, state):
+        del self.key_states[state.key]
+
     def on_tap_time_expired(self, key, keyboard, *args, **kwargs):
         '''When tap time expires activate hold if key is still being pressed.
         Remove key if ActivationType is RELEASED.'''
@@ -21,16 +21,21 @@ def tt_key(layer, prefer_hold=True, **kwargs):
 
 
 class LayerKey(Key):
+    interned = True
+    key = None
+
     def __init__(self, layer, key=None, **kwargs):
         super().__init__(**kwargs)
         self.layer = layer
-        self.key = key
+        if key is not None:
+            self.key = key
 
 
 class Layers(HoldTap):
     '''Gives access to the keys used to enable the layer system'''
 
     _active_combo = None
+    _combo_layers = None
 
     def __init__(self, combo_layers=None):
         # Layers
@@ -81,6 +86,24 @@ class Layers(HoldTap):
             on_release=self.ht_released,
         )
 
+    @property
+    def combo_layers(self):
+        return self._combo_layers
+
+    @combo_layers.setter
+    def combo_layers(self, combo_layers):
+        # Combos as bitmasks of their layers, in order of precedence, and the
+        # first matching combo, if any, for every mask of active layers seen.
+        self._combo_layers = combo_layers
+        self._combos = []
+        self._combo_cache = {}
+        if combo_layers:
+            for combo, result in combo_layers.items():
+                mask = 0
+                for layer in combo:
+                    mask |= 1 << layer
+                self._combos.append((mask, result))
+
     def _fd_pressed(self, key, keyboard, *args, **kwargs):
         '''
         Switches the top layer
@@ -146,7 +169,7 @@ class Layers(HoldTap):
         else:
             keyboard.active_layers[idx] = layer
 
-        if self.combo_layers:
+        if self._combos:
             self._activate_combo_layer(keyboard)
 
         self._print_debug(keyboard)
@@ -166,7 +189,7 @@ class Layers(HoldTap):
                 if debug.enabled:
                     debug(f'_mo_released: layer {layer} not active')
 
-            if self.combo_layers:
+            if self._combos:
                 self._deactivate_combo_layer(keyboard, layer)
 
         self._print_debug(keyboard)
@@ -175,19 +198,22 @@ class Layers(HoldTap):
         if self._active_combo:
             return
 
-        for combo, result in self.combo_layers.items():
-            matching = True
-            for layer in combo:
-                if layer not in keyboard.active_layers:
-                    matching = False
+        active = keyboard.active_layers_mask
+        try:
+            combo = self._combo_cache[active]
+        except KeyError:
+            combo = None
+            for mask, result in self._combos:
+                if mask & active == mask:
+                    combo = (mask, result)
                     break
+            self._combo_cache[active] = combo
 
-            if matching:
-                self._active_combo = combo
-                keyboard.active_layers.insert(0, result)
-                break
+        if combo:
+            self._active_combo = combo
+            keyboard.active_layers.insert(0, combo[1])
 
     def _deactivate_combo_layer(self, keyboard, layer):
-        if self._active_combo and layer in self._active_combo:
-            keyboard.active_layers.remove(self.combo_layers[self._active_combo])
+        if self._active_combo and self._active_combo[0] & (1 << layer):
+            keyboard.active_layers.remove(self._active_combo[1])
             self._active_combo = None
@@ -15,6 +15,10 @@ _ON_RELEASE = const(4)
 
 
 class MacroKey(Key):
+    on_hold_macro = None
+    on_release_macro = None
+    blocking = True
+
     def __init__(
         self,
         *args,
@@ -31,14 +35,19 @@ class MacroKey(Key):
             self.on_press_macro = on_press
         else:
             self.on_press_macro = args
-        self.on_hold_macro = on_hold
-        self.on_release_macro = on_release
-        self.blocking = blocking
+        if on_hold is not None:
+            self.on_hold_macro = on_hold
+        if on_release is not None:
+            self.on_release_macro = on_release
+        if not blocking:
+            self.blocking = blocking
         self.state = _IDLE
         self._task = None
 
 
 class UnicodeModeKey(Key):
+    interned = True
+
     def __init__(self, mode, **kwargs):
         super().__init__(**kwargs)
         self.mode = mode
@@ -193,12 +202,6 @@ class Macros(Module):
     def during_bootup(self, keyboard):
         return
 
-    def before_matrix_scan(self, keyboard):
-        return
-
-    def after_matrix_scan(self, keyboard):
-        return
-
     def process_key(self, keyboard, key, is_pressed, int_coord):
         # Passthrough if there are no active macros, or the key belongs to an
         # active macro, or all active macros or non-blocking.
@@ -207,12 +210,6 @@ class Macros(Module):
 
         self.key_buffer.append((int_coord, key, is_pressed))
 
-    def before_hid_send(self, keyboard):
-        return
-
-    def after_hid_send(self, keyboard):
-        return
-
     def on_powersave_enable(self, keyboard):
         return
 
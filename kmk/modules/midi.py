@@ -16,10 +16,11 @@ debug = Debug(__name__)
 
 
 class MidiKey(Key):
+    on_release_msg = None
+
     def __init__(self, *args, command, channel=None, **kwargs):
         super().__init__(**kwargs)
         self.on_press_msg = command(*args, channel=channel)
-        self.on_release_msg = None
 
 
 def midi_note_key(note=69, velocity=127, channel=None, **kwargs):
@@ -82,21 +83,9 @@ class MidiKeys(Module):
     def during_bootup(self, keyboard):
         return None
 
-    def before_matrix_scan(self, keyboard):
-        return None
-
-    def after_matrix_scan(self, keyboard):
-        return None
-
     def process_key(self, keyboard, key, is_pressed, int_coord):
         return key
 
-    def before_hid_send(self, keyboard):
-        return None
-
-    def after_hid_send(self, keyboard):
-        return None
-
     def on_powersave_enable(self, keyboard):
         return None
 
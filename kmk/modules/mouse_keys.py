@@ -48,21 +48,10 @@ class MouseKeys(Module):
         self._task = create_task(
             lambda: self._move(keyboard),
             period_ms=self.acc_interval,
+            owner=self,
         )
         cancel_task(self._task)
 
-    def before_matrix_scan(self, keyboard):
-        return
-
-    def after_matrix_scan(self, keyboard):
-        return
-
-    def before_hid_send(self, keyboard):
-        return
-
-    def after_hid_send(self, keyboard):
-        return
-
     def on_powersave_enable(self, keyboard):
         return
 
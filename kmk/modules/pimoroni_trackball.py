@@ -65,6 +65,8 @@ class ScrollDirection:
 
 
 class TrackballHandlerKey(Key):
+    interned = True
+
     def __init__(self, handler=TrackballMode.MOUSE_MODE, **kwargs):
         super().__init__(**kwargs)
         self.handler = handler
@@ -205,15 +207,6 @@ class Trackball(Module):
 
         self.current_handler.handle(keyboard, self, x, y, switch, state)
 
-    def after_matrix_scan(self, keyboard):
-        return
-
-    def before_hid_send(self, keyboard):
-        return
-
-    def after_hid_send(self, keyboard):
-        return
-
     def on_powersave_enable(self, keyboard):
         return
 
@@ -75,18 +75,6 @@ class PotentiometerHandler(Module):
 
         return keyboard
 
-    def after_matrix_scan(self, keyboard):
-        '''
-        Return value will be replace matrix update if supplied
-        '''
-        return
-
-    def before_hid_send(self, keyboard):
-        return
-
-    def after_hid_send(self, keyboard):
-        return
-
     def on_powersave_enable(self, keyboard):
         return
 
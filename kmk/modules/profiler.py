@@ -0,0 +1,143 @@
+from time import monotonic_ns
+
+from kmk import scheduler
+from kmk.extensions import Extension
+from kmk.keys import make_key
+from kmk.kmk_keyboard import find_hooks
+from kmk.modules import Module
+from kmk.utils import Debug
+
+debug = Debug(__name__)
+
+# Phases of the main loop, in order of execution.
+PHASES = (
+    '_main_loop',
+    'before_matrix_scan',
+    '_process_resume_buffer',
+    'after_matrix_scan',
+    '_process_matrix_updates',
+    'before_hid_send',
+    '_send_hid',
+    '_process_timeouts',
+    'after_hid_send',
+)
+
+HOOKS = (
+    'before_matrix_scan',
+    'after_matrix_scan',
+    'before_hid_send',
+    'after_hid_send',
+)
+
+
+class Histogram:
+    '''
+    Latency histogram with fixed, logarithmic buckets: bucket `i` counts
+    durations of less than 2**i us, the last bucket counts everything else.
+    '''
+
+    def __init__(self, buckets):
+        self.counts = [0] * buckets
+        self.reset()
+
+    def reset(self):
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.n = 0
+        self.total_us = 0
+        self.max_us = 0
+
+    def add(self, us):
+        self.n += 1
+        self.total_us += us
+        if us > self.max_us:
+            self.max_us = us
+
+        i = 0
+        last = len(self.counts) - 1
+        while us and i < last:
+            us >>= 1
+            i += 1
+        self.counts[i] += 1
+
+    def __repr__(self):
+        mean = self.total_us // self.n if self.n else 0
+        return f'n={self.n} mean={mean}us max={self.max_us}us {self.counts}'
+
+
+class Profiler(Module):
+    '''
+    Measure the time spent in each phase of the main loop, and in each of the
+    per-cycle hooks of modules and extensions. Optionally enable the stats of
+    the scheduler, and include them.
+    '''
+
+    def __init__(self, buckets=12, scheduler_stats=False):
+        self.buckets = buckets
+        self.histograms = {}
+        self.scheduler_stats = scheduler_stats
+
+        make_key(names=('PROF_DUMP',), on_press=self._dump)
+        make_key(names=('PROF_RESET',), on_press=self._reset)
+
+    def during_bootup(self, keyboard):
+        if self.scheduler_stats:
+            scheduler.enable_stats(self.buckets)
+
+        # Hooks of modules and extensions, order of wrapping doesn't matter.
+        for hook in HOOKS:
+            for obj in find_hooks(keyboard.modules, Module, hook):
+                self._wrap(obj, hook, f'{obj.__class__.__name__}.{hook}', True)
+            for obj in find_hooks(keyboard.extensions, Extension, hook):
+                self._wrap(obj, hook, f'{obj.__class__.__name__}.{hook}', True)
+
+        for matrix in keyboard.matrix:
+            self._wrap(matrix, 'scan_for_changes', f'{matrix.__class__.__name__}.scan')
+
+        for phase in PHASES:
+            self._wrap(keyboard, phase, phase)
+
+    def _wrap(self, obj, attr, name, hook=False):
+        '''
+        Replace the bound method `attr` of `obj` with a timed version. Hooks
+        take exactly one argument, phases none; fixed signatures avoid packing
+        arguments into tuples on every call.
+        '''
+        func = getattr(obj, attr)
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram(self.buckets)
+
+        if hook:
+
+            def timed(arg):
+                start = monotonic_ns()
+                ret = func(arg)
+                histogram.add((monotonic_ns() - start) // 1000)
+                return ret
+
+        else:
+
+            def timed():
+                start = monotonic_ns()
+                ret = func()
+                histogram.add((monotonic_ns() - start) // 1000)
+                return ret
+
+        setattr(obj, attr, timed)
+
+    def dump(self):
+        for name, histogram in self.histograms.items():
+            debug(name, ': ', histogram)
+        scheduler.dump_stats()
+
+    def reset(self):
+        for histogram in self.histograms.values():
+            histogram.reset()
+        scheduler.reset_stats()
+
+    def _dump(self, key, keyboard, *args, **kwargs):
+        self.dump()
+
+    def _reset(self, key, keyboard, *args, **kwargs):
+        self.reset()
@@ -4,6 +4,7 @@ from random import randint
 
 from kmk.keys import Key, make_argumented_key
 from kmk.modules import Module
+from kmk.scheduler import Timer
 from kmk.utils import Debug
 
 debug = Debug(__name__)
@@ -14,25 +15,37 @@ _ACTIVE = const(2)
 
 
 class RapidFireKey(Key):
+    interval = 100
+    timeout = 200
+    enable_interval_randomization = False
+    randomization_magnitude = 15
+    toggle = False
+
     def __init__(
         self,
         key,
-        interval=100,
-        timeout=200,
+        interval=None,
+        timeout=None,
         enable_interval_randomization=False,
-        randomization_magnitude=15,
+        randomization_magnitude=None,
         toggle=False,
         **kwargs,
     ):
         super().__init__(**kwargs)
         self.key = key
-        self.interval = interval
-        self.timeout = timeout
-        self.enable_interval_randomization = enable_interval_randomization
-        self.randomization_magnitude = randomization_magnitude
-        self.toggle = toggle
+        if interval is not None:
+            self.interval = interval
+        if timeout is not None:
+            self.timeout = timeout
+        if enable_interval_randomization:
+            self.enable_interval_randomization = enable_interval_randomization
+        if randomization_magnitude is not None:
+            self.randomization_magnitude = randomization_magnitude
+        if toggle:
+            self.toggle = toggle
         self._state = _INACTIVE
         self._timeout = None
+        self._release = None
 
 
 class RapidFire(Module):
@@ -48,22 +61,18 @@ class RapidFire(Module):
         if key._state == _HOLD:
             key._state = _ACTIVE
             keyboard.remove_key(key.key)
-            key._timeout = keyboard.set_timeout(
-                1, lambda: self._on_timer_timeout(key, keyboard)
-            )
+            key._timeout.start(1)
             return
 
         keyboard.add_key(key.key)
-        keyboard.set_timeout(1, lambda: keyboard.remove_key(key.key))
+        key._release.start(1)
 
         interval = key.interval
         if key.enable_interval_randomization:
             interval += randint(
                 -key.randomization_magnitude, key.randomization_magnitude
             )
-        key._timeout = keyboard.set_timeout(
-            interval, lambda: self._on_timer_timeout(key, keyboard)
-        )
+        key._timeout.start(interval)
 
         if debug.enabled:
             debug(key.key, ' @', interval, 'ms')
@@ -75,9 +84,10 @@ class RapidFire(Module):
 
         keyboard.add_key(key.key)
         key._state = _HOLD
-        key._timeout = keyboard.set_timeout(
-            key.timeout, lambda: self._on_timer_timeout(key, keyboard)
-        )
+        if key._timeout is None:
+            key._timeout = Timer(self._timer_expired, key)
+            key._release = Timer(self._release_expired, key)
+        key._timeout.start(key.timeout)
 
     def _rf_released(self, key, keyboard, *args, **kwargs):
         if key._state == _ACTIVE:
@@ -92,27 +102,16 @@ class RapidFire(Module):
         self._deactivate_key(key, keyboard)
 
     def _deactivate_key(self, key, keyboard):
-        keyboard.cancel_timeout(key._timeout)
+        key._timeout.cancel()
         key._state = _INACTIVE
-        key._timeout = None
 
     def during_bootup(self, keyboard):
-        return
-
-    def before_matrix_scan(self, keyboard):
-        return
-
-    def before_hid_send(self, keyboard):
-        return
-
-    def after_hid_send(self, keyboard):
-        return
+        # Timer callbacks, created once: closures allocate.
+        self._timer_expired = lambda key: self._on_timer_timeout(key, keyboard)
+        self._release_expired = lambda key: keyboard.remove_key(key.key)
 
     def on_powersave_enable(self, keyboard):
         return
 
     def on_powersave_disable(self, keyboard):
         return
-
-    def after_matrix_scan(self, keyboard):
-        return
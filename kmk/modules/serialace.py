@@ -15,12 +15,6 @@ class SerialACE(Module):
         except AttributeError:
             pass
 
-    def before_matrix_scan(self, keyboard):
-        pass
-
-    def after_matrix_scan(self, keyboard):
-        pass
-
     def process_key(self, keyboard, key, is_pressed, int_coord):
         return key
 
@@ -53,9 +47,6 @@ class SerialACE(Module):
             if debug.enabled:
                 debug(f'error: {err}')
 
-    def after_hid_send(self, keyboard):
-        pass
-
     def on_powersave_enable(self, keyboard):
         pass
 
@@ -204,9 +204,6 @@ class Split(Module):
 
         return
 
-    def after_hid_send(self, keyboard):
-        return
-
     def on_powersave_enable(self, keyboard):
         if self.split_type == SplitType.BLE:
             if self._uart_connection and not self._psave_enable:
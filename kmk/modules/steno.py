@@ -85,21 +85,9 @@ class Steno(Module):
     def during_bootup(self, keyboard):
         pass
 
-    def before_matrix_scan(self, keyboard):
-        pass
-
-    def after_matrix_scan(self, keyboard):
-        pass
-
     def process_key(self, keyboard, key, is_pressed, int_coord):
         return key
 
-    def before_hid_send(self, keyboard):
-        pass
-
-    def after_hid_send(self, keyboard):
-        pass
-
     def on_powersave_enable(self, keyboard):
         pass
 
@@ -2,6 +2,7 @@ from micropython import const
 
 from kmk.keys import Key, make_argumented_key
 from kmk.modules import Module
+from kmk.scheduler import Timer
 from kmk.utils import Debug
 
 debug = Debug(__name__)
@@ -15,13 +16,18 @@ _SK_STICKY = const(4)
 
 
 class StickyKey(Key):
+    defer_release = False
+    retap_cancel = True
+
     def __init__(self, key, defer_release=False, retap_cancel=True, **kwargs):
         super().__init__(**kwargs)
         self.key = key
-        self.defer_release = defer_release
+        if defer_release:
+            self.defer_release = defer_release
+        if not retap_cancel:
+            self.retap_cancel = retap_cancel
         self.timeout = None
         self.state = _SK_IDLE
-        self.retap_cancel = retap_cancel
 
 
 class StickyKeys(Module):
@@ -37,19 +43,8 @@ class StickyKeys(Module):
         )
 
     def during_bootup(self, keyboard):
-        return
-
-    def before_matrix_scan(self, keyboard):
-        return
-
-    def after_matrix_scan(self, keyboard):
-        return
-
-    def before_hid_send(self, keyboard):
-        return
-
-    def after_hid_send(self, keyboard):
-        return
+        # Timer callback, created once: closures allocate.
+        self._timeout_expired = lambda key: self.on_release_after(keyboard, key)
 
     def on_powersave_enable(self, keyboard):
         return
@@ -95,15 +90,14 @@ class StickyKeys(Module):
             return current_key
 
     def set_timeout(self, keyboard, key):
-        key.timeout = keyboard.set_timeout(
-            self.release_after,
-            lambda: self.on_release_after(keyboard, key),
-        )
+        if key.timeout is None:
+            key.timeout = Timer(self._timeout_expired, key)
+        key.timeout.start(self.release_after)
 
     def on_press(self, key, keyboard, *args, **kwargs):
         # Let sticky keys stack while renewing timeouts.
         for sk in self.active_keys:
-            keyboard.cancel_timeout(sk.timeout)
+            sk.timeout.cancel()
 
         # If active sticky key is tapped again, cancel.
         if key.retap_cancel and (key.state == _SK_RELEASED or key.state == _SK_STICKY):
@@ -124,14 +118,13 @@ class StickyKeys(Module):
             key.state = _SK_RELEASED
         # Key in HOLD state is handled like a regular release.
         elif key.state == _SK_HOLD:
-            keyboard.cancel_timeout(key.timeout)
+            key.timeout.cancel()
             self.deactivate(keyboard, key)
 
     def on_release_after(self, keyboard, key):
         # Key is still pressed but nothing else happend: set to HOLD.
         if key.state == _SK_PRESSED:
             key.state = _SK_HOLD
-            keyboard.cancel_timeout(key.timeout)
         # Key got released but nothing else happend: deactivate.
         elif key.state == _SK_RELEASED:
             self.deactivate(keyboard, key)
@@ -105,6 +105,8 @@ class StringSubstitution(Module):
         self,
         dictionary: dict,
     ):
+        self._rules = []
+        self._active_modifiers = []
         for key, value in dictionary.items():
             self._rules.append(Rule(Phrase(key), Phrase(value)))
 
@@ -171,9 +173,6 @@ class StringSubstitution(Module):
     def during_bootup(self, keyboard):
         return
 
-    def before_matrix_scan(self, keyboard):
-        return
-
     def before_hid_send(self, keyboard):
 
         if self._state == State.LISTENING:
@@ -216,14 +215,8 @@ class StringSubstitution(Module):
                 for rule in self._rules:
                     rule.restart()
 
-    def after_hid_send(self, keyboard):
-        return
-
     def on_powersave_enable(self, keyboard):
         return
 
     def on_powersave_disable(self, keyboard):
         return
-
-    def after_matrix_scan(self, keyboard):
-        return
@@ -3,6 +3,8 @@ from kmk.modules.holdtap import ActivationType, HoldTap, HoldTapKey
 
 
 class TapDanceKey(Key):
+    tap_time = None
+
     def __init__(self, *keys, tap_time=None, **kwargs):
         '''
         Any key in the tapdance sequence that is not already a holdtap
@@ -10,22 +12,23 @@ class TapDanceKey(Key):
         attributes.
         '''
         super().__init__(**kwargs)
-        self.tap_time = tap_time
-        self.keys = []
-
-        for key in keys:
-            if not isinstance(key, HoldTapKey):
-                ht_key = HoldTapKey(
+        if tap_time is not None:
+            self.tap_time = tap_time
+
+        self.keys = tuple(
+            (
+                key
+                if isinstance(key, HoldTapKey)
+                else HoldTapKey(
                     tap=key,
                     hold=key,
                     prefer_hold=True,
                     tap_interrupted=False,
-                    tap_time=self.tap_time,
+                    tap_time=tap_time,
                 )
-                self.keys.append(ht_key)
-            else:
-                self.keys.append(key)
-        self.keys = tuple(self.keys)
+            )
+            for key in keys
+        )
 
 
 class TapDance(HoldTap):
@@ -47,7 +50,7 @@ class TapDance(HoldTap):
 
         for _key, state in self.key_states.copy().items():
             if state.activated == ActivationType.RELEASED:
-                keyboard.cancel_timeout(state.timeout_key)
+                state.timer.cancel()
                 self.ht_activate_tap(_key, keyboard)
                 self.send_key_buffer(keyboard)
                 self.ht_deactivate_tap(_key, keyboard)
@@ -66,7 +69,7 @@ class TapDance(HoldTap):
         if key in self.td_counts:
             count = self.td_counts[key]
             kc = key.keys[count]
-            keyboard.cancel_timeout(self.key_states[kc].timeout_key)
+            self.key_states[kc].timer.cancel()
 
             count += 1
 
@@ -88,8 +91,8 @@ class TapDance(HoldTap):
         self.ht_pressed(current_key, keyboard, *args, **kwargs)
         self.td_counts[key] = count
 
-        # Add the active tap dance to key_states; `on_tap_time_expired` needs
-        # the back-reference.
+        # Store the active tap dance in its key state; `on_tap_time_expired`
+        # needs the back-reference.
         self.key_states[current_key].tap_dance = key
 
     def td_released(self, key, keyboard, *args, **kwargs):
@@ -1,3 +1,6 @@
+from keypad import Event as KeyEvent
+
+
 class DiodeOrientation:
     '''
     Orientation of diodes on handwired boards. You can think of:
@@ -20,6 +23,7 @@ class Scanner:
 
     # for split keyboards, the offset value will be assigned in Split module
     offset = 0
+    _events = None
 
     @property
     def coord_mapping(self):
@@ -29,6 +33,31 @@ class Scanner:
     def key_count(self):
         raise NotImplementedError
 
+    @property
+    def events_pending(self):
+        '''
+        Return True if key events are waiting to be scanned. Scanners that
+        can't tell without scanning, i.e. that don't scan in the background,
+        always return False.
+        '''
+        return False
+
+    def key_event(self, key_number, pressed):
+        '''
+        Return the event for `key_number` and `pressed`. Events are immutable,
+        so instead of allocating one on every scan, they're created once per
+        key and state, and reused afterwards.
+        '''
+        pressed = bool(pressed)
+        idx = 2 * (key_number - self.offset) + pressed
+        events = self._events
+        if events is None:
+            events = self._events = [None] * (2 * self.key_count)
+        event = events[idx]
+        if event is None or event.key_number != key_number:
+            event = events[idx] = KeyEvent(key_number, pressed)
+        return event
+
     def scan_for_changes(self):
         '''
         Scan for key events and return a key report if an event exists.
@@ -1,7 +1,5 @@
 import digitalio
 
-from keypad import Event as KeyEvent
-
 from kmk.scanners import DiodeOrientation, Scanner
 
 
@@ -24,6 +22,7 @@ class MatrixScanner(Scanner):
         pull=digitalio.Pull.UP,
         rollover_cols_every_rows=None,
         offset=0,
+        full_scan=False,
     ):
         self.len_cols = len(cols)
         self.len_rows = len(rows)
@@ -69,6 +68,8 @@ class MatrixScanner(Scanner):
         for pin in self.inputs:
             pin.switch_to_input(pull=self.pull)
 
+        self._pull_up = self.pull is digitalio.Pull.UP
+
         self.rollover_cols_every_rows = rollover_cols_every_rows
         if self.rollover_cols_every_rows is None:
             self.rollover_cols_every_rows = self.len_rows
@@ -77,10 +78,37 @@ class MatrixScanner(Scanner):
         initial_state_value = b'\x01' if self.pull is digitalio.Pull.UP else b'\x00'
         self.state = bytearray(initial_state_value) * self.key_count
 
+        # Full scans queue every change they find. Each key changes at most
+        # once per scan, and the matrix isn't scanned again until the queue
+        # is empty: room for one event per key is enough.
+        self.full_scan = full_scan
+        if full_scan:
+            self._queue = [0] * self.key_count
+            self._queue_head = 0
+            self._queue_len = 0
+
     @property
     def key_count(self):
         return self._key_count
 
+    @property
+    def events_pending(self):
+        return self.full_scan and self._queue_len > 0
+
+    def _key_number(self, oidx, iidx):
+        if self.translate_coords:
+            new_oidx = oidx + self.len_cols * (iidx // self.rollover_cols_every_rows)
+            new_iidx = iidx - self.rollover_cols_every_rows * (
+                iidx // self.rollover_cols_every_rows
+            )
+
+            row = new_iidx
+            col = new_oidx
+        else:
+            row = oidx
+            col = iidx
+        return self.len_cols * row + col + self.offset
+
     def scan_for_changes(self):
         '''
         Poll the matrix for changes and return either None (if nothing updated)
@@ -88,13 +116,25 @@ class MatrixScanner(Scanner):
         array itself for some crazy reason) consisting of (row, col, pressed)
         which are (int, int, bool)
         '''
+        if self.full_scan:
+            if not self._queue_len:
+                self._scan_full()
+            return self._pop_event()
+
         ba_idx = 0
         any_changed = False
-
-        for oidx, opin in enumerate(self.outputs):
-            opin.value = self.pull is not digitalio.Pull.UP
-
-            for iidx, ipin in enumerate(self.inputs):
+        pull_up = self._pull_up
+        outputs = self.outputs
+        inputs = self.inputs
+
+        # Index based loops: `enumerate` allocates an iterator and a tuple for
+        # every item.
+        for oidx in range(len(outputs)):
+            opin = outputs[oidx]
+            opin.value = not pull_up
+
+            for iidx in range(len(inputs)):
+                ipin = inputs[iidx]
                 # cast to int to avoid
                 #
                 # >>> xyz = bytearray(3)
@@ -110,21 +150,9 @@ class MatrixScanner(Scanner):
                 old_val = self.state[ba_idx]
 
                 if old_val != new_val:
-                    if self.translate_coords:
-                        new_oidx = oidx + self.len_cols * (
-                            iidx // self.rollover_cols_every_rows
-                        )
-                        new_iidx = iidx - self.rollover_cols_every_rows * (
-                            iidx // self.rollover_cols_every_rows
-                        )
-
-                        row = new_iidx
-                        col = new_oidx
-                    else:
-                        row = oidx
-                        col = iidx
+                    key_number = self._key_number(oidx, iidx)
 
-                    if self.pull is digitalio.Pull.UP:
+                    if pull_up:
                         pressed = not new_val
                     else:
                         pressed = new_val
@@ -135,10 +163,48 @@ class MatrixScanner(Scanner):
 
                 ba_idx += 1
 
-            opin.value = self.pull is digitalio.Pull.UP
+            opin.value = pull_up
             if any_changed:
                 break
 
         if any_changed:
-            key_number = self.len_cols * row + col + self.offset
-            return KeyEvent(key_number, pressed)
+            return self.key_event(key_number, pressed)
+
+    def _scan_full(self):
+        '''
+        Scan the whole matrix and queue every change, in scan order. All keys
+        are sampled within the same pass, no matter where in the matrix they
+        are or how many changed at once.
+        '''
+        ba_idx = 0
+        pull_up = self._pull_up
+        outputs = self.outputs
+        inputs = self.inputs
+        state = self.state
+        queue = self._queue
+        size = len(queue)
+
+        for oidx in range(len(outputs)):
+            opin = outputs[oidx]
+            opin.value = not pull_up
+
+            for iidx in range(len(inputs)):
+                new_val = int(inputs[iidx].value)
+                if state[ba_idx] != new_val:
+                    state[ba_idx] = new_val
+                    pressed = not new_val if pull_up else new_val
+                    # Key number and state, packed into one small int.
+                    tail = (self._queue_head + self._queue_len) % size
+                    queue[tail] = 2 * self._key_number(oidx, iidx) + pressed
+                    self._queue_len += 1
+                ba_idx += 1
+
+            opin.value = pull_up
+
+    def _pop_event(self):
+        if not self._queue_len:
+            return None
+        event = self._queue[self._queue_head]
+        self._queue_head = (self._queue_head + 1) % len(self._queue)
+        self._queue_len -= 1
+        return self.key_event(event >> 1, bool(event & 1))
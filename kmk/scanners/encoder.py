@@ -1,4 +1,3 @@
-import keypad
 import rotaryio
 
 from kmk.scanners import Scanner
@@ -40,4 +39,4 @@ class RotaryioEncoder(Scanner):
         else:
             self._pressed = True
 
-        return keypad.Event(key_number, self._pressed)
+        return self.key_event(key_number, self._pressed)
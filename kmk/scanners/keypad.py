@@ -11,20 +11,27 @@ class KeypadScanner(Scanner):
     :param kp: An instance of the keypad class.
     '''
 
+    def __init__(self):
+        # Scratch event, filled in place instead of allocating a new one.
+        self._event = keypad.Event()
+
     @property
     def key_count(self):
         return self.keypad.key_count
 
+    @property
+    def events_pending(self):
+        return bool(self.keypad.events)
+
     def scan_for_changes(self):
         '''
         Scan for key events and return a key report if an event exists.
 
         The key report is a byte array with contents [row, col, True if pressed else False]
         '''
-        ev = self.keypad.events.get()
-        if ev and self.offset:
-            return keypad.Event(ev.key_number + self.offset, ev.pressed)
-        return ev
+        ev = self._event
+        if self.keypad.events.get_into(ev):
+            return self.key_event(ev.key_number + self.offset, ev.pressed)
 
 
 class MatrixScanner(KeypadScanner):
@@ -3,13 +3,20 @@ Here we're abusing _asyncios TaskQueue to implement a very simple priority
 queue task scheduler.
 Despite documentation, Circuitpython doesn't usually ship with a min-heap
 module; it does however implement a pairing-heap for `TaskQueue` in native code.
+Alternatively, tasks can be scheduled on a hashed timer wheel, see
+`use_timer_wheel`. `enable_stats` adds instrumentation.
+
+Tasks are either critical, like key timeouts, or background tasks, like
+animations. Due critical tasks always run first. Background tasks only run
+within a time budget per cycle, the rest is deferred to the next cycle.
 '''
 
 try:
-    from typing import Callable
+    from typing import Callable, Optional
 except ImportError:
     pass
 
+from micropython import const
 from supervisor import ticks_ms
 
 from _asyncio import Task, TaskQueue
@@ -18,20 +25,118 @@ from kmk.kmktime import ticks_add, ticks_diff
 
 _task_queue = TaskQueue()
 
+# Default of `Timer.start`, to tell "keep the argument" from `None`.
+_KEEP = object()
+
+
+def _ph_key(t: Task) -> int:
+    return t.ph_key
+
+
+def _data_key(t: Task) -> int:
+    return t.data
+
+
+# The deadline of a task, depends on the queue.
+_deadline = _ph_key
+
+# `SchedulerStats`, which wraps the queue, if enabled.
+_stats = None
+
+# Scheduled tasks of background priority, and those that are due but not run
+# yet, from `_deferred_head` on. Cancelled ones are replaced by `None`.
+_background = set()
+_deferred = []
+_deferred_head = 0
+
+# Time per cycle for background tasks, at least one of them runs anyway.
+background_budget_ms = 2
+
+
+class Priority:
+    CRITICAL = const(0)
+    BACKGROUND = const(1)
+
 
 class PeriodicTaskMeta:
-    def __init__(self, func: Callable[[None], None], period: int) -> None:
+    def __init__(
+        self,
+        func: Callable[[None], None],
+        period: int,
+        owner: object = None,
+        priority: int = Priority.CRITICAL,
+    ) -> None:
         self._task = Task(self.call)
         self._coro = func
         self.period = period
+        self.owner = owner
+        self.priority = priority
 
     def call(self) -> None:
-        after_ms = ticks_add(self._task.ph_key, self.period)
-        _task_queue.push_sorted(self._task, after_ms)
-        self._coro()
+        deadline = _deadline(self._task)
+        self._push(ticks_add(deadline, self.period))
+        if _stats is None:
+            self._coro()
+        else:
+            _stats.run_periodic(self, ticks_diff(ticks_ms(), deadline))
 
     def restart(self) -> None:
-        _task_queue.push_sorted(self._task)
+        self._push(ticks_ms())
+
+    def _push(self, deadline: int) -> None:
+        if self.priority == Priority.BACKGROUND:
+            _background.add(self._task)
+        _task_queue.push_sorted(self._task, deadline)
+
+
+class Timer:
+    '''
+    A reusable timeout: allocated once, then started, restarted and cancelled
+    as often as needed without allocating.
+    `callback` is called with `arg` when the timer expires. Both can be
+    replaced on every start, e.g. to share a timer between several timeouts of
+    the same owner. Callbacks should be bound once and stored, binding a
+    method or creating a closure allocates.
+    '''
+
+    def __init__(
+        self,
+        callback: Optional[Callable[[object], None]] = None,
+        arg=None,
+    ) -> None:
+        self.callback = callback
+        self.arg = arg
+        self.active = False
+        self._task = Task(self._expire)
+
+    def start(
+        self,
+        after_ms: int,
+        callback: Optional[Callable[[object], None]] = None,
+        arg=_KEEP,
+    ) -> None:
+        '''
+        (Re)start the timer to expire in `after_ms`, optionally with a new
+        callback or argument, which may be `None`. A pending timeout is
+        cancelled.
+        '''
+        if self.active:
+            _task_queue.remove(self._task)
+        if callback is not None:
+            self.callback = callback
+        if arg is not _KEEP:
+            self.arg = arg
+        _task_queue.push_sorted(self._task, ticks_add(ticks_ms(), after_ms))
+        self.active = True
+
+    def cancel(self) -> None:
+        if self.active:
+            _task_queue.remove(self._task)
+            self.active = False
+
+    def _expire(self) -> None:
+        self.active = False
+        self.callback(self.arg)
 
 
 def create_task(
@@ -39,18 +144,32 @@ def create_task(
     *,
     after_ms: int = 0,
     period_ms: int = 0,
+    owner: object = None,
+    priority: int = Priority.CRITICAL,
 ) -> [Task, PeriodicTaskMeta]:
+    '''
+    Schedule `func` to run in `after_ms`, every `period_ms` if given; never if
+    `after_ms` is negative. `owner` names periodic tasks in the stats.
+    `priority` holds until the task ran or is cancelled, periodic tasks keep
+    it.
+    '''
     if isinstance(func, Task):
         t = r = func
     elif isinstance(func, PeriodicTaskMeta):
         r = func
+        r.priority = priority
         t = r._task
     elif period_ms:
-        r = PeriodicTaskMeta(func, period_ms)
+        r = PeriodicTaskMeta(func, period_ms, owner, priority)
         t = r._task
     else:
         t = r = Task(func)
 
+    if priority == Priority.BACKGROUND:
+        _background.add(t)
+    elif _background:
+        _background.discard(t)
+
     if after_ms > 0:
         _task_queue.push_sorted(t, ticks_add(ticks_ms(), after_ms))
     elif after_ms == 0:
@@ -59,17 +178,169 @@ def create_task(
     return r
 
 
-def get_due_task() -> [Callable, None]:
-    now = ticks_ms()
+def _pop_due(now: int) -> Optional[Task]:
+    '''
+    Return the next due critical task, set aside due background tasks in
+    `_deferred`.
+    '''
     while True:
         t = _task_queue.peek()
-        if not t or ticks_diff(t.ph_key, now) > 0:
-            break
+        if not t or ticks_diff(_deadline(t), now) > 0:
+            return None
         _task_queue.pop_head()
-        yield t.coro
+        if not _background or t not in _background:
+            return t
+        _deferred.append(t)
 
 
-def cancel_task(t: [Task, PeriodicTaskMeta]) -> None:
+def _pop_deferred() -> Optional[Task]:
+    global _deferred_head
+    while _deferred_head < len(_deferred):
+        t = _deferred[_deferred_head]
+        _deferred[_deferred_head] = None
+        _deferred_head += 1
+        if t is not None:
+            return t
+    return None
+
+
+def _requeue_deferred() -> None:
+    # Keep the original deadline and order: they're due right away in the
+    # next cycle.
+    global _deferred_head
+    while (t := _pop_deferred()) is not None:
+        _task_queue.push_sorted(t, _deadline(t))
+    _deferred.clear()
+    _deferred_head = 0
+
+
+def _run(t: Task) -> None:
+    if _stats is not None:
+        # Deferred tasks are late by the time they actually run.
+        _stats.add_lateness(t)
+    t.coro()
+
+
+def get_due_task() -> [Callable, None]:
+    '''
+    Yield a callable that runs all due tasks, i.e. `run_due_tasks`. Kept for
+    compatibility, use `run_due_tasks` instead.
+    '''
+    yield run_due_tasks
+
+
+def run_due_tasks() -> None:
+    '''
+    Run all tasks that are due: critical tasks first, then background tasks
+    within `background_budget_ms`.
+    '''
+    spent = 0
+    ran_background = False
+    while True:
+        now = ticks_ms()
+        while (t := _pop_due(now)) is not None:
+            _run(t)
+        # Critical tasks that got due in the meantime run before the next
+        # background task.
+        if ran_background and spent >= background_budget_ms:
+            break
+        t = _pop_deferred()
+        if t is None:
+            break
+        ran_background = True
+        # Periodic tasks put themselves back.
+        _background.discard(t)
+        start = ticks_ms()
+        _run(t)
+        spent += ticks_diff(ticks_ms(), start)
+    _requeue_deferred()
+
+
+def next_deadline() -> Optional[int]:
+    '''
+    Return the time in ms until the next task is due, or `None` if there are
+    no tasks.
+    '''
+    t = _task_queue.peek()
+    if not t:
+        return None
+    return max(0, ticks_diff(_deadline(t), ticks_ms()))
+
+
+def cancel_task(t: [Task, PeriodicTaskMeta, Timer]) -> None:
+    if isinstance(t, Timer):
+        t.cancel()
+        return
     if isinstance(t, PeriodicTaskMeta):
         t = t._task
+    if _background:
+        _background.discard(t)
+    if _deferred and t in _deferred:
+        _deferred[_deferred.index(t)] = None
+        return
     _task_queue.remove(t)
+
+
+def use_timer_wheel(slots: int = 256) -> None:
+    '''
+    Schedule tasks on a hashed timer wheel with `slots` milliseconds per turn
+    instead of the pairing heap. Pending tasks are moved over.
+    '''
+    from kmk.timer_wheel import TimerWheel
+
+    _use_queue(TimerWheel(slots), _data_key)
+
+
+def use_pairing_heap() -> None:
+    '''Schedule tasks on the pairing heap of `TaskQueue`, the default.'''
+    _use_queue(TaskQueue(), _ph_key)
+
+
+def _use_queue(queue, deadline: Callable[[Task], int]) -> None:
+    global _task_queue, _deadline
+    old = _task_queue if _stats is None else _stats.queue
+    while True:
+        t = old.peek()
+        if not t:
+            break
+        key = _deadline(t)
+        old.pop_head()
+        queue.push_sorted(t, key)
+    _deadline = deadline
+    if _stats is None:
+        _task_queue = queue
+    else:
+        _stats.queue = queue
+        _stats.deadline = deadline
+
+
+def enable_stats(buckets: int = 12) -> None:
+    '''
+    Record the lateness of tasks, the peak queue depth and the run time of
+    periodic tasks, see `dump_stats`. Tasks that are pending already aren't
+    counted towards the queue depth.
+    '''
+    global _task_queue, _stats
+    if _stats is not None:
+        return
+
+    from kmk.scheduler_stats import SchedulerStats
+
+    _stats = _task_queue = SchedulerStats(_task_queue, _deadline, buckets)
+
+
+def disable_stats() -> None:
+    global _task_queue, _stats
+    if _stats is not None:
+        _task_queue = _stats.queue
+        _stats = None
+
+
+def dump_stats() -> None:
+    if _stats is not None:
+        _stats.dump()
+
+
+def reset_stats() -> None:
+    if _stats is not None:
+        _stats.reset()
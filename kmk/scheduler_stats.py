@@ -0,0 +1,150 @@
+'''
+Instrumentation for `kmk.scheduler`, see `kmk.scheduler.enable_stats`.
+
+Records how late tasks run relative to their deadline, the peak number of
+pending tasks, and how often and how long periodic tasks run, per owner.
+'''
+
+from supervisor import ticks_ms
+
+from time import monotonic_ns
+
+from kmk.kmktime import ticks_diff
+from kmk.utils import Debug
+
+debug = Debug('kmk.scheduler')
+
+
+class Histogram:
+    '''
+    Histogram with fixed, logarithmic buckets: bucket `i` counts values of
+    less than 2**i, the last bucket counts everything else.
+    '''
+
+    def __init__(self, buckets):
+        self.counts = [0] * buckets
+        self.reset()
+
+    def reset(self):
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.n = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, value):
+        self.n += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+        i = 0
+        last = len(self.counts) - 1
+        while value and i < last:
+            value >>= 1
+            i += 1
+        self.counts[i] += 1
+
+    def format(self, unit):
+        mean = self.total // self.n if self.n else 0
+        return f'n={self.n} mean={mean}{unit} max={self.max}{unit} {self.counts}'
+
+
+class OwnerStats:
+    '''Runs of the periodic tasks of one owner.'''
+
+    def __init__(self, buckets):
+        self.lateness = Histogram(buckets)
+        self.duration = Histogram(buckets)
+
+
+def owner_name(owner):
+    if owner is None:
+        return '?'
+    if isinstance(owner, str):
+        return owner
+    return owner.__class__.__name__
+
+
+class SchedulerStats:
+    '''
+    Wraps the task queue of the scheduler, and keeps track of the tasks in
+    it on the side: `TaskQueue` can't tell how many tasks it holds.
+    '''
+
+    def __init__(self, queue, deadline, buckets=12):
+        self.queue = queue
+        self.deadline = deadline
+        self.buckets = buckets
+        self.pending = set()
+        self.peak_depth = 0
+        self.lateness = Histogram(buckets)
+        self.owners = {}
+
+    def peek(self):
+        return self.queue.peek()
+
+    def push_sorted(self, t, key=None):
+        if key is None:
+            self.queue.push_sorted(t)
+        else:
+            self.queue.push_sorted(t, key)
+        self._add(t)
+
+    def push_head(self, t):
+        self.queue.push_head(t)
+        self._add(t)
+
+    def pop_head(self):
+        t = self.queue.pop_head()
+        self.pending.discard(t)
+        return t
+
+    def remove(self, t):
+        self.queue.remove(t)
+        self.pending.discard(t)
+
+    def add_lateness(self, t):
+        '''Record the lateness of task `t`, which is about to run.'''
+        self.lateness.add(max(0, ticks_diff(ticks_ms(), self.deadline(t))))
+
+    def _add(self, t):
+        pending = self.pending
+        pending.add(t)
+        if len(pending) > self.peak_depth:
+            self.peak_depth = len(pending)
+
+    def run_periodic(self, task, lateness):
+        '''Run a `PeriodicTaskMeta` and account it to its owner.'''
+        name = owner_name(task.owner)
+        stats = self.owners.get(name)
+        if stats is None:
+            stats = self.owners[name] = OwnerStats(self.buckets)
+        stats.lateness.add(max(0, lateness))
+
+        start = monotonic_ns()
+        task._coro()
+        stats.duration.add((monotonic_ns() - start) // 1000)
+
+    def dump(self):
+        debug(
+            'depth=',
+            len(self.pending),
+            ' peak=',
+            self.peak_depth,
+            ' lateness: ',
+            self.lateness.format('ms'),
+        )
+        for name, stats in self.owners.items():
+            debug(
+                name,
+                ': lateness: ',
+                stats.lateness.format('ms'),
+                ' run: ',
+                stats.duration.format('us'),
+            )
+
+    def reset(self):
+        self.peak_depth = len(self.pending)
+        self.lateness.reset()
+        self.owners.clear()
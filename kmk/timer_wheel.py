@@ -0,0 +1,185 @@
+'''
+A hashed timer wheel, as alternative to the pairing heap of `TaskQueue` for
+`kmk.scheduler`; see `kmk.scheduler.use_timer_wheel`.
+
+Tasks are hashed into one slot per millisecond of their deadline, modulo the
+number of slots. Pushing and removing a task doesn't touch any other task.
+Every elapsed millisecond, the tasks of its slot that are due are moved to the
+list of due tasks as a whole, tasks due in a later turn of the wheel stay.
+Removed tasks are only marked as such and dropped from their slot lazily.
+'''
+
+try:
+    from typing import Optional
+except ImportError:
+    pass
+
+from supervisor import ticks_ms
+
+from _asyncio import Task
+
+from kmk.kmktime import ticks_add, ticks_diff
+
+
+class TimerWheel:
+    '''
+    Implements the part of the interface of `TaskQueue` used by the scheduler.
+    The deadline of a task is stored in its `data` attribute, `ph_key` is
+    read-only on CircuitPython.
+    '''
+
+    def __init__(self, slots: int = 256) -> None:
+        if slots & (slots - 1):
+            raise ValueError('slots must be a power of two')
+        self._mask = slots - 1
+        self._slots = [[] for _ in range(slots)]
+        # Pending tasks and their deadlines.
+        self._deadlines = {}
+        # Tasks that are due, in order, from `_due_head` on.
+        self._due = []
+        self._due_head = 0
+        # The last tick whose slot has been expired.
+        self._tick = ticks_ms()
+        # Cache for the earliest task that isn't due yet, if `_head_known`.
+        self._head = None
+        self._head_known = True
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def peek(self) -> Optional[Task]:
+        self._advance(ticks_ms())
+        due = self._due
+        while self._due_head < len(due):
+            t = due[self._due_head]
+            if self._is_due(t):
+                return t
+            self._due_head += 1
+        if self._due_head:
+            due.clear()
+            self._due_head = 0
+        if not self._head_known:
+            self._find_head()
+        return self._head
+
+    def push_sorted(self, t: Task, key: Optional[int] = None) -> None:
+        if key is None:
+            key = ticks_ms()
+        deadlines = self._deadlines
+        if t in deadlines:
+            self.remove(t)
+        deadlines[t] = key
+        t.data = key
+
+        if ticks_diff(key, self._tick) <= 0:
+            self._due.append(t)
+        else:
+            self._slots[key & self._mask].append(t)
+            if self._head_known and (
+                self._head is None or ticks_diff(key, deadlines[self._head]) < 0
+            ):
+                self._head = t
+
+    def push_head(self, t: Task) -> None:
+        self.push_sorted(t, ticks_ms())
+
+    def pop_head(self) -> Task:
+        t = self.peek()
+        head = self._due_head
+        if head < len(self._due) and self._due[head] is t:
+            self._due_head = head + 1
+        self.remove(t)
+        return t
+
+    def remove(self, t: Task) -> None:
+        deadlines = self._deadlines
+        if t in deadlines:
+            del deadlines[t]
+            if t is self._head:
+                self._head = None
+                self._head_known = not deadlines
+
+    def _is_due(self, t: Task) -> bool:
+        # Tasks may have been removed or pushed again since they were moved.
+        deadline = self._deadlines.get(t)
+        return deadline is not None and ticks_diff(deadline, self._tick) <= 0
+
+    def _advance(self, now: int) -> None:
+        if now == self._tick:
+            return
+        elapsed = ticks_diff(now, self._tick)
+        if elapsed <= 0:
+            return
+        mask = self._mask
+        deadlines = self._deadlines
+        due = self._due
+        # Every slot needs to be visited at most once. Visiting them in order
+        # doesn't expire tasks in order anymore though.
+        overrun = elapsed > mask + 1
+        if overrun:
+            self._tick = ticks_add(now, -mask - 1)
+            elapsed = mask + 1
+            start = len(due)
+        for _ in range(elapsed):
+            self._tick = ticks_add(self._tick, 1)
+            index = self._tick & mask
+            slot = self._slots[index]
+            if not slot:
+                continue
+            # Compact the slot in place, keeping tasks of later turns. Tasks
+            # that were removed or moved to another slot are dropped.
+            n = 0
+            for t in slot:
+                deadline = deadlines.get(t)
+                if deadline is None or deadline & mask != index:
+                    continue
+                if ticks_diff(deadline, now) <= 0:
+                    due.append(t)
+                    if t is self._head:
+                        self._head = None
+                        self._head_known = False
+                else:
+                    slot[n] = t
+                    n += 1
+            while len(slot) > n:
+                slot.pop()
+
+        if overrun:
+            expired = due[start:]
+            expired.sort(key=lambda t: ticks_diff(deadlines.get(t, now), now))
+            due[start:] = expired
+
+    def _find_head(self) -> None:
+        # The first task of this turn in the slots following the current
+        # tick is the earliest, unless all tasks are due in later turns.
+        # Removed tasks are dropped from the slots on the way, so that they're
+        # only ever visited once, however often the head is cancelled.
+        mask = self._mask
+        deadlines = self._deadlines
+        tick = self._tick
+        for offset in range(1, mask + 2):
+            index = (tick + offset) & mask
+            slot = self._slots[index]
+            n = 0
+            head = None
+            for t in slot:
+                deadline = deadlines.get(t)
+                if deadline is None or deadline & mask != index:
+                    continue
+                slot[n] = t
+                n += 1
+                if head is None and ticks_diff(deadline, tick) <= mask + 1:
+                    head = t
+            while len(slot) > n:
+                slot.pop()
+            if head is not None:
+                self._head = head
+                self._head_known = True
+                return
+
+        head = None
+        for t in deadlines:
+            if head is None or ticks_diff(deadlines[t], deadlines[head]) < 0:
+                head = t
+        self._head = head
+        self._head_known = True
@@ -0,0 +1,101 @@
+'''
+Find heap allocations made by KMK code, as an approximation on CPython of what
+allocates on CircuitPython.
+
+`allocations` traces every opcode and attributes the growth of the traced heap
+between two opcodes to the first of them. Allocations that CPython makes, but
+CircuitPython doesn't, are left out:
+
+- frame objects, only created because of the tracing itself,
+- `for` loop iterators, which live on the stack on CircuitPython,
+- `range` objects of `for` loops, which the CircuitPython compiler optimizes
+  away.
+
+Objects that are allocated and freed again within a single opcode aren't
+detected, and neither are integers above 256 -- CPython allocates those, so
+tests have to keep their numbers small, e.g. by not advancing the clock.
+
+The approximation depends on how the interpreter traces, and is only
+`SUPPORTED` on CPython 3.11. Before, tracing fills the `f_locals` dict of
+every traced frame, which shows up as allocations. Since 3.12, tracing
+works differently, and repeated measurements report spurious allocations.
+'''
+
+import dis
+import sys
+import tracemalloc
+from pathlib import Path
+
+_GET_ITER = dis.opmap['GET_ITER']
+# `CALL` since Python 3.11, `CALL_FUNCTION` and `CALL_METHOD` before.
+_CALLS = {
+    dis.opmap[name]
+    for name in ('CALL', 'CALL_FUNCTION', 'CALL_METHOD')
+    if name in dis.opmap
+}
+_RANGE_SIZE = sys.getsizeof(range(0))
+
+SUPPORTED = sys.implementation.name == 'cpython' and sys.version_info[:2] == (3, 11)
+
+KMK = str(Path(__file__).parent.parent / 'kmk')
+
+
+def allocations(func, warmup=3, path=KMK):
+    '''
+    Call `func` `warmup` times, then once more and return a list of
+    `(filename, lineno, bytes)` of the allocations made by code under `path`.
+
+    The warmup calls are traced as well, so that blocks freed while measuring
+    are traced, and caches and lazily created objects are filled.
+    '''
+    found = []
+    # Previous opcode: filename, line number, opcode; and the traced heap size.
+    state = [None, 0, 0, 0]
+
+    def trace(frame, event, arg):
+        delta = tracemalloc.get_traced_memory()[0] - state[3]
+        if event == 'call':
+            delta -= sys.getsizeof(frame)
+            frame.f_trace_opcodes = True
+        elif state[2] == _GET_ITER:
+            delta = 0
+        elif (
+            state[2] in _CALLS
+            and delta == _RANGE_SIZE
+            and frame.f_code.co_code[frame.f_lasti] == _GET_ITER
+        ):
+            delta = 0
+
+        if delta > 0 and state[0] is not None and state[0].startswith(path):
+            found.append((state[0], state[1], delta))
+
+        if event == 'opcode':
+            code = frame.f_code
+            state[0] = code.co_filename
+            state[1] = frame.f_lineno
+            state[2] = code.co_code[frame.f_lasti]
+
+        # Whatever the tracer itself allocated has to be gone before taking
+        # the next baseline.
+        delta = code = None
+        state[3] = tracemalloc.get_traced_memory()[0]
+        return trace
+
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        sys.settrace(trace)
+        try:
+            for _ in range(warmup):
+                func()
+            del found[:]
+            state[0] = None
+            func()
+        finally:
+            sys.settrace(None)
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+    return found
@@ -0,0 +1,32 @@
+'''
+Host side benchmarks for the KMK core.
+
+Benchmarks aren't unit tests: they're not collected by the test runner and
+have to be invoked explicitly, e.g. `python -m tests.benchmarks` for all of
+them, or `python -m tests.benchmarks.main_loop` for a single one.
+Numbers are only meaningful relative to each other, i.e. when comparing two
+revisions on the same machine.
+'''
+
+import time
+
+
+def measure(func, duration_ms=1000):
+    '''
+    Call `func` repeatedly for roughly `duration_ms` and return the achieved
+    number of calls per second.
+    '''
+    n = 0
+    start = time.perf_counter_ns()
+    deadline = start + duration_ms * 1_000_000
+    now = start
+    while now < deadline:
+        for _ in range(100):
+            func()
+        n += 100
+        now = time.perf_counter_ns()
+    return n * 1_000_000_000 / (now - start)
+
+
+def report(name, value, unit):
+    print(f'{name:<40} {value:>14,.0f} {unit}')
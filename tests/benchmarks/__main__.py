@@ -0,0 +1,5 @@
+from tests.benchmarks import hid, keys, main_loop, pipeline, scheduler, timers
+
+for benchmark in (keys, main_loop, pipeline, hid, timers, scheduler):
+    print(f'# {benchmark.__name__}')
+    benchmark.main()
@@ -0,0 +1,77 @@
+'''
+Compare rebuilding HID reports from scratch with incremental updates.
+
+Each scenario builds and sends reports for a sequence of key sets, against
+devices that discard the reports.
+'''
+
+import mock_hid
+
+from kmk.hid import AbstractHID
+from kmk.keys import AX, KC, MouseKey
+from tests.benchmarks import measure, report
+
+
+class NullDevice:
+    def __init__(self, device):
+        self.usage_page = device.usage_page
+        self.usage = device.usage
+
+    def send_report(self, report):
+        pass
+
+
+def helper(incremental):
+    hid = AbstractHID(incremental_reports=incremental)
+    hid.connected = True
+    hid.devices = [NullDevice(device) for device in mock_hid.devices]
+    hid.setup()
+    return hid
+
+
+def held_keys_with_motion():
+    '''Four keys and a mouse button held, while the pointer moves.'''
+    keys = {KC.A, KC.S, KC.D, KC.LSFT, MouseKey(0x01), AX.X}
+
+    def step():
+        AX.X.delta = 3
+        return keys
+
+    return step
+
+
+def typing():
+    '''Rolling over three keys at a time.'''
+    keys = set()
+    sequence = [KC[c] for c in 'thequickbrownfxjmpsvlazydg']
+    state = [0]
+
+    def step():
+        idx = state[0]
+        keys.discard(sequence[idx - 3])
+        keys.add(sequence[idx])
+        state[0] = (idx + 1) % len(sequence)
+        return keys
+
+    return step
+
+
+def main():
+    for name, scenario in (
+        ('held keys, pointer motion', held_keys_with_motion),
+        ('typing', typing),
+    ):
+        for incremental in (False, True):
+            hid = helper(incremental)
+            step = scenario()
+
+            def send():
+                hid.create_report(step())
+                hid.send()
+
+            mode = 'incremental' if incremental else 'rebuild'
+            report(f'{name}, {mode}', measure(send), 'reports/s')
+
+
+if __name__ == '__main__':
+    main()
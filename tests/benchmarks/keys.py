@@ -0,0 +1,27 @@
+import time
+
+from kmk.keys import _KEY_TABLES, KC
+from tests.benchmarks import report
+
+
+def main():
+    names = []
+    for _, table in _KEY_TABLES:
+        for _, rows in table:
+            names.append(rows[-1])
+
+    n = 0
+    elapsed = 0
+    while elapsed < 1_000_000_000:
+        KC.clear()
+        start = time.perf_counter_ns()
+        for name in names:
+            KC[name]
+        elapsed += time.perf_counter_ns() - start
+        n += len(names)
+
+    report('resolve standard key, cache miss', n * 1_000_000_000 / elapsed, 'keys/s')
+
+
+if __name__ == '__main__':
+    main()
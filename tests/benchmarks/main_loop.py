@@ -0,0 +1,52 @@
+from kmk.extensions.international import International
+from kmk.extensions.media_keys import MediaKeys
+from kmk.keys import KC
+from kmk.modules.capsword import CapsWord
+from kmk.modules.combos import Chord, Combos
+from kmk.modules.holdtap import HoldTap
+from kmk.modules.layers import Layers
+from kmk.modules.macros import Macros
+from kmk.modules.sticky_keys import StickyKeys
+from tests.benchmarks import measure, report
+from tests.keyboard_test import KeyboardTest
+
+
+def module_stack():
+    '''A typical stack of six modules and two extensions.'''
+    combos = Combos()
+    combos.combos = [Chord((KC.A, KC.B), KC.C)]
+    modules = [
+        Layers(),
+        HoldTap(),
+        combos,
+        StickyKeys(),
+        CapsWord(),
+        Macros(),
+    ]
+    extensions = [MediaKeys(), International()]
+    return modules, extensions
+
+
+def main():
+    modules, extensions = module_stack()
+    kb = KeyboardTest(
+        modules,
+        [
+            [KC.A, KC.B, KC.HT(KC.D, KC.LCTL), KC.MO(1)],
+            [KC.E, KC.F, KC.G, KC.TRNS],
+        ],
+        extensions=extensions,
+    )
+    main_loop = kb.keyboard._main_loop
+
+    report('main loop, idle', measure(main_loop), 'loops/s')
+
+    kb.pins[0].value = True
+    main_loop()
+    report('main loop, key held', measure(main_loop), 'loops/s')
+    kb.pins[0].value = False
+    main_loop()
+
+
+if __name__ == '__main__':
+    main()
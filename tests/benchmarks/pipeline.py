@@ -0,0 +1,261 @@
+'''
+Replay keystroke traces through the full key pipeline -- matrix scan,
+modules, HID -- with several module stacks.
+
+A trace is a sequence of `(key, pressed)` events, where `key` is a position in
+the benchmark keymap, and pauses in ms. Every event is fed to the matrix and
+followed by one iteration of the main loop; after the trace the keyboard runs
+until all buffered keys and pending timers are resolved.
+Time is virtual: pauses skip straight to the next scheduled task, and the
+results only depend on the time actually spent in the main loop.
+'''
+
+import mock_hid
+import time
+
+from kmk import scheduler
+from kmk.keys import KC
+from kmk.modules.combos import Chord, Combos
+from kmk.modules.holdtap import HoldTap
+from kmk.modules.layers import Layers
+from kmk.modules.macros import Macros
+from kmk.modules.string_substitution import StringSubstitution
+from tests.benchmarks import report
+from tests.keyboard_test import KeyboardTest
+
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+
+# Keymap positions: letters, space, punctuation, then four special keys that
+# depend on the module stack.
+SPACE = 26
+COMMA = 27
+DOT = 28
+SPECIAL = (32, 33, 34, 35)
+
+CORPUS = (
+    'the quick brown fox jumps over the lazy dog. '
+    'pack my box with five dozen liquor jugs, '
+    'how vexingly quick daft zebras jump. '
+    'sphinx of black quartz, judge my vow. '
+    'a keyboard firmware should never be the bottleneck of a fast typist, '
+    'not even when many modules are loaded and every key is remapped. '
+)
+
+
+def position(char):
+    if char == ' ':
+        return SPACE
+    if char == ',':
+        return COMMA
+    if char == '.':
+        return DOT
+    return LETTERS.index(char)
+
+
+def typing_trace(repeat=4, pause=40):
+    '''
+    Typing with rolls at about 150wpm: the next key is pressed before the last
+    is released.
+    '''
+    trace = []
+    last = None
+    for _ in range(repeat):
+        for char in CORPUS:
+            key = position(char)
+            if key == last:
+                trace.append((last, False))
+                last = None
+            trace.append((key, True))
+            if last is not None:
+                trace.append((last, False))
+            trace.append(pause)
+            last = key
+    trace.append((last, False))
+    return trace
+
+
+def chord_trace(repeat=200):
+    '''Bursts of two and three keys pressed and released at once.'''
+    trace = []
+    for i in range(repeat):
+        keys = (i % 26, (i * 7 + 3) % 26, (i * 11 + 5) % 26)
+        keys = keys[: 2 + i % 2]
+        if len(set(keys)) < len(keys):
+            continue
+        trace.extend((k, True) for k in keys)
+        trace.append(30)
+        trace.extend((k, False) for k in reversed(keys))
+        trace.append(100)
+    return trace
+
+
+def holdtap_trace(repeat=200):
+    '''
+    Special keys rolled with, or wrapped around letters; every third one is
+    held for longer than the default tap time.
+    '''
+    trace = []
+    for i in range(repeat):
+        special = SPECIAL[i % len(SPECIAL)]
+        letter = i % 26
+        hold = 400 if i % 3 == 0 else 20
+        if i % 2:
+            # roll: special down, letter down, special up, letter up
+            trace.extend(
+                (
+                    (special, True),
+                    hold,
+                    (letter, True),
+                    (special, False),
+                    (letter, False),
+                    50,
+                )
+            )
+        else:
+            # nested: special down, letter tapped, special up
+            trace.extend(
+                (
+                    (special, True),
+                    hold,
+                    (letter, True),
+                    (letter, False),
+                    (special, False),
+                    50,
+                )
+            )
+    return trace
+
+
+TRACES = (
+    ('typing', typing_trace),
+    ('chords', chord_trace),
+    ('holdtap', holdtap_trace),
+)
+
+
+def base_keymap(special):
+    keys = [KC[c] for c in LETTERS]
+    keys.extend((KC.SPC, KC.COMM, KC.DOT, KC.ENT, KC.BSPC, KC.TAB, KC.ESC))
+    keys.extend(special)
+    return keys
+
+
+def layers_holdtap():
+    modules = [Layers(), HoldTap()]
+    keymap = [
+        base_keymap(
+            (
+                KC.HT(KC.ESC, KC.LCTL),
+                KC.HT(KC.TAB, KC.LSFT),
+                KC.LT(1, KC.BSPC),
+                KC.MO(1),
+            )
+        ),
+        [KC.N1, KC.N2, KC.N3, KC.N4, KC.N5] + [KC.TRNS] * 31,
+    ]
+    return modules, keymap
+
+
+def combos():
+    module = Combos()
+    module.combos = []
+    for i in range(26):
+        for j in range(i + 1, 26):
+            if len(module.combos) >= 200:
+                break
+            module.combos.append(Chord((KC[LETTERS[i]], KC[LETTERS[j]]), KC.N0))
+    keymap = [base_keymap((KC.LSFT, KC.LCTL, KC.LALT, KC.LGUI))]
+    return [module], keymap
+
+
+def string_substitution():
+    dictionary = {}
+    for i in range(500):
+        a = LETTERS[i % 26]
+        b = LETTERS[(i // 26) % 26]
+        c = LETTERS[(i * 7) % 26]
+        dictionary[a + b + c] = f'{c}{b}{a} {a}{b}{c}'
+    keymap = [base_keymap((KC.LSFT, KC.LCTL, KC.LALT, KC.LGUI))]
+    return [StringSubstitution(dictionary=dictionary)], keymap
+
+
+def macros():
+    modules = [Macros()]
+    keymap = [
+        base_keymap(
+            (
+                KC.MACRO('hello'),
+                KC.MACRO('world '),
+                KC.MACRO(KC.LCTL(KC.C)),
+                KC.MACRO(on_press=KC.LSFT, on_release=KC.LSFT),
+            )
+        )
+    ]
+    return modules, keymap
+
+
+STACKS = (
+    ('layers+holdtap', layers_holdtap),
+    ('combos(200)', combos),
+    ('string_substitution(500)', string_substitution),
+    ('macros', macros),
+)
+
+
+def replay(stack, trace):
+    '''
+    Replay `trace` on a keyboard with the given module stack and return a
+    tuple of (seconds, key events, loop iterations, HID reports). Only the
+    time spent in the main loop is counted, not that of driving the pins and
+    the virtual clock.
+    '''
+    modules, keymap = stack()
+    kb = KeyboardTest(modules, keymap)
+    keyboard = kb.keyboard
+    for hid in mock_hid.devices:
+        hid.reports.clear()
+
+    loops = 0
+    elapsed = 0
+    main_loop = keyboard._main_loop
+
+    def timed_main_loop():
+        nonlocal loops, elapsed
+        loops += 1
+        start = time.perf_counter_ns()
+        main_loop()
+        elapsed += time.perf_counter_ns() - start
+
+    keyboard._main_loop = timed_main_loop
+
+    events = 0
+    for e in trace:
+        if isinstance(e, int):
+            kb.idle(e)
+        else:
+            kb.pins[e[0]].value = e[1]
+            kb.do_main_loop()
+            events += 1
+
+    # Resolve anything still pending.
+    while scheduler._task_queue.peek() or keyboard._resume_buffer:
+        kb.idle_step(kb.timeout_ms)
+
+    reports = sum(len(hid.reports) for hid in mock_hid.devices)
+    return elapsed / 1_000_000_000, events, loops, reports
+
+
+def main():
+    for stack_name, stack in STACKS:
+        for trace_name, make_trace in TRACES:
+            seconds, events, loops, reports = replay(stack, make_trace())
+            name = f'{stack_name}, {trace_name}'
+            report(name, events / seconds, 'events/s')
+            print(
+                f'{"":<40} {loops / events:>14.2f} loops/event'
+                f' {reports / events:>8.2f} reports/event'
+            )
+
+
+if __name__ == '__main__':
+    main()
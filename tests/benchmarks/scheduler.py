@@ -0,0 +1,89 @@
+'''
+Compare the pairing heap of `TaskQueue` with the hashed timer wheel, with a
+number of live timers that are restarted, cancelled and expire, and with key
+presses that arm and cancel the timeouts of hundreds of combos at once.
+
+On the host, `TaskQueue` is the Python version of the native implementation
+on CircuitPython, which makes the heap look worse than it is on a keyboard.
+'''
+
+from kmk import scheduler
+from tests.benchmarks import measure, report
+from tests.mocks import clock
+
+
+def live_timers(count):
+    '''
+    `count` timers with timeouts between 20 and 1000ms, restarted when they
+    expire. Every step restarts one of them, cancels another, advances the
+    clock by a millisecond and runs the due tasks.
+    '''
+    timers = []
+
+    def restart(n):
+        timers[n].start(20 + n * 37 % 980)
+
+    for n in range(count):
+        timers.append(scheduler.Timer(restart, n))
+        restart(n)
+
+    state = [0]
+
+    def step():
+        n = state[0]
+        restart(n)
+        timers[(n + count // 2) % count].cancel()
+        restart((n + count // 2) % count)
+        state[0] = (n + 1) % count
+        clock.advance(1)
+        scheduler.run_due_tasks()
+
+    return timers, step
+
+
+def combo_presses(count):
+    '''
+    Every step is a key press that arms the timeouts of `count` combos, like
+    a key that is part of that many combos, while a few other timers are
+    pending. The next press cancels them again, then the clock advances by a
+    millisecond and the due tasks run.
+    '''
+    timers = [scheduler.Timer(bool) for _ in range(count)]
+    pending = [scheduler.Timer(bool) for _ in range(10)]
+    for n, timer in enumerate(pending):
+        timer.start(1000 + n)
+
+    def step():
+        for timer in timers:
+            timer.start(50)
+        for timer in timers:
+            timer.cancel()
+        clock.advance(1)
+        scheduler.run_due_tasks()
+
+    return timers + pending, step
+
+
+def main():
+    clock.virtual = True
+    for name, use in (
+        ('pairing heap', scheduler.use_pairing_heap),
+        ('timer wheel', scheduler.use_timer_wheel),
+    ):
+        for count in (10, 100, 1000):
+            use()
+            timers, step = live_timers(count)
+            report(f'{name}, {count} timers', measure(step), 'steps/s')
+            for timer in timers:
+                timer.cancel()
+        for count in (100, 500):
+            use()
+            timers, step = combo_presses(count)
+            report(f'{name}, {count} combos', measure(step), 'presses/s')
+            for timer in timers:
+                timer.cancel()
+    scheduler.use_pairing_heap()
+
+
+if __name__ == '__main__':
+    main()
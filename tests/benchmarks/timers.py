@@ -0,0 +1,86 @@
+'''
+Count the heap allocations per keystroke of modules that arm timeouts.
+
+Allocations are found with `tests.allocations`, i.e. approximated on CPython.
+Compare the output of two revisions to see the effect of a change.
+'''
+
+from kmk import utils
+from kmk.keys import KC
+from kmk.modules.combos import Chord, Combos
+from kmk.modules.holdtap import HoldTap
+from kmk.modules.rapidfire import RapidFire
+from kmk.modules.sticky_keys import StickyKeys
+from tests.allocations import allocations
+from tests.benchmarks import report
+from tests.keyboard_test import KeyboardTest
+from tests.mocks import clock
+
+
+def keyboard():
+    combos = Combos()
+    combos.combos = [Chord((KC.C, KC.D), KC.E)]
+    return KeyboardTest(
+        [HoldTap(), combos, StickyKeys(), RapidFire()],
+        [
+            [
+                KC.A,
+                KC.HT(KC.B, KC.LCTL, tap_time=50),
+                KC.C,
+                KC.D,
+                KC.SK(KC.LSFT),
+                KC.RF(KC.F, timeout=50, interval=20),
+            ]
+        ],
+    )
+
+
+def keystroke(kb, *events):
+    '''
+    Return a function that runs `events`: `(key_pos, is_pressed)` or a number
+    of ms to wait, followed by a main loop iteration.
+    '''
+    main_loop = kb.keyboard._main_loop
+
+    def run():
+        # Rewind the clock: CPython allocates integers above 256, CircuitPython
+        # doesn't.
+        clock.reset()
+        for event in events:
+            if isinstance(event, int):
+                clock.advance(event)
+            else:
+                kb.pins[event[0]].value = event[1]
+            main_loop()
+        # Let pending timeouts expire.
+        clock.advance(100)
+        main_loop()
+
+    return run
+
+
+def main():
+    # `debug.enabled` asks the mocked console, and mocks allocate.
+    debug_enabled = utils._debug_enabled
+    utils._debug_enabled = False
+    clock.virtual = True
+
+    kb = keyboard()
+    for name, events in (
+        ('hold-tap, tap', ((1, True), (1, False))),
+        ('hold-tap, hold', ((1, True), 60, (1, False))),
+        ('hold-tap, interrupted', ((1, True), (0, True), (0, False), (1, False))),
+        ('combo', ((2, True), (3, True), (2, False), (3, False))),
+        ('combo, timed out', ((2, True), 60, (2, False))),
+        ('sticky key', ((4, True), (4, False), (0, True), (0, False))),
+        ('rapid fire', ((5, True), 60, 20, 20, (5, False))),
+    ):
+        found = allocations(keystroke(kb, *events))
+        report(f'{name}, allocations', len(found), 'per keystroke')
+        report(f'{name}, bytes', sum(size for _, _, size in found), 'per keystroke')
+
+    utils._debug_enabled = debug_enabled
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,6 @@
 import digitalio
 
 import mock_hid
-import time
-from unittest.mock import Mock
 
 from kmk import scheduler
 from kmk.hid import HIDModes
@@ -11,13 +9,22 @@ from kmk.kmk_keyboard import KMKKeyboard
 from kmk.scanners import DiodeOrientation
 from kmk.scanners.digitalio import MatrixScanner
 from kmk.utils import Debug
+from tests.mocks import clock
 
 debug = Debug(__name__)
 
 
-class DigitalInOut(Mock):
+class DigitalInOut:
+    '''Pin stand-in. Not a `Mock`, setting attributes on mocks allocates.'''
+
     value = False
 
+    def switch_to_output(self, *args, **kwargs):
+        pass
+
+    def switch_to_input(self, *args, **kwargs):
+        pass
+
 
 def code2name(code):
     for name in KC:
@@ -31,6 +38,8 @@ def code2name(code):
 
 class KeyboardTest:
     loop_delay_ms = 2
+    # Upper bound for the time it may take to resolve delayed actions.
+    timeout_ms = 10_000
 
     def __init__(
         self,
@@ -42,6 +51,10 @@ class KeyboardTest:
     ):
         self.debug_enabled = debug_enabled
 
+        # Time only advances with the main loop, or when waiting for the next
+        # scheduled task.
+        clock.virtual = True
+
         self.keyboard = KMKKeyboard()
         if keyboard_debug_enabled:
             debug.enabled = True
@@ -80,22 +93,20 @@ class KeyboardTest:
         self.keyboard._main_loop()
         for e in key_events:
             if isinstance(e, int):
-                starttime_ms = time.time_ns() // 1_000_000
-                while time.time_ns() // 1_000_000 - starttime_ms < e:
-                    self.do_main_loop()
+                self.idle(e)
             else:
                 key_pos = e[0]
                 is_pressed = e[1]
                 self.pins[key_pos].value = is_pressed
                 self.do_main_loop()
 
-        # wait up to 10s for delayed actions to resolve, if there are any
-        timeout = time.time_ns() + 10 * 1_000_000_000
-        while timeout > time.time_ns():
-            self.do_main_loop()
+        # wait for delayed actions to resolve, if there are any
+        elapsed = 0
+        while True:
+            elapsed += self.idle_step(self.timeout_ms - elapsed)
             if not scheduler._task_queue.peek() and not self.keyboard._resume_buffer:
                 break
-        assert timeout > time.time_ns(), 'infinite loop detected'
+            assert elapsed < self.timeout_ms, 'infinite loop detected'
 
         return keyboard_hid.reports
 
@@ -150,4 +161,35 @@ class KeyboardTest:
 
     def do_main_loop(self):
         self.keyboard._main_loop()
-        time.sleep(self.loop_delay_ms / 1000)
+        clock.advance(self.loop_delay_ms)
+
+    def idle_step(self, max_ms):
+        '''
+        Run one main loop iteration and advance the clock, at most by `max_ms`.
+        As long as the keyboard is busy -- buffering keys or sending reports --
+        time advances by `loop_delay_ms`, otherwise it skips ahead to the next
+        scheduled task. Returns the time that has passed.
+        '''
+        devices = self.keyboard._hid_helper.devices
+        reports = sum(len(hid.reports) for hid in devices)
+
+        self.keyboard._main_loop()
+
+        busy = self.keyboard._resume_buffer or reports != sum(
+            len(hid.reports) for hid in devices
+        )
+        ms = scheduler.next_deadline()
+        if ms is None:
+            ms = self.loop_delay_ms if busy else max_ms
+        elif not ms:
+            ms = self.loop_delay_ms
+        elif busy:
+            ms = min(ms, self.loop_delay_ms)
+        ms = min(ms, max_ms)
+        clock.advance(ms)
+        return ms
+
+    def idle(self, ms):
+        '''Keep the keyboard running for `ms` without any key events.'''
+        while ms > 0:
+            ms -= self.idle_step(ms)
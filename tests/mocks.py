@@ -4,22 +4,69 @@ from unittest.mock import Mock
 
 
 class KeyEvent:
-    def __init__(self, key_number, pressed):
+    def __init__(self, key_number=0, pressed=True):
         self.key_number = key_number
         self.pressed = pressed
 
 
+class Clock:
+    '''
+    Time source for the `supervisor.ticks_ms` mock.
+
+    By default it follows the system clock. In virtual mode time stands still
+    until it's advanced explicitly, which lets tests and benchmarks skip any
+    waiting and run at CPU speed.
+    '''
+
+    def __init__(self):
+        self._virtual = False
+        self._ms = 0
+
+    @property
+    def virtual(self):
+        return self._virtual
+
+    @virtual.setter
+    def virtual(self, virtual):
+        # Continue from the current time, whichever way we switch.
+        if virtual and not self._virtual:
+            self._ms = time.time_ns() // 1_000_000
+        self._virtual = virtual
+
+    def advance(self, ms):
+        assert self._virtual, 'only virtual clocks can be advanced'
+        self._ms += ms
+
+    def reset(self, ms=0):
+        '''Set the virtual clock to `ms`.'''
+        assert self._virtual, 'only virtual clocks can be reset'
+        self._ms = ms
+
+    def ticks_ms(self):
+        if self._virtual:
+            ms = self._ms
+        else:
+            ms = time.time_ns() // 1_000_000
+        return ms % (1 << 29)
+
+
+clock = Clock()
+
+
 def ticks_ms():
-    return (time.time_ns() // 1_000_000) % (1 << 29)
+    return clock.ticks_ms()
 
 
 class Device:
-    def __init__(self, usage_page, usage):
+    def __init__(self, usage_page, usage, report_length=None):
         self.usage_page = usage_page
         self.usage = usage
+        self.report_length = report_length
         self.reports = []
 
     def send_report(self, report):
+        if self.report_length is not None and len(report) != self.report_length:
+            raise ValueError('Buffer does not have correct size')
         self.reports.append(report[:])
 
 
@@ -0,0 +1,120 @@
+import digitalio
+
+import unittest
+
+from kmk import utils
+from kmk.keys import KC
+from kmk.modules.capsword import CapsWord
+from kmk.modules.holdtap import HoldTap
+from kmk.modules.layers import Layers
+from kmk.modules.macros import Macros
+from kmk.modules.sticky_keys import StickyKeys
+from kmk.scanners.digitalio import MatrixScanner
+from kmk.scheduler import Timer
+from tests.allocations import SUPPORTED, allocations
+from tests.keyboard_test import KeyboardTest
+from tests.mocks import clock
+
+
+@unittest.skipUnless(SUPPORTED, 'allocations are only approximated on CPython 3.11')
+class TestAllocations(unittest.TestCase):
+    def setUp(self):
+        # `debug.enabled` asks the mocked console, and mocks allocate.
+        self.debug_enabled = utils._debug_enabled
+        utils._debug_enabled = False
+
+    def tearDown(self):
+        utils._debug_enabled = self.debug_enabled
+
+    def assertNoAllocations(self, func):
+        found = allocations(func)
+        self.assertFalse(
+            found,
+            'allocations:\n'
+            + '\n'.join(f'{file}:{line}: {size} bytes' for file, line, size in found),
+        )
+
+    def press_release(self, kb, key_pos):
+        def press_release():
+            kb.pins[key_pos].value = True
+            kb.keyboard._main_loop()
+            kb.pins[key_pos].value = False
+            kb.keyboard._main_loop()
+
+        return press_release
+
+    def test_idle(self):
+        kb = KeyboardTest([], [[KC.A]])
+        self.assertNoAllocations(kb.keyboard._main_loop)
+
+    def test_press_release(self):
+        kb = KeyboardTest([], [[KC.A, KC.B]])
+        self.assertNoAllocations(self.press_release(kb, 1))
+
+    def test_press_release_modules(self):
+        kb = KeyboardTest(
+            [Layers(), HoldTap(), StickyKeys(), CapsWord(), Macros()],
+            [
+                [KC.A, KC.HT(KC.B, KC.LCTL), KC.MO(1)],
+                [KC.C, KC.TRNS, KC.TRNS],
+            ],
+        )
+        self.assertNoAllocations(self.press_release(kb, 0))
+
+    def test_batched(self):
+        kb = KeyboardTest([], [[KC.A, KC.B]])
+        kb.keyboard.matrix_update_batch = 4
+
+        def press_release():
+            kb.pins[0].value = True
+            kb.pins[1].value = True
+            kb.keyboard._main_loop()
+            kb.pins[0].value = False
+            kb.pins[1].value = False
+            kb.keyboard._main_loop()
+
+        self.assertNoAllocations(press_release)
+
+    def test_full_scan(self):
+        kb = KeyboardTest([], [[KC.A, KC.B]])
+        scanner = kb.keyboard.matrix[0]
+        scanner = MatrixScanner(
+            cols=scanner.anodes,
+            rows=scanner.cathodes,
+            pull=digitalio.Pull.DOWN,
+            full_scan=True,
+        )
+
+        def press_release():
+            for value in (True, False):
+                kb.pins[0].value = value
+                kb.pins[1].value = value
+                for _ in range(3):
+                    scanner.scan_for_changes()
+
+        self.assertNoAllocations(press_release)
+
+    def test_timer(self):
+        KeyboardTest([], [[KC.A]])
+        timer = Timer(self.setUp)
+
+        def timeout():
+            # CPython allocates integers above 256.
+            clock.reset()
+            timer.start(10)
+            timer.start(20, self.tearDown, self)
+            timer.cancel()
+
+        self.assertNoAllocations(timeout)
+
+    def test_detects_allocations(self):
+        kb = KeyboardTest([], [[KC.A]])
+
+        def timeout():
+            kb.keyboard.cancel_timeout(kb.keyboard.set_timeout(10, self.setUp))
+
+        self.assertTrue(allocations(timeout))
+
+
+if __name__ == '__main__':
+    unittest.main()
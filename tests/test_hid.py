@@ -0,0 +1,476 @@
+import contextlib
+import io
+import mock_hid
+import unittest
+
+from kmk.hid import (
+    AbstractHID,
+    ConsumerControlReport,
+    KeyboardReport,
+    PointingDeviceReport,
+    ReportQueue,
+    ReportTrace,
+)
+from kmk.hid_reports import nkro_keyboard
+from kmk.keys import AX, KC, ConsumerKey, MouseKey
+from tests.keyboard_test import KeyboardTest
+from tests.mocks import Device, clock
+
+
+class TestIncrementalReports(unittest.TestCase):
+    def setUp(self):
+        self.kb = KeyboardTest(
+            [],
+            [
+                [
+                    KC.N1,
+                    KC.N2,
+                    KC.N3,
+                    KC.N4,
+                    KC.N5,
+                    KC.N6,
+                    KC.N7,
+                    KC.LCTL,
+                    KC.MEH,
+                    KC.LSFT(KC.N8),
+                ]
+            ],
+        )
+        self.kb.keyboard._hid_helper.incremental_reports = True
+
+    def test_press_release(self):
+        self.kb.test(
+            'roll',
+            [(0, True), (1, True), (0, False), (2, True), (1, False), (2, False)],
+            [{KC.N1}, {KC.N1, KC.N2}, {KC.N2}, {KC.N2, KC.N3}, {KC.N3}, {}],
+        )
+
+    def test_modifiers(self):
+        self.kb.test(
+            'shared modifier bits',
+            [(7, True), (8, True), (8, False), (7, False)],
+            [{KC.LCTL}, {KC.MEH}, {KC.LCTL}, {}],
+        )
+        self.kb.test(
+            'modified key',
+            [(7, True), (9, True), (9, False), (7, False)],
+            [{KC.LCTL}, {KC.LCTL, KC.LSFT, KC.N8}, {KC.LCTL}, {}],
+        )
+
+    def test_rollover(self):
+        # The seventh key doesn't fit, until another one is released.
+        self.kb.test(
+            'seven keys',
+            [(i, True) for i in range(7)] + [(0, False)],
+            [
+                {KC.N1},
+                {KC.N1, KC.N2},
+                {KC.N1, KC.N2, KC.N3},
+                {KC.N1, KC.N2, KC.N3, KC.N4},
+                {KC.N1, KC.N2, KC.N3, KC.N4, KC.N5},
+                {KC.N1, KC.N2, KC.N3, KC.N4, KC.N5, KC.N6},
+                {KC.N2, KC.N3, KC.N4, KC.N5, KC.N6, KC.N7},
+            ],
+        )
+        self.kb.test(
+            'release',
+            [(i, False) for i in range(1, 7)],
+            [
+                {KC.N3, KC.N4, KC.N5, KC.N6, KC.N7},
+                {KC.N4, KC.N5, KC.N6, KC.N7},
+                {KC.N5, KC.N6, KC.N7},
+                {KC.N6, KC.N7},
+                {KC.N7},
+                {},
+            ],
+        )
+
+    def test_slots(self):
+        report = next(iter(self.kb.keyboard._hid_helper.device_map))
+        self.kb.get_keyboard_report([(0, True), (1, True), (0, False), (2, True)])
+        # Keys keep their slots, released slots are reused.
+        self.assertEqual(report.buffer[2:4], bytes((KC.N3.code, KC.N2.code)))
+        self.assertEqual(report.slots[KC.N2.code], 3)
+        self.assertEqual(report.slots[KC.N1.code], 0)
+        self.kb.get_keyboard_report([(1, False), (2, False)])
+
+
+LMB = MouseKey(0x01)
+VOLU = ConsumerKey(0xE9)
+VOLD = ConsumerKey(0xEA)
+
+
+class TestAbstractHID(unittest.TestCase):
+    def setUp(self):
+        self.hid = AbstractHID(incremental_reports=True)
+        self.hid.connected = True
+        self.hid.devices = mock_hid.devices
+        self.hid.setup()
+        self.keyboard, self.mouse, self.consumer = mock_hid.devices
+        for device in mock_hid.devices:
+            device.reports.clear()
+
+    def send(self, keys):
+        self.hid.create_report(keys)
+        self.hid.send()
+
+    def test_motion(self):
+        AX.X.delta = 5
+        self.send({LMB, AX.X})
+        self.send({LMB})
+        self.send({LMB})
+        self.send(set())
+        self.assertEqual(
+            self.mouse.reports,
+            [b'\x01\x05\x00\x00', b'\x01\x00\x00\x00', b'\x00\x00\x00\x00'],
+        )
+
+    def test_consumer(self):
+        self.send({VOLU})
+        self.send({VOLU, VOLD})
+        self.send({VOLU})
+        self.send(set())
+        self.assertEqual(
+            self.consumer.reports,
+            [b'\xe9\x00', b'\xea\x00', b'\xe9\x00', b'\x00\x00'],
+        )
+
+    def test_resync(self):
+        report = next(iter(self.hid.device_map))
+        self.send({KC.A})
+        # Incremental updates only touch the keys that changed.
+        report.buffer[5] = report.prev_buffer[5] = KC.B.code
+        self.send({KC.A})
+        self.assertEqual(len(self.keyboard.reports), 1)
+
+        self.hid.resync()
+        self.send({KC.A})
+        self.assertEqual(self.keyboard.reports[1], self.keyboard.reports[0])
+
+
+class HID(AbstractHID):
+    boot = False
+
+    def boot_protocol(self):
+        return self.boot
+
+
+def keyboard_report(*keys, modifiers=0):
+    codes = tuple(key.code if key else 0 for key in keys)
+    return bytes((modifiers, 0) + codes + (0,) * (6 - len(codes)))
+
+
+def nkro_report(*keys):
+    report = bytearray(16)
+    for key in keys:
+        report[(key.code >> 3) + 1] |= 1 << (key.code & 0x07)
+    return report
+
+
+class TestRollover(unittest.TestCase):
+    def setUp(self):
+        self.keyboard = Device(0x01, 0x06, 8)
+        self.nkro = Device(0x01, 0x06, 16)
+        self.hid = HID()
+        self.hid.connected = True
+        self.hid.devices = [self.keyboard, self.nkro]
+        self.hid.setup()
+        self.keyboard.reports.clear()
+        self.keys = set()
+
+    def press(self, *keys):
+        for key in keys:
+            self.keys.add(key)
+            self.hid.create_report(self.keys)
+            self.hid.send()
+
+    def release(self, *keys):
+        for key in keys:
+            self.keys.discard(key)
+            self.hid.create_report(self.keys)
+            self.hid.send()
+
+    def test_setup(self):
+        self.assertEqual(len(self.hid.device_map), 2)
+        self.assertTrue(self.hid.incremental_reports)
+
+    def test_descriptor(self):
+        descriptor = nkro_keyboard.keyboard_report_descriptor(4)
+        self.assertEqual(descriptor[6:8], b'\x85\x04')
+        self.assertEqual(descriptor[8:], nkro_keyboard.report_descriptor[8:])
+
+    def test_escalation(self):
+        self.press(KC.N1, KC.N2, KC.N3, KC.N4, KC.N5, KC.N6)
+        self.assertEqual(len(self.keyboard.reports), 6)
+        self.assertEqual(self.nkro.reports, [])
+
+        self.press(KC.N7)
+        self.assertEqual(len(self.keyboard.reports), 6)
+        self.assertEqual(self.nkro.reports, [nkro_report(KC.N7)])
+
+        # Held keys stay where they are, new keys go to the NKRO report while
+        # it isn't empty.
+        self.release(KC.N1)
+        self.press(KC.N8, KC.LCTL)
+        held = (KC.N2, KC.N3, KC.N4, KC.N5, KC.N6)
+        self.assertEqual(
+            self.keyboard.reports[-2:],
+            [keyboard_report(None, *held), keyboard_report(None, *held, modifiers=1)],
+        )
+        self.assertEqual(self.nkro.reports[-1], nkro_report(KC.N7, KC.N8))
+
+        self.release(KC.N7, KC.N8, KC.LCTL)
+        self.assertEqual(self.nkro.reports[-1], nkro_report())
+        self.press(KC.N9)
+        self.assertEqual(self.keyboard.reports[-1], keyboard_report(KC.N9, *held))
+
+    def test_boot_protocol(self):
+        self.hid.boot = True
+        self.press(KC.N1, KC.N2, KC.N3, KC.N4, KC.N5, KC.N6, KC.N7)
+        self.assertEqual(len(self.keyboard.reports), 6)
+        self.assertEqual(self.nkro.reports, [])
+
+        # The dropped key is added as soon as there's room.
+        self.release(KC.N1)
+        self.assertEqual(
+            self.keyboard.reports[-1],
+            keyboard_report(KC.N7, KC.N2, KC.N3, KC.N4, KC.N5, KC.N6),
+        )
+
+
+class TestSendScheduler(unittest.TestCase):
+    def setUp(self):
+        clock.virtual = True
+        self.keyboard = Device(0x01, 0x06)
+        self.mouse = Device(0x01, 0x02)
+        self.hid = AbstractHID(incremental_reports=True, poll_interval_ms=8)
+        self.hid.connected = True
+        self.hid.devices = [self.keyboard, self.mouse]
+        self.hid.setup()
+        self.keyboard.reports.clear()
+        self.mouse.reports.clear()
+
+    def send(self, keys):
+        self.hid.create_report(keys)
+        self.hid.send()
+
+    def counters(self):
+        hid = self.hid
+        return (hid.reports_sent, hid.reports_coalesced, hid.reports_split)
+
+    def test_coalesce(self):
+        self.send({KC.A})
+        self.send({KC.A, KC.B})
+        self.send({KC.A, KC.B, KC.LSFT})
+        self.assertEqual(self.keyboard.reports, [keyboard_report(KC.A)])
+        self.assertEqual(self.hid.reports_queued, 1)
+        self.assertEqual(self.hid.send_delay_ms(), 8)
+
+        clock.advance(8)
+        self.hid.send()
+        self.assertEqual(
+            self.keyboard.reports[-1], keyboard_report(KC.A, KC.B, modifiers=2)
+        )
+        self.assertEqual(self.hid.reports_queued, 0)
+        self.assertEqual(self.counters(), (2, 1, 0))
+
+    def test_split(self):
+        self.send({KC.A})
+        # Pressed and released within an interval: the press mustn't get lost.
+        self.send({KC.A, KC.B})
+        self.send({KC.A})
+        self.assertEqual(
+            self.keyboard.reports, [keyboard_report(KC.A), keyboard_report(KC.A, KC.B)]
+        )
+        self.assertEqual(self.counters(), (2, 0, 1))
+
+        clock.advance(8)
+        self.hid.send()
+        self.assertEqual(self.keyboard.reports[-1], keyboard_report(KC.A))
+
+        # Modifiers are coalesced bit by bit.
+        self.send({KC.LCTL})
+        self.send({KC.LCTL, KC.LSFT})
+        self.send({KC.LSFT})
+        self.hid.send(flush=True)
+        self.assertEqual(
+            self.keyboard.reports[-2:],
+            [keyboard_report(modifiers=3), keyboard_report(modifiers=2)],
+        )
+        self.assertEqual(self.counters(), (5, 1, 2))
+
+    def test_motion(self):
+        AX.X.delta = 1
+        self.send({AX.X})
+        AX.X.delta = 2
+        self.send({AX.X})
+        AX.X.delta = 3
+        self.send({AX.X})
+        self.hid.send(flush=True)
+        self.assertEqual(
+            self.mouse.reports,
+            [b'\x00\x01\x00\x00', b'\x00\x02\x00\x00', b'\x00\x03\x00\x00'],
+        )
+
+
+class FlakyDevice(Device):
+    '''Stand-in for a BLE HID device, failing the next `failures` sends.'''
+
+    failures = 0
+
+    def send_report(self, report):
+        if self.failures:
+            self.failures -= 1
+            raise OSError('busy')
+        super().send_report(report)
+
+
+class TestReportQueue(unittest.TestCase):
+    def setUp(self):
+        self.queue = ReportQueue(drain_limit=8)
+        self.keyboard = FlakyDevice(0x01, 0x06)
+        self.consumer = FlakyDevice(0x0C, 0x01)
+        self.mouse = FlakyDevice(0x01, 0x02)
+        self.report = KeyboardReport()
+        self.cc_report = ConsumerControlReport()
+        self.mouse_report = PointingDeviceReport()
+
+    def put(self, *keys):
+        report = self.report
+        report.clear()
+        for key in keys:
+            if isinstance(key, ConsumerKey):
+                self.cc_report.clear()
+                self.cc_report.add_cc(key)
+                self.queue.put(self.cc_report, self.consumer, self.cc_report.buffer)
+                return
+            report.add_key(key)
+        self.queue.put(report, self.keyboard, report.buffer)
+
+    def test_merge(self):
+        self.put(KC.A)
+        self.put(KC.A, KC.B)
+        self.put(KC.A, KC.B, KC.C)
+        self.assertEqual(len(self.queue), 1)
+        self.queue.drain()
+        self.assertEqual(self.keyboard.reports, [keyboard_report(KC.A, KC.B, KC.C)])
+        self.assertEqual(self.queue.merged, 2)
+        self.assertEqual(self.queue.superseded, 0)
+
+    def test_order(self):
+        # Reports keep their place in the queue while they're merged into.
+        self.put(KC.A)
+        self.put(VOLU)
+        self.put(KC.A, KC.B)
+        self.assertEqual(len(self.queue), 2)
+
+        self.queue.drain_limit = 1
+        self.queue.drain()
+        self.assertEqual(self.keyboard.reports, [keyboard_report(KC.A, KC.B)])
+        self.assertEqual(self.consumer.reports, [])
+        self.queue.drain()
+        self.assertEqual(self.consumer.reports, [b'\xe9\x00'])
+        self.assertEqual(self.queue.sent, 2)
+
+    def test_no_overflow(self):
+        # A tap that is undone before it was sent is superseded, but the last
+        # state, i.e. the release, is never lost.
+        for _ in range(20):
+            self.put(KC.A)
+            self.put()
+        self.assertEqual(len(self.queue), 1)
+        self.assertEqual(self.queue.superseded, 20)
+        self.assertEqual(self.queue.dropped, 0)
+        self.queue.drain()
+        self.assertEqual(self.keyboard.reports, [keyboard_report()])
+
+    def test_motion(self):
+        report = self.mouse_report
+        for delta in (1, 2):
+            report.buffer[1] = delta
+            self.queue.put(report, self.mouse, report.buffer)
+        self.assertEqual(self.queue.superseded, 1)
+        self.queue.drain()
+        self.assertEqual(self.mouse.reports, [b'\x00\x02\x00\x00'])
+
+    def test_retry(self):
+        self.put(KC.A)
+        self.keyboard.failures = 5
+        self.assertFalse(self.queue.drain())
+        self.assertFalse(self.queue.drain())
+        # The host hasn't seen the report yet.
+        self.assertEqual(self.report.prev_buffer, keyboard_report())
+
+        # The release is merged into the pending entry, and is delivered once
+        # the device takes reports again, however long that takes.
+        self.put()
+        while not self.queue.drain():
+            pass
+        self.assertEqual(self.keyboard.reports, [keyboard_report()])
+        self.assertEqual(self.report.prev_buffer, keyboard_report())
+        self.assertEqual(len(self.queue), 0)
+        self.assertEqual(self.queue.retries, 5)
+        self.assertEqual(self.queue.dropped, 0)
+
+        self.put(KC.B)
+        self.assertTrue(self.queue.drain())
+        self.assertEqual(self.report.prev_buffer, keyboard_report(KC.B))
+
+
+class TestReportTrace(unittest.TestCase):
+    def setUp(self):
+        self.kb = KeyboardTest([], [[KC.A, KC.B]])
+        self.trace = self.kb.keyboard._hid_helper.trace = ReportTrace(4)
+
+    def dump(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.trace.dump()
+        lines = output.getvalue().splitlines()
+        start = int(lines[1].split()[0])
+        # Make the timestamps relative.
+        return [lines[0]] + [
+            f'{int(ticks) - start} {record}'
+            for ticks, record in (line.split(' ', 1) for line in lines[1:])
+        ]
+
+    def test_dump(self):
+        self.kb.test('', [(0, True), 10, (0, False)], [{KC.A}, {}])
+        self.assertEqual(
+            self.dump(),
+            [
+                '# kmk hid trace: 4 records, 0 overwritten',
+                '0 key 0 1',
+                '0 report 01:06 0000040000000000',
+                '12 key 0 0',
+                '12 report 01:06 0000000000000000',
+            ],
+        )
+
+    def test_overwrite(self):
+        self.kb.test(
+            '',
+            [(1, True), (1, False), (0, True), (0, False)],
+            [{KC.B}, {}, {KC.A}, {}],
+        )
+        self.assertEqual(
+            self.dump(),
+            [
+                '# kmk hid trace: 4 records, 4 overwritten',
+                '0 key 0 1',
+                '0 report 01:06 0000040000000000',
+                '2 key 0 0',
+                '2 report 01:06 0000000000000000',
+            ],
+        )
+
+        self.trace.clear()
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            self.trace.dump()
+        self.assertEqual(
+            output.getvalue(), '# kmk hid trace: 0 records, 0 overwritten\n'
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 
-from kmk.keys import KC
+from kmk.keys import KC, intern_keys
 from kmk.modules.holdtap import HoldTap, HoldTapRepeat
 from kmk.modules.layers import Layers
 from tests.keyboard_test import KeyboardTest
@@ -440,3 +440,21 @@ class TestHoldTap(unittest.TestCase):
             [(3, True), (1, True), (3, False), (1, False)],
             [{KC.C}, {}, {KC.N1}, {}],
         )
+
+    def test_holdtap_interned(self):
+        t_within = self.t_within
+
+        # Identical hold-tap keys keep their own state, even if interned.
+        intern_keys()
+        keyboard = KeyboardTest(
+            [Layers(), HoldTap()],
+            [[KC.HT(KC.A, KC.LCTL), KC.HT(KC.A, KC.LCTL), KC.C]],
+            debug_enabled=False,
+        )
+        intern_keys(False)
+
+        keyboard.test(
+            'tap HT while holding an identical HT',
+            [(0, True), t_within, (1, True), t_within, (1, False), (0, False)],
+            [{KC.LCTL}, {KC.LCTL, KC.A}, {KC.LCTL}, {}],
+        )
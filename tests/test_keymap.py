@@ -0,0 +1,58 @@
+import unittest
+
+from kmk.keymap import CompiledKeymap
+from kmk.keys import KC
+from kmk.modules.layers import Layers
+from tests.keyboard_test import KeyboardTest
+
+
+class TestCompiledKeymap(unittest.TestCase):
+    def setUp(self):
+        KC.clear()
+        self.layers = Layers()
+        # Same as the output of `util/keymap_compiler.py` for:
+        # [
+        #     [KC.A, KC.B, KC.MO(1), KC.MO(2)],
+        #     [KC.N1, KC.TRNS, KC.TRNS, KC.MO(2)],
+        #     [KC.TRNS, KC.N2, KC.TRNS, KC.TRNS],
+        # ]
+        keys = (KC.A, KC.B, KC.MO(1), KC.MO(2), KC.N1, KC.TRNS, KC.N2)
+        layers = (b'\x00\x01\x02\x03', b'\x04\x05\x05\x03', b'\x05\x06\x05\x05')
+        resolved = (b'\x00\x01\x02\x03', b'\x04\x01\x02\x03', b'\x00\x06\x02\x03')
+        self.keymap = CompiledKeymap(keys, layers, resolved)
+        self.kb = KeyboardTest([self.layers], self.keymap)
+
+    def test_layers(self):
+        self.assertEqual(len(self.keymap), 3)
+        self.assertEqual(list(self.keymap[1])[:3], [KC.N1, KC.TRNS, KC.TRNS])
+        self.assertIs(self.keymap[2][1], KC.N2)
+        self.assertIsNone(self.keymap.resolved([2, 1, 0]))
+        self.assertIsNone(self.keymap.resolved([1, 2]))
+
+    def test_incomplete(self):
+        with self.assertRaises(ValueError):
+            CompiledKeymap((KC.A, None), (b'\x00\x01',), (b'\x00\x01',))
+
+    def test_resolved(self):
+        keyboard = self.kb.keyboard
+        keyboard.active_layers = [1, 0]
+        self.assertIs(keyboard._find_key_in_map(1), KC.B)
+        self.assertIs(keyboard._resolved_keys, self.keymap.resolved_layers[1])
+
+        # Not precomputed, resolved key by key.
+        keyboard.active_layers = [2, 1, 0]
+        self.assertIs(keyboard._find_key_in_map(0), KC.N1)
+        self.assertIs(keyboard._find_key_in_map(1), KC.N2)
+        self.assertIsInstance(keyboard._resolved_keys, list)
+
+    def test_momentary_layers(self):
+        self.kb.test(
+            'MO(1), MO(2)',
+            [(2, True), (0, True), (0, False), (3, True), (0, True), (1, True)],
+            [{KC.N1}, {}, {KC.N1}, {KC.N1, KC.N2}],
+        )
+        self.kb.test(
+            'release',
+            [(3, False), (2, False), (1, False), (0, False)],
+            [{KC.N1}, {}],
+        )
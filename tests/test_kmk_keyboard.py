@@ -1,7 +1,73 @@
 import unittest
 
+from kmk import scheduler
+from kmk.extensions import Extension
 from kmk.keys import KC
+from kmk.kmk_keyboard import KeyBuffer
+from kmk.kmktime import ticks_diff
+from kmk.modules import Module
+from kmk.modules.layers import Layers
+from kmk.modules.power import Power
+from kmk.modules.split import Split, SplitType
 from tests.keyboard_test import KeyboardTest
+from tests.mocks import clock
+
+
+class PendingScanner:
+    '''
+    Has events pending after `after_ms`. Every check advances the virtual
+    clock, so that sleeping always ends.
+    '''
+
+    def __init__(self, after_ms):
+        self.after_ms = after_ms
+        self.checks = 0
+
+    @property
+    def events_pending(self):
+        self.checks += 1
+        clock.advance(1)
+        return self.checks > self.after_ms
+
+
+class ScanWatcher(Module):
+    def __init__(self):
+        self.updates = []
+
+    def during_bootup(self, keyboard):
+        return
+
+    def after_matrix_scan(self, keyboard):
+        update = keyboard.matrix_update
+        if update is None:
+            self.updates.append(None)
+        else:
+            self.updates.append((update.key_number, update.pressed))
+
+
+class HookedLayers(Layers):
+    def __init__(self):
+        super().__init__()
+        self.hooks = []
+
+    def before_matrix_scan(self, keyboard):
+        super().before_matrix_scan(keyboard)
+        self.hooks.append('before_matrix_scan')
+
+    def after_hid_send(self, keyboard):
+        super().after_hid_send(keyboard)
+        self.hooks.append('after_hid_send')
+
+
+class LayerWatcher(Extension):
+    def __init__(self):
+        self.layers = []
+
+    def during_bootup(self, keyboard):
+        return
+
+    def on_layers_changed(self, sandbox):
+        self.layers.append(sandbox.active_layers)
 
 
 class TestKmkKeyboard(unittest.TestCase):
@@ -10,6 +76,266 @@ class TestKmkKeyboard(unittest.TestCase):
 
         keyboard.test('Simple key press', [(0, True), (0, False)], [{KC.N1}, {}])
 
+    def test_find_key_in_map(self):
+        keyboard = KeyboardTest(
+            [],
+            [
+                [KC.N1, KC.N2, KC.N3, KC.N4],
+                [KC.A, KC.TRNS, KC.C, KC.TRNS],
+            ],
+        ).keyboard
+        keyboard.coord_mapping = (3, 2, 1, 0)
+        keyboard._init_coord_mapping()
+
+        self.assertIs(keyboard._find_key_in_map(3), KC.N1)
+        self.assertIs(keyboard._find_key_in_map(0), KC.N4)
+        self.assertIsNone(keyboard._find_key_in_map(4))
+
+        keyboard.active_layers.insert(0, 1)
+        self.assertIs(keyboard._find_key_in_map(3), KC.A)
+        self.assertIs(keyboard._find_key_in_map(2), KC.N2)
+
+        keyboard.active_layers.remove(1)
+        self.assertIs(keyboard._find_key_in_map(3), KC.N1)
+
+    def test_find_key_in_map_duplicate_coord(self):
+        keyboard = KeyboardTest([], [[KC.N1, KC.N2, KC.N3, KC.N4]]).keyboard
+        keyboard.coord_mapping = (0, 1, 1, 2)
+        keyboard._init_coord_mapping()
+
+        self.assertIs(keyboard._find_key_in_map(1), KC.N2)
+        self.assertIs(keyboard._find_key_in_map(2), KC.N4)
+
+    def test_keymap_change(self):
+        keyboard = KeyboardTest([], [[KC.N1, KC.N2], [KC.A, KC.TRNS]]).keyboard
+        self.assertIs(keyboard._find_key_in_map(1), KC.N2)
+
+        keyboard.keymap[0][1] = KC.B
+        keyboard.invalidate_keymap_cache()
+        self.assertIs(keyboard._find_key_in_map(1), KC.B)
+
+        keyboard.keymap = [[KC.C, KC.D]]
+        keyboard.invalidate_keymap_cache()
+        self.assertIs(keyboard._find_key_in_map(0), KC.C)
+        self.assertIs(keyboard._find_key_in_map(1), KC.D)
+
+    def _chord(self, batch):
+        # Returns the number of main loop cycles and HID reports it takes for
+        # a four key chord to be reported.
+        keyboard = KeyboardTest([], [[KC.A, KC.B, KC.C, KC.D]])
+        keyboard.keyboard.matrix_update_batch = batch
+        reports = keyboard.keyboard._hid_helper.devices[0].reports
+
+        for pin in keyboard.pins:
+            pin.value = True
+
+        cycles = 0
+        while not reports or len({code for code in reports[-1][2:] if code}) < 4:
+            keyboard.do_main_loop()
+            cycles += 1
+            self.assertLess(cycles, 100)
+        chord = (cycles, len(reports))
+
+        for pin in keyboard.pins:
+            pin.value = False
+        for _ in range(4):
+            keyboard.do_main_loop()
+
+        return chord
+
+    def test_chord_cycles_to_report(self):
+        self.assertEqual(self._chord(1), (4, 4))
+        self.assertEqual(self._chord(4), (1, 1))
+        self.assertEqual(self._chord(2), (2, 2))
+
+    def test_batch_mixed_press_release(self):
+        keyboard = KeyboardTest([], [[KC.A, KC.B, KC.C, KC.D]])
+        keyboard.keyboard.matrix_update_batch = 4
+        reports = keyboard.keyboard._hid_helper.devices[0].reports
+
+        keyboard.pins[0].value = True
+        keyboard.do_main_loop()
+        keyboard.pins[0].value = False
+        keyboard.pins[1].value = True
+        keyboard.do_main_loop()
+        keyboard.pins[1].value = False
+        keyboard.do_main_loop()
+
+        self.assertEqual(
+            [{code for code in report[2:] if code} for report in reports],
+            [{KC.A.code}, set(), {KC.B.code}, set()],
+        )
+
+    def test_batch_after_matrix_scan(self):
+        watcher = ScanWatcher()
+        keyboard = KeyboardTest([watcher], [[KC.A, KC.B, KC.C, KC.D]])
+        keyboard.keyboard.matrix_update_batch = 4
+
+        keyboard.do_main_loop()
+        self.assertEqual(watcher.updates, [None])
+
+        # Once per scanned event, up to the size of the batch.
+        watcher.updates.clear()
+        for pin in keyboard.pins:
+            pin.value = True
+        keyboard.do_main_loop()
+        self.assertEqual(watcher.updates, [(0, True), (1, True), (2, True), (3, True)])
+
+        watcher.updates.clear()
+        keyboard.pins[1].value = False
+        keyboard.do_main_loop()
+        self.assertEqual(watcher.updates, [(1, False), None])
+
+        for pin in keyboard.pins:
+            pin.value = False
+        keyboard.do_main_loop()
+
+    def test_batch_split(self):
+        split = Split(split_type=SplitType.UART)
+        split.during_bootup = lambda keyboard: None
+        split._is_target = False
+        sent = []
+        split._send_uart = lambda update: sent.append(
+            (update.key_number, update.pressed)
+        )
+        keyboard = KeyboardTest([split], [[KC.A, KC.B, KC.C]])
+        keyboard.keyboard.matrix_update_batch = 4
+
+        for pin in keyboard.pins:
+            pin.value = True
+        keyboard.do_main_loop()
+        self.assertEqual(sent, [(0, True), (1, True), (2, True)])
+
+        for pin in keyboard.pins:
+            pin.value = False
+        keyboard.do_main_loop()
+
+    def test_batch_power(self):
+        power = Power()
+        power.during_bootup = lambda keyboard: None
+        keyboard = KeyboardTest([power], [[KC.A, KC.B, KC.C]])
+        keyboard.keyboard.matrix_update_batch = 4
+
+        power._powersave_start = 0
+        for pin in keyboard.pins:
+            pin.value = True
+        keyboard.do_main_loop()
+        self.assertNotEqual(power._powersave_start, 0)
+
+        for pin in keyboard.pins:
+            pin.value = False
+        keyboard.do_main_loop()
+
+    def test_super_hooks(self):
+        layers = HookedLayers()
+        keyboard = KeyboardTest([layers], [[KC.A]])
+        keyboard.do_main_loop()
+        self.assertEqual(layers.hooks, ['before_matrix_scan', 'after_hid_send'])
+
+    def test_key_buffer(self):
+        buffer = KeyBuffer(4)
+
+        def pop():
+            ksf = buffer.popleft()
+            return ksf.key, ksf.is_pressed, ksf.int_coord, ksf.index
+
+        for i in range(3):
+            buffer.append(KC.A, True, i, 0)
+        self.assertEqual(pop(), (KC.A, True, 0, 0))
+
+        # Wrap around and move the new events in front of the remaining ones.
+        buffer.append(KC.B, False, None, 1)
+        buffer.append(KC.C, True, None, 2)
+        buffer.rotate(2)
+        self.assertEqual(len(buffer), 4)
+
+        # Overflowing grows the buffer, nothing is dropped.
+        buffer.append(KC.D, True, None, 3)
+        self.assertEqual(buffer.overflows, 1)
+        self.assertEqual(len(buffer), 5)
+        buffer.rotate(1)
+
+        self.assertEqual(
+            [pop() for _ in range(5)],
+            [
+                (KC.D, True, None, 3),
+                (KC.B, False, None, 1),
+                (KC.C, True, None, 2),
+                (KC.A, True, 1, 0),
+                (KC.A, True, 2, 0),
+            ],
+        )
+        self.assertFalse(buffer)
+        self.assertRaises(IndexError, buffer.popleft)
+
+    def test_idle_ms(self):
+        keyboard = KeyboardTest([], [[KC.A, KC.B]]).keyboard
+        keyboard.idle_latency_ms = 20
+        self.assertEqual(keyboard._idle_ms(), 20)
+
+        task = scheduler.create_task(lambda: None, after_ms=5)
+        self.assertEqual(keyboard._idle_ms(), 5)
+        scheduler.cancel_task(task)
+
+        task = scheduler.create_task(lambda: None, after_ms=50)
+        self.assertEqual(keyboard._idle_ms(), 20)
+        scheduler.cancel_task(task)
+
+        keyboard.hid_pending = True
+        self.assertEqual(keyboard._idle_ms(), 0)
+        keyboard.hid_pending = False
+
+        keyboard._resume_buffer.append(KC.A, True, None, 0)
+        self.assertEqual(keyboard._idle_ms(), 0)
+        keyboard._resume_buffer.clear()
+
+        # Reports queued for the next USB poll.
+        hid = keyboard._hid_helper
+        hid.poll_interval_ms = 8
+        keyboard.keys_pressed.add(KC.A)
+        keyboard._send_hid()
+        keyboard.keys_pressed.discard(KC.A)
+        keyboard._send_hid()
+        self.assertEqual(hid.reports_queued, 1)
+        self.assertEqual(keyboard._idle_ms(), 8)
+        hid.send(flush=True)
+        hid.poll_interval_ms = 0
+
+        # Events pending in a background scanner cut sleep short.
+        keyboard.matrix = (PendingScanner(after_ms=5),)
+        start = clock.ticks_ms()
+        keyboard._idle()
+        self.assertEqual(ticks_diff(clock.ticks_ms(), start), 6)
+
+        keyboard.matrix = (PendingScanner(after_ms=100),)
+        start = clock.ticks_ms()
+        keyboard._idle()
+        self.assertEqual(ticks_diff(clock.ticks_ms(), start), 20)
+
+    def test_layers_changed(self):
+        watcher = LayerWatcher()
+        layers = Layers()
+        kb = KeyboardTest(
+            [layers], [[KC.MO(1), KC.A], [KC.TRNS, KC.B]], extensions=[watcher]
+        )
+        sandbox = kb.keyboard.sandbox
+
+        kb.do_main_loop()
+        snapshot = sandbox.active_layers
+        version = sandbox.active_layers_version
+        self.assertEqual(snapshot, [0])
+
+        # Unchanged layers: no copy, no notification.
+        kb.do_main_loop()
+        kb.do_main_loop()
+        self.assertIs(sandbox.active_layers, snapshot)
+        self.assertEqual(sandbox.active_layers_version, version)
+
+        kb.test('', [(0, True), (1, True), (1, False), (0, False)], [{KC.B}, {}])
+        self.assertEqual(sandbox.active_layers_version, version + 2)
+        self.assertEqual(watcher.layers[-2:], [[1, 0], [0]])
+        self.assertEqual(snapshot, [0])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,6 +1,18 @@
 import unittest
 
-from kmk.keys import KC, Key, KeyboardKey, ModifiedKey, ModifierKey, make_key
+from kmk.keys import (
+    _KEY_TABLES,
+    KC,
+    Key,
+    KeyboardKey,
+    ModifiedKey,
+    ModifierKey,
+    intern_keys,
+    make_key,
+)
+from kmk.modules.holdtap import HoldTap
+from kmk.modules.layers import Layers
+from kmk.modules.macros import Macros
 from tests.keyboard_test import KeyboardTest
 
 
@@ -194,6 +206,68 @@ class TestKeys_dot(unittest.TestCase):
         created = make_key(names=('ThIs_Is_A_StRaNgE_kEy',))
         assert created is KC.get('ThIs_Is_A_StRaNgE_kEy')
 
+    def test_standard_names(self):
+        for _, table in _KEY_TABLES:
+            for _, names in table:
+                key = KC[names[-1]]
+                for name in names:
+                    assert KC[name] is key, name
+
+    def test_override_standard_key(self):
+        created = make_key(names=('A',))
+        assert KC.A is created
+        assert KC.a is not created
+        assert KC.a.code == 4
+        assert KC.A is created
+
+    def test_compact_attributes(self):
+        # Defaults live on the class, instances only carry what differs.
+        assert vars(Key()) == {}
+        assert vars(KC.A) == {'code': 4}
+
+        def on_press(*args):
+            pass
+
+        key = Key(on_press=on_press)
+        assert vars(key) == {'_on_press': on_press}
+        assert key._on_release is not None
+
+
+class TestKeys_interned(unittest.TestCase):
+    def setUp(self):
+        KC.clear()
+        HoldTap()
+        Layers()
+        Macros()
+
+    def tearDown(self):
+        intern_keys(False)
+
+    def test_disabled(self):
+        assert KC.LSFT(KC.A) is not KC.LSFT(KC.A)
+        assert KC.MO(1) is not KC.MO(1)
+
+    def test_modified_keys(self):
+        intern_keys()
+        assert KC.LSFT(KC.A) is KC.LSFT(KC.A)
+        assert KC.LSFT(KC.A) is not KC.LSFT(KC.B)
+        assert KC.LSFT(KC.A) is not KC.RSFT(KC.A)
+        assert KC.LCTL(KC.LSFT(KC.A)) is KC.LCTL(KC.LSFT(KC.A))
+
+    def test_argumented_keys(self):
+        intern_keys()
+        assert KC.MO(1) is KC.MO(1)
+        assert KC.MO(1) is not KC.MO(2)
+        assert KC.LT(1, KC.MO(2)) is not KC.LT(1, KC.MO(2))
+        assert KC.LT(1, KC.MO(2)).tap is KC.LT(1, KC.MO(2)).tap
+
+    def test_stateful_keys(self):
+        intern_keys()
+        assert KC.MACRO('a') is not KC.MACRO('a')
+        # HoldTap keeps the state of its keys by key instance.
+        assert KC.HT(KC.A, KC.LCTL) is not KC.HT(KC.A, KC.LCTL)
+        assert KC.LT(1, KC.A) is not KC.LT(1, KC.A)
+
 
 class TestKeys_index(unittest.TestCase):
     def setUp(self):
@@ -152,5 +152,55 @@ class TestLayers(unittest.TestCase):
         self.kb.test('', [(1, True), (1, False)], [{}])
 
 
+class TestComboLayers(unittest.TestCase):
+    def setUp(self):
+        layers = Layers(combo_layers={(1, 2, 3): 5, (1, 2): 4})
+        # Every layer sends its own number on the last key.
+        keymap = [[KC.MO(1), KC.MO(2), KC.MO(3), KC.TG(2), KC.N0]]
+        for layer in range(1, 6):
+            keymap.append([KC.TRNS] * 4 + [KC[f'N{layer}']])
+        self.kb = KeyboardTest(
+            [layers],
+            keymap,
+            debug_enabled=False,
+        )
+
+    def test_combo(self):
+        self.kb.test('', [(0, True), (1, True), (4, True), (4, False)], [{KC.N4}, {}])
+        self.assertEqual(self.kb.keyboard.active_layers, [4, 2, 1, 0])
+        self.assertEqual(self.kb.keyboard.active_layers_mask, 0b10111)
+        self.kb.test('', [(0, False), (4, True), (4, False)], [{KC.N2}, {}])
+        self.assertEqual(self.kb.keyboard.active_layers, [2, 0])
+        self.kb.test('', [(1, False)], [])
+        self.assertEqual(self.kb.keyboard.active_layers_mask, 0b1)
+
+    def test_precedence(self):
+        self.kb.test('', [(0, True), (1, True), (2, True)], [])
+        self.assertEqual(self.kb.keyboard.active_layers, [3, 4, 2, 1, 0])
+        self.kb.test('', [(1, False), (2, False), (0, False)], [])
+        self.assertEqual(self.kb.keyboard.active_layers, [0])
+
+        self.kb.test('', [(2, True), (0, True), (1, True), (4, True)], [{KC.N5}])
+        self.assertEqual(self.kb.keyboard.active_layers, [5, 2, 1, 3, 0])
+        self.kb.test('', [(0, False), (4, False)], [{}])
+        self.assertEqual(self.kb.keyboard.active_layers, [2, 3, 0])
+        self.kb.test('', [(1, False), (2, False)], [])
+
+    def test_toggle(self):
+        self.kb.test('', [(3, True), (3, False), (0, True)], [])
+        self.assertEqual(self.kb.keyboard.active_layers, [4, 1, 2, 0])
+        self.kb.test('', [(3, True), (3, False)], [])
+        self.assertEqual(self.kb.keyboard.active_layers, [1, 0])
+        self.kb.test('', [(0, False)], [])
+        self.assertEqual(self.kb.keyboard.active_layers_mask, 0b1)
+
+    def test_toggle_external_change(self):
+        # Layers changed behind the back of the module, i.e. by a macro.
+        self.kb.keyboard.active_layers.insert(0, 2)
+        self.assertEqual(self.kb.keyboard.active_layers_mask, 0b101)
+        self.kb.test('', [(3, True), (3, False)], [])
+        self.assertEqual(self.kb.keyboard.active_layers, [0])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -222,7 +222,7 @@ class TestMacro(unittest.TestCase):
     def test_11_0(self):
         self.kb.test(
             '',
-            [(11, True), 2 * self.hold, (11, False)],
+            [(11, True), (3 * self.hold) // 2, (11, False)],
             [{KC.P}, {}, {KC.H}, {}, {KC.H}, {}, {KC.R}, {}],
         )
 
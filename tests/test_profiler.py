@@ -0,0 +1,84 @@
+import unittest
+
+from kmk import scheduler
+from kmk.keys import KC
+from kmk.modules import Module
+from kmk.modules.holdtap import HoldTap
+from kmk.modules.layers import Layers
+from kmk.modules.profiler import PHASES, Histogram, Profiler
+from tests.keyboard_test import KeyboardTest
+
+
+class Hook(Module):
+    def during_bootup(self, keyboard):
+        return
+
+    def after_hid_send(self, keyboard):
+        return
+
+
+class TestProfiler(unittest.TestCase):
+    def test_histogram(self):
+        histogram = Histogram(4)
+        for us in (0, 1, 2, 3, 7, 8, 1000):
+            histogram.add(us)
+
+        self.assertEqual(histogram.counts, [1, 1, 2, 3])
+        self.assertEqual(histogram.n, 7)
+        self.assertEqual(histogram.max_us, 1000)
+        self.assertEqual(histogram.total_us, 1021)
+
+        histogram.reset()
+        self.assertEqual(histogram.counts, [0, 0, 0, 0])
+        self.assertEqual(histogram.n, 0)
+
+    def test_profiler(self):
+        profiler = Profiler()
+        keyboard = KeyboardTest(
+            [Layers(), Hook(), profiler],
+            [[KC.A, KC.MO(1), KC.PROF_RESET], [KC.B, KC.TRNS, KC.NO]],
+        )
+
+        keyboard.test(
+            'keys still work',
+            [(1, True), (0, True), (0, False), (1, False)],
+            [{KC.B}, {}],
+        )
+
+        histograms = profiler.histograms
+        for phase in PHASES:
+            self.assertIn(phase, histograms)
+        self.assertIn('MatrixScanner.scan', histograms)
+        self.assertIn('Hook.after_hid_send', histograms)
+        self.assertNotIn('Layers.before_matrix_scan', histograms)
+
+        loops = histograms['_main_loop'].n
+        self.assertGreater(loops, 0)
+        self.assertEqual(sum(histograms['_main_loop'].counts), loops)
+        self.assertEqual(histograms['before_hid_send'].n, loops)
+        self.assertEqual(histograms['Hook.after_hid_send'].n, loops)
+
+        keyboard.test('reset', [(2, True), (2, False)], [])
+        self.assertLess(histograms['_main_loop'].n, loops)
+        profiler.dump()
+
+    def test_scheduler_stats(self):
+        profiler = Profiler(scheduler_stats=True)
+        self.addCleanup(scheduler.disable_stats)
+        keyboard = KeyboardTest(
+            [HoldTap(), profiler], [[KC.HT(KC.A, KC.LCTL), KC.PROF_RESET]]
+        )
+        stats = scheduler._stats
+        self.assertIs(scheduler._task_queue, stats)
+
+        keyboard.test('hold', [(0, True), 400, (0, False)], [{KC.LCTL}, {}])
+        self.assertEqual(stats.peak_depth, 1)
+        self.assertEqual(stats.lateness.n, 1)
+        profiler.dump()
+
+        keyboard.test('reset', [(1, True), (1, False)], [])
+        self.assertEqual(stats.lateness.n, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
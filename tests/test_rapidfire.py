@@ -6,7 +6,7 @@ from tests.keyboard_test import KeyboardTest
 
 t_interval = 4 * KeyboardTest.loop_delay_ms
 t_timeout = 10 * KeyboardTest.loop_delay_ms
-t_hold = t_timeout + 5 * t_interval + KeyboardTest.loop_delay_ms
+t_hold = t_timeout + (9 * t_interval) // 2
 
 
 class TestKeyRepeat(unittest.TestCase):
@@ -0,0 +1,106 @@
+import digitalio
+
+import unittest
+
+from kmk.scanners import DiodeOrientation
+from kmk.scanners.digitalio import MatrixScanner
+
+
+class DigitalInOut:
+    '''
+    Pin of a `Matrix`: inputs read the keys pressed on the output that's
+    currently driven.
+    '''
+
+    def __init__(self, matrix, index):
+        self.matrix = matrix
+        self.index = index
+        self.output = False
+
+    def switch_to_output(self, *args, **kwargs):
+        self.output = True
+
+    def switch_to_input(self, *args, **kwargs):
+        self.output = False
+
+    @property
+    def value(self):
+        self.matrix.reads += 1
+        return (self.matrix.driven, self.index) in self.matrix.pressed
+
+    @value.setter
+    def value(self, value):
+        self.matrix.driven = self.index if value else None
+
+
+class Matrix:
+    '''Columns to rows, with pull-downs: columns are driven, rows are read.'''
+
+    def __init__(self, cols, rows, **kwargs):
+        self.pressed = set()
+        self.driven = None
+        self.reads = 0
+        self.event = None
+        self.scanner = MatrixScanner(
+            cols=[DigitalInOut(self, i) for i in range(cols)],
+            rows=[DigitalInOut(self, i) for i in range(rows)],
+            diode_orientation=DiodeOrientation.COL2ROW,
+            pull=digitalio.Pull.DOWN,
+            **kwargs,
+        )
+
+    def scan(self):
+        event = self.event = self.scanner.scan_for_changes()
+        if event is None:
+            return None
+        return (event.key_number, event.pressed)
+
+
+class TestDigitalioMatrixScanner(unittest.TestCase):
+    def test_single_change(self):
+        matrix = Matrix(3, 2)
+        matrix.pressed.update(((2, 1), (0, 0), (1, 1)))
+        self.assertEqual(matrix.scan(), (0, True))
+        self.assertEqual(matrix.scan(), (4, True))
+        self.assertEqual(matrix.scan(), (5, True))
+        self.assertIsNone(matrix.scan())
+        self.assertFalse(matrix.scanner.events_pending)
+
+    def test_full_scan(self):
+        matrix = Matrix(3, 2, full_scan=True)
+        matrix.pressed.update(((2, 1), (0, 0), (1, 1)))
+        self.assertEqual(matrix.scan(), (0, True))
+        self.assertEqual(matrix.reads, 6)
+        self.assertTrue(matrix.scanner.events_pending)
+
+        # Queued events come out without scanning again.
+        matrix.pressed.clear()
+        self.assertEqual(matrix.scan(), (4, True))
+        self.assertIs(matrix.event.pressed, True)
+        self.assertEqual(matrix.scan(), (5, True))
+        self.assertEqual(matrix.reads, 6)
+        self.assertFalse(matrix.scanner.events_pending)
+
+        self.assertEqual(matrix.scan(), (0, False))
+        self.assertIs(matrix.event.pressed, False)
+        self.assertEqual(matrix.scan(), (4, False))
+        self.assertEqual(matrix.scan(), (5, False))
+        self.assertEqual(matrix.reads, 12)
+        self.assertIsNone(matrix.scan())
+
+    def test_full_scan_every_key(self):
+        matrix = Matrix(3, 2, full_scan=True, offset=10)
+        # Column by column.
+        scan_order = (10, 13, 11, 14, 12, 15)
+        for _ in range(2):
+            matrix.pressed.update((col, row) for col in range(3) for row in range(2))
+            events = [matrix.scan() for _ in range(6)]
+            self.assertEqual(events, [(n, True) for n in scan_order])
+            matrix.pressed.clear()
+            events = [matrix.scan() for _ in range(6)]
+            self.assertEqual(events, [(n, False) for n in scan_order])
+            self.assertIsNone(matrix.scan())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,10 @@
-import time
+import contextlib
+import io
 import unittest
 
 from kmk import scheduler
+from kmk.timer_wheel import TimerWheel
+from tests.mocks import clock
 
 
 class TestScheduler(unittest.TestCase):
@@ -9,12 +12,15 @@ class TestScheduler(unittest.TestCase):
         self._t_count += 1
 
     def _task_loop(self, duration):
-        until = time.time_ns() + 1_000_000 * duration
-        while time.time_ns() < until:
+        # Run due tasks on every tick from now until now + duration.
+        for ms in range(duration + 1):
+            if ms:
+                clock.advance(1)
             for t in scheduler.get_due_task():
                 t()
 
     def setUp(self):
+        clock.virtual = True
         self._t_count = 0
         scheduler._task_queue = scheduler.TaskQueue()
 
@@ -86,6 +92,268 @@ class TestScheduler(unittest.TestCase):
         t = scheduler.create_task(self._task)
         self.assertIsInstance(t, scheduler.Task)
 
+    def test_timer(self):
+        args = []
+        timer = scheduler.Timer(args.append, 'a')
+        timer.start(2)
+        self.assertTrue(timer.active)
+        self._task_loop(1)
+        self.assertEqual(args, [])
+        self._task_loop(1)
+        self.assertEqual(args, ['a'])
+        self.assertFalse(timer.active)
+
+    def test_timer_restart(self):
+        args = []
+        timer = scheduler.Timer(args.append, 'a')
+        timer.start(2)
+        self._task_loop(1)
+        timer.start(2)
+        self._task_loop(1)
+        self.assertEqual(args, [])
+        self._task_loop(1)
+        self.assertEqual(args, ['a'])
+        self.assertIsNone(scheduler._task_queue.peek())
+
+    def test_timer_retarget(self):
+        args = []
+        timer = scheduler.Timer(self._task)
+        timer.start(1, args.append, 'b')
+        self._task_loop(1)
+        self.assertEqual(self._t_count, 0)
+        self.assertEqual(args, ['b'])
+
+        timer.start(1)
+        timer.start(1, arg=None)
+        self._task_loop(1)
+        self.assertEqual(args, ['b', None])
+
+    def test_timer_cancel(self):
+        timer = scheduler.Timer(self._task)
+        timer.cancel()
+        timer.start(1)
+        timer.cancel()
+        self.assertFalse(timer.active)
+        timer.start(2)
+        scheduler.cancel_task(timer)
+        self._task_loop(2)
+        self.assertEqual(self._t_count, 0)
+        self.assertIsNone(scheduler._task_queue.peek())
+
+
+class TestPriority(unittest.TestCase):
+    def setUp(self):
+        clock.virtual = True
+        scheduler._task_queue = scheduler.TaskQueue()
+        scheduler._background.clear()
+        self.order = []
+
+    def task(self, name, duration=0):
+        def task():
+            self.order.append(name)
+            clock.advance(duration)
+
+        return task
+
+    def test_critical_first(self):
+        scheduler.create_task(
+            self.task('bg'), after_ms=1, priority=scheduler.Priority.BACKGROUND
+        )
+        scheduler.create_task(self.task('a'), after_ms=2)
+        clock.advance(2)
+        scheduler.run_due_tasks()
+        self.assertEqual(self.order, ['a', 'bg'])
+
+    def test_budget(self):
+        for name in ('bg1', 'bg2', 'bg3'):
+            scheduler.create_task(
+                self.task(name, 3), after_ms=1, priority=scheduler.Priority.BACKGROUND
+            )
+        scheduler.create_task(self.task('a'), after_ms=3)
+        clock.advance(1)
+        scheduler.run_due_tasks()
+        # 'a' became due while 'bg1' ran.
+        self.assertEqual(self.order, ['bg1', 'a'])
+        self.assertEqual(scheduler.next_deadline(), 0)
+
+        scheduler.run_due_tasks()
+        self.assertEqual(self.order, ['bg1', 'a', 'bg2'])
+
+        scheduler.background_budget_ms = 10
+        self.addCleanup(setattr, scheduler, 'background_budget_ms', 2)
+        for t in scheduler.get_due_task():
+            t()
+        self.assertEqual(self.order, ['bg1', 'a', 'bg2', 'bg3'])
+        self.assertIsNone(scheduler.next_deadline())
+
+    def test_cancel_deferred(self):
+        background = [
+            scheduler.create_task(
+                self.task(name, 3), period_ms=5, priority=scheduler.Priority.BACKGROUND
+            )
+            for name in ('bg1', 'bg2')
+        ]
+
+        def cancel():
+            scheduler.cancel_task(background[1])
+
+        scheduler.create_task(cancel, after_ms=2)
+        clock.advance(1)
+        scheduler.run_due_tasks()
+        self.assertEqual(self.order, ['bg1'])
+        clock.advance(10)
+        scheduler.cancel_task(background[0])
+        scheduler.run_due_tasks()
+        self.assertEqual(self.order, ['bg1'])
+        self.assertIsNone(scheduler.next_deadline())
+        self.assertEqual(scheduler._background, set())
+
+    def test_background_set(self):
+        periodic = scheduler.create_task(
+            self.task('p'), period_ms=5, priority=scheduler.Priority.BACKGROUND
+        )
+        once = scheduler.create_task(
+            self.task('bg'), after_ms=1, priority=scheduler.Priority.BACKGROUND
+        )
+        clock.advance(1)
+        scheduler.run_due_tasks()
+        self.assertEqual(self.order, ['p', 'bg'])
+        # Only the periodic task is still scheduled in the background.
+        self.assertEqual(scheduler._background, {periodic._task})
+
+        # Rescheduled without a priority, a task is critical.
+        scheduler.create_task(once, after_ms=1)
+        self.assertEqual(scheduler._background, {periodic._task})
+        scheduler.cancel_task(periodic)
+        self.assertEqual(scheduler._background, set())
+
+
+class TestTimerWheel(TestScheduler):
+    # Runs all tests of the pairing heap on a small wheel, plus some more.
+
+    def setUp(self):
+        super().setUp()
+        scheduler.use_timer_wheel(slots=8)
+
+    def tearDown(self):
+        scheduler.use_pairing_heap()
+
+    def test_later_turn(self):
+        args = []
+        timer = scheduler.Timer(args.append, 'a')
+        timer.start(20)
+        self._task_loop(19)
+        self.assertEqual(args, [])
+        self._task_loop(1)
+        self.assertEqual(args, ['a'])
+
+    def test_order(self):
+        order = []
+        timers = [scheduler.Timer(order.append, n) for n in range(3)]
+        timers[0].start(12)
+        timers[1].start(4)
+        timers[2].start(4)
+        self.assertEqual(scheduler.next_deadline(), 4)
+        timers[1].start(13)
+        self.assertEqual(scheduler.next_deadline(), 4)
+        timers[2].cancel()
+        self.assertEqual(scheduler.next_deadline(), 12)
+        # Skip more than a turn of the wheel at once.
+        clock.advance(20)
+        scheduler.run_due_tasks()
+        self.assertEqual(order, [0, 1])
+        self.assertIsNone(scheduler.next_deadline())
+
+    def test_use_timer_wheel(self):
+        scheduler.use_pairing_heap()
+        scheduler.create_task(self._task, after_ms=2)
+        scheduler.create_task(self._task, period_ms=3)
+        scheduler.use_timer_wheel()
+        self.assertIsInstance(scheduler._task_queue, TimerWheel)
+        self._task_loop(6)
+        self.assertEqual(self._t_count, 4)
+
+    def test_slots(self):
+        with self.assertRaises(ValueError):
+            TimerWheel(100)
+
+
+class TestSchedulerStats(unittest.TestCase):
+    def setUp(self):
+        clock.virtual = True
+        scheduler._task_queue = scheduler.TaskQueue()
+        scheduler.enable_stats(buckets=4)
+        self.stats = scheduler._stats
+
+    def tearDown(self):
+        scheduler.disable_stats()
+
+    def test_lateness(self):
+        timers = [scheduler.Timer(bool) for _ in range(3)]
+        for timer in timers:
+            timer.start(1)
+        timers[2].cancel()
+        self.assertEqual(self.stats.peak_depth, 3)
+
+        clock.advance(4)
+        scheduler.run_due_tasks()
+        self.assertEqual(self.stats.lateness.n, 2)
+        self.assertEqual(self.stats.lateness.max, 3)
+        self.assertEqual(self.stats.lateness.counts, [0, 0, 2, 0])
+        self.assertEqual(len(self.stats.pending), 0)
+        self.assertIsNone(scheduler._task_queue.peek())
+
+    def test_deferred_lateness(self):
+        for _ in range(2):
+            scheduler.create_task(
+                lambda: clock.advance(3),
+                after_ms=1,
+                priority=scheduler.Priority.BACKGROUND,
+            )
+        clock.advance(1)
+        scheduler.run_due_tasks()
+        self.assertEqual(self.stats.lateness.n, 1)
+        # Counted once, when it ran a cycle later.
+        scheduler.run_due_tasks()
+        self.assertEqual(self.stats.lateness.n, 2)
+        self.assertEqual(self.stats.lateness.max, 3)
+
+    def test_periodic(self):
+        calls = []
+        t = scheduler.create_task(
+            lambda: calls.append(1), period_ms=2, owner='owner', after_ms=2
+        )
+        for _ in range(3):
+            clock.advance(3)
+            scheduler.run_due_tasks()
+        scheduler.cancel_task(t)
+        self.assertEqual(len(calls), 4)
+
+        owner = self.stats.owners['owner']
+        self.assertEqual(owner.lateness.n, 4)
+        self.assertEqual(owner.duration.n, 4)
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            scheduler.dump_stats()
+        self.assertIn('peak=1', output.getvalue())
+        self.assertIn('owner: lateness: n=4', output.getvalue())
+
+        scheduler.reset_stats()
+        self.assertEqual(self.stats.owners, {})
+        self.assertEqual(self.stats.peak_depth, 0)
+
+    def test_use_timer_wheel(self):
+        scheduler.Timer(bool).start(5)
+        scheduler.use_timer_wheel()
+        self.assertIs(scheduler._task_queue, self.stats)
+        self.assertIsInstance(self.stats.queue, TimerWheel)
+        self.assertEqual(len(self.stats.pending), 1)
+        clock.advance(5)
+        scheduler.run_due_tasks()
+        self.assertEqual(self.stats.lateness.n, 1)
+        scheduler.use_pairing_heap()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,51 @@
+'''
+Load the keyboard of a board's main.py on the host, with the hardware mocked
+out. Shared by the tools in util/.
+'''
+
+import runpy
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root))
+
+# CircuitPython modules used by board definitions, on top of the test mocks.
+HARDWARE = (
+    'adafruit_display_text',
+    'adafruit_pixelbuf',
+    'board',
+    'displayio',
+    'pwmio',
+    'rotaryio',
+    'rp2pio',
+    'terminalio',
+)
+
+
+def init_mocks():
+    '''Install the mocks, has to be called before anything from kmk is imported.'''
+    from tests.mocks import init_circuit_python_modules_mocks
+
+    init_circuit_python_modules_mocks()
+    for module in HARDWARE:
+        sys.modules[module] = MagicMock()
+
+
+def load_keyboard(main):
+    '''Run `main`, without starting the keyboard, and return the keyboard.'''
+    from kmk.kmk_keyboard import KMKKeyboard
+
+    def go(self, *args, **kwargs):
+        # Keep the arguments for tools that start the keyboard themselves.
+        self._board_go_args = kwargs
+
+    KMKKeyboard.go = go
+    sys.path.insert(0, str(Path(main).parent))
+    scope = runpy.run_path(str(main), run_name='board_loader')
+
+    for value in scope.values():
+        if isinstance(value, KMKKeyboard):
+            return value
+    raise RuntimeError(f'no keyboard in {main}')
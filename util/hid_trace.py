@@ -0,0 +1,244 @@
+'''
+Replay and compare HID report traces.
+
+Traces are the output of `ReportTrace.dump` (see kmk/hid.py), captured on a
+keyboard with `keyboard.go(trace_size=...)`:
+
+    python util/hid_trace.py stats trace.txt
+    python util/hid_trace.py diff trace.txt other.txt
+    python util/hid_trace.py replay boards/crkbd trace.txt [-o replayed.txt]
+
+`stats` reports the latency from every key event to the next report. `diff`
+compares the reports of two traces, in order, and the timing of the reports
+they have in common. `replay` runs the key events of a trace through the
+keymap of a board's `main.py` on the host, at the recorded times, traces the
+reports it sends and compares them with the recorded ones.
+
+Times are relative to the first key event of a trace.
+'''
+
+import argparse
+import contextlib
+import difflib
+import io
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+from board_loader import init_mocks, load_keyboard
+
+TICKS_PERIOD = 1 << 29
+
+# `device` is 'page:usage' for reports, None for key events. `data` is the
+# report as hex string, or `(key_number, pressed)` for key events.
+Record = namedtuple('Record', ('ms', 'device', 'data'))
+
+
+def parse(lines):
+    records = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        fields = line.split()
+        ticks = int(fields[0])
+        if fields[1] == 'key':
+            records.append(Record(ticks, None, (int(fields[2]), fields[3] == '1')))
+        elif fields[1] == 'report':
+            records.append(Record(ticks, fields[2], fields[3]))
+        else:
+            raise ValueError(f'not a trace record: {line!r}')
+
+    # Make times relative to the first key event, or the first record.
+    start = next((r.ms for r in records if r.device is None), None)
+    if start is None and records:
+        start = records[0].ms
+    return [
+        r._replace(
+            ms=(r.ms - start + TICKS_PERIOD // 2) % TICKS_PERIOD - TICKS_PERIOD // 2
+        )
+        for r in records
+    ]
+
+
+def load(path):
+    with open(path) as f:
+        return parse(f)
+
+
+def reports(records):
+    return [r for r in records if r.device is not None]
+
+
+def latencies(records):
+    '''Time from every key event to the next report.'''
+    result = []
+    pending = []
+    for r in records:
+        if r.device is None:
+            pending.append(r.ms)
+        elif pending:
+            result.extend(r.ms - ms for ms in pending)
+            pending.clear()
+    return result
+
+
+def summary(values):
+    if not values:
+        return 'n/a'
+    values = sorted(values)
+    return (
+        f'min {values[0]} / median {values[len(values) // 2]}'
+        f' / max {values[-1]} ms ({len(values)} samples)'
+    )
+
+
+def stats(records):
+    print(f'{len(records) - len(reports(records))} key events')
+    print(f'{len(reports(records))} reports')
+    print(f'latency: {summary(latencies(records))}')
+
+
+def diff(a, b, a_name='a', b_name='b'):
+    '''Print the differences between two traces, return True if they match.'''
+    a_reports = reports(a)
+    b_reports = reports(b)
+    a_lines = [f'{r.device} {r.data}' for r in a_reports]
+    b_lines = [f'{r.device} {r.data}' for r in b_reports]
+
+    matcher = difflib.SequenceMatcher(a=a_lines, b=b_lines, autojunk=False)
+    offsets = []
+    for block in matcher.get_matching_blocks():
+        for n in range(block.size):
+            offsets.append(b_reports[block.b + n].ms - a_reports[block.a + n].ms)
+
+    same = a_lines == b_lines
+    if same:
+        print(f'{len(a_lines)} reports match')
+    else:
+        print(f'--- {a_name}')
+        print(f'+++ {b_name}')
+        for tag, a_start, a_end, b_start, b_end in matcher.get_opcodes():
+            if tag == 'equal':
+                continue
+            print(f'@@ report {a_start + 1} @@')
+            for r in a_reports[a_start:a_end]:
+                print(f'-{r.ms:>8} {r.device} {r.data}')
+            for r in b_reports[b_start:b_end]:
+                print(f'+{r.ms:>8} {r.device} {r.data}')
+    print(f'timing offset of matching reports: {summary(offsets)}')
+    print(f'latency {a_name}: {summary(latencies(a))}')
+    print(f'latency {b_name}: {summary(latencies(b))}')
+    return same
+
+
+def replay(main, records, tail_ms=1000):
+    '''
+    Run the key events of `records` through the keyboard of `main` and return
+    the trace of the replay, as lines of `ReportTrace.dump`.
+    '''
+    init_mocks()
+
+    from kmk.hid import HIDModes
+    from kmk.kmktime import ticks_diff
+    from kmk.scanners import Scanner
+    from supervisor import ticks_ms
+    from tests.mocks import Device, clock
+
+    clock.virtual = True
+
+    class ReplayScanner(Scanner):
+        def __init__(self, events, key_count):
+            self.events = events
+            self._key_count = key_count
+            self.start = ticks_ms()
+
+        @property
+        def key_count(self):
+            return self._key_count
+
+        def scan_for_changes(self):
+            if not self.events:
+                return None
+            ms, (key_number, pressed) = self.events[0]
+            if ticks_diff(ticks_ms(), self.start) < ms:
+                return None
+            self.events.pop(0)
+            return self.key_event(key_number, pressed)
+
+    # Recreate the devices of the recording, including the report length: it
+    # tells 6KRO and NKRO keyboards apart.
+    devices = {}
+    for r in reports(records):
+        devices.setdefault((r.device, len(r.data) // 2), None)
+    if not devices:
+        devices[('01:06', 8)] = None
+
+    keyboard = load_keyboard(main)
+    go_args = {
+        key: value
+        for key, value in getattr(keyboard, '_board_go_args', {}).items()
+        if key in ('incremental_reports', 'poll_interval_ms')
+    }
+    # Room for a couple of reports per recorded record.
+    trace_size = 4 * len(records) + 256
+    keyboard._init(hid_type=HIDModes.NOOP, trace_size=trace_size, **go_args)
+    hid = keyboard._hid_helper
+    hid.connected = True
+    hid.devices = [
+        Device(*(int(x, 16) for x in device.split(':')), length)
+        for device, length in devices
+    ]
+    hid.setup()
+    hid.trace.clear()
+
+    events = [(r.ms, r.data) for r in records if r.device is None and r.ms >= 0]
+    key_count = max((key_number for _, (key_number, _) in events), default=0) + 1
+    keyboard.matrix = (ReplayScanner(events, key_count),)
+
+    end = max((r.ms for r in records), default=0) + tail_ms
+    start = ticks_ms()
+    while ticks_diff(ticks_ms(), start) <= end:
+        keyboard._main_loop()
+        clock.advance(1)
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        hid.trace.dump()
+    return output.getvalue().splitlines()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    command = commands.add_parser('stats', help='report latencies of a trace')
+    command.add_argument('trace', type=Path)
+
+    command = commands.add_parser('diff', help='compare two traces')
+    command.add_argument('a', type=Path)
+    command.add_argument('b', type=Path)
+
+    command = commands.add_parser('replay', help='replay a trace on a board')
+    command.add_argument('board', type=Path, help='board directory or main.py')
+    command.add_argument('trace', type=Path)
+    command.add_argument('-o', '--output', type=Path, help='save the replay')
+    args = parser.parse_args()
+
+    if args.command == 'stats':
+        stats(load(args.trace))
+    elif args.command == 'diff':
+        sys.exit(not diff(load(args.a), load(args.b), str(args.a), str(args.b)))
+    else:
+        path = args.board
+        if path.is_dir():
+            path = path / 'main.py'
+        records = load(args.trace)
+        lines = replay(path.resolve(), records)
+        if args.output:
+            args.output.write_text('\n'.join(lines) + '\n')
+        sys.exit(not diff(records, parse(lines), str(args.trace), 'replay'))
+
+
+if __name__ == '__main__':
+    main()
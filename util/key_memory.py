@@ -0,0 +1,188 @@
+'''
+Estimate the heap used by the keys of a keymap on CircuitPython.
+
+Runs the `main.py` of every board in boards/ (or of the boards given on the
+command line) with the hardware mocked out, collects all unique keys reachable
+from `keyboard.keymap`, and reports their estimated size per key type and in
+total.
+
+The estimate models MicroPython's object layout on 32 bit targets: an instance
+is a single 16 byte GC block, its attributes live in a separate hash table of
+8 bytes per slot that grows through fixed sizes as attributes are added.
+Tuples and lists of keys held by a key are counted as well; handlers, ints and
+other shared objects aren't.
+
+With `--intern`, boards are measured a second time with `kmk.keys.intern_keys`
+enabled, and the savings are reported.
+
+    python util/key_memory.py [--intern] [boards/lily58 ...]
+'''
+
+import subprocess
+import sys
+from pathlib import Path
+
+from board_loader import init_mocks, load_keyboard, root
+
+GC_BLOCK = 16
+WORD = 4
+MAP_SLOT = 2 * WORD
+INSTANCE = 3 * WORD
+MAP_ALLOC = (2, 4, 8, 17, 37, 67)
+
+# Prefix of result lines, boards may print to stdout as well.
+MARKER = 'key_memory:'
+
+
+def blocks(n):
+    return -(-n // GC_BLOCK) * GC_BLOCK
+
+
+def map_bytes(used):
+    if not used:
+        return 0
+    for alloc in MAP_ALLOC:
+        if used <= alloc:
+            return blocks(alloc * MAP_SLOT)
+    return blocks(used * MAP_SLOT)
+
+
+def container_bytes(obj):
+    if isinstance(obj, tuple):
+        return blocks(2 * WORD + len(obj) * WORD)
+    # list: object and separately allocated item array
+    return blocks(4 * WORD) + blocks(len(obj) * WORD)
+
+
+def key_bytes(key):
+    return blocks(INSTANCE) + map_bytes(len(vars(key)))
+
+
+def collect(keymap, Key):
+    '''Return `(key, bytes)` for every unique key reachable from `keymap`.'''
+    sizes = {}
+    pending = [key for layer in keymap for key in layer]
+    while pending:
+        key = pending.pop()
+        if not isinstance(key, Key) or id(key) in sizes:
+            continue
+        size = key_bytes(key)
+        for value in vars(key).values():
+            if isinstance(value, Key):
+                pending.append(value)
+            elif isinstance(value, (tuple, list)):
+                keys = [v for v in value if isinstance(v, Key)]
+                if keys:
+                    size += container_bytes(value)
+                    pending.extend(keys)
+        sizes[id(key)] = (key, size)
+    return sizes.values()
+
+
+def measure(main, intern=False):
+    '''Load a board's main.py and print `type count bytes` result lines.'''
+    init_mocks()
+
+    from kmk.keys import Key, intern_keys
+
+    intern_keys(intern)
+    keyboard = load_keyboard(main)
+
+    types = {}
+    for key, size in collect(keyboard.keymap, Key):
+        name = key.__class__.__name__
+        count, total = types.get(name, (0, 0))
+        types[name] = (count + 1, total + size)
+
+    for name, (count, total) in types.items():
+        print(MARKER, name, count, total)
+
+
+def run(main, intern):
+    '''
+    Measure a board in a fresh interpreter, KC and the mocks are global.
+    Return a dict of key types to `(count, bytes)`, or an error message.
+    '''
+    args = [sys.executable, __file__, '--measure', str(main)]
+    if intern:
+        args.append('--intern')
+    result = subprocess.run(args, capture_output=True, text=True, cwd=root)
+    if result.returncode:
+        return (result.stderr.strip().splitlines()[-1:] or ['?'])[0]
+
+    types = {}
+    for line in result.stdout.splitlines():
+        if line.startswith(MARKER):
+            _, kind, count, nbytes = line.split()
+            types[kind] = (int(count), int(nbytes))
+    return types
+
+
+def add(totals, types):
+    for kind, (count, nbytes) in types.items():
+        c, b = totals.get(kind, (0, 0))
+        totals[kind] = (c + count, b + nbytes)
+
+
+def sums(types):
+    return [sum(i) for i in zip((0, 0), *types.values())]
+
+
+def main(args, intern=False):
+    '''
+    Print key counts and bytes per board and per key type. With `intern`,
+    print them for interned keys next to the regular ones.
+    '''
+    if args:
+        mains = [Path(arg).resolve() / 'main.py' for arg in args]
+    else:
+        mains = sorted((root / 'boards').glob('**/main.py'))
+
+    columns = f'{"keys":>6} {"bytes":>8}'
+    if intern:
+        columns += f' {"interned":>8} {"bytes":>8} {"saved":>8}'
+
+    totals = {}
+    interned_totals = {}
+    print(f'{"board":<40} {columns}')
+    for main in mains:
+        name = str(main.parent.relative_to(root / 'boards'))
+        types = run(main, False)
+        if isinstance(types, str):
+            print(f'{name:<40} skipped: {types}')
+            continue
+        add(totals, types)
+        keys, size = sums(types)
+        line = f'{name:<40} {keys:>6} {size:>8}'
+
+        if intern:
+            types = run(main, True)
+            add(interned_totals, types)
+            ikeys, isize = sums(types)
+            line += f' {ikeys:>8} {isize:>8} {size - isize:>8}'
+        print(line)
+
+    print()
+    print(f'{"key type":<40} {columns}')
+    for kind, (count, nbytes) in sorted(totals.items(), key=lambda i: -i[1][1]):
+        line = f'{kind:<40} {count:>6} {nbytes:>8}'
+        if intern:
+            icount, isize = interned_totals.get(kind, (0, 0))
+            line += f' {icount:>8} {isize:>8} {nbytes - isize:>8}'
+        print(line)
+
+    keys, size = sums(totals)
+    line = f'{"total":<40} {keys:>6} {size:>8}'
+    if intern:
+        ikeys, isize = sums(interned_totals)
+        line += f' {ikeys:>8} {isize:>8} {size - isize:>8}'
+    print(line)
+
+
+if __name__ == '__main__':
+    intern = '--intern' in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg != '--intern']
+    if args[:1] == ['--measure']:
+        measure(Path(args[1]), intern)
+    else:
+        main(args, intern)
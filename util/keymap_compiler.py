@@ -0,0 +1,225 @@
+'''
+Compile the keymap of a board's main.py into a module with a flat layer table.
+
+Runs main.py with the hardware mocked out, and writes a module that defines
+`keymap`, a `kmk.keymap.CompiledKeymap`:
+
+- every distinct key is created once, by name (`KC.A`) or by the call that
+  created it (`KC.LT(1, KC.SPC)`, `KC.LSFT(KC.N1)`), in a single tuple,
+- layers are byte strings of indices into that tuple,
+- transparent keys of every layer are resolved against the default layer
+  ahead of time, so the keyboard can swap in a whole layer on layer changes
+  instead of resolving key by key.
+
+Keys that can't be recreated this way -- keys constructed by hand rather than
+through `KC` -- are reported as errors. Custom keys made with `make_key` and
+the modules that provide argumented keys have to exist before the compiled
+keymap is imported:
+
+    keyboard.modules.append(Layers())
+
+    from compiled_keymap import keymap
+
+    keyboard.keymap = keymap
+
+Usage:
+
+    python util/keymap_compiler.py boards/crkbd [-o boards/crkbd/compiled_keymap.py]
+'''
+
+import argparse
+import sys
+from pathlib import Path
+
+from board_loader import init_mocks, load_keyboard
+
+OUTPUT = 'compiled_keymap.py'
+
+
+class KeymapCompiler:
+    def __init__(self):
+        # id(key) -> (callee, args, kwargs, key) of the call that created the
+        # key; the callee is either the name of an argumented key or a
+        # modifier. Holding on to the key keeps its id from being reused.
+        self.calls = {}
+        self.keys = []
+        self.index = {}
+
+    def record(self):
+        '''Record the calls that create argumented and modified keys.'''
+        import kmk.keys as keys
+
+        calls = self.calls
+        make_argumented_key = keys.make_argumented_key
+        modify = keys.ModifierKey.__call__
+
+        def recording_make_argumented_key(names, constructor, **_kwargs):
+            make = make_argumented_key(names, constructor, **_kwargs)
+
+            def argumented_key(*args, **kwargs):
+                key = make(*args, **kwargs)
+                if id(key) not in calls:
+                    calls[id(key)] = (names[0], args, kwargs, key)
+                return key
+
+            for name in names:
+                keys.KC[name] = argumented_key
+            return argumented_key
+
+        def recording_modify(modifier, key):
+            modified = modify(modifier, key)
+            if id(modified) not in calls:
+                calls[id(modified)] = (modifier, (key,), {}, modified)
+            return modified
+
+        keys.make_argumented_key = recording_make_argumented_key
+        keys.ModifierKey.__call__ = recording_modify
+
+    def names(self):
+        '''Map keys in `KC` to the first of their names that is an identifier.'''
+        from kmk.keys import KC, Key
+
+        names = {}
+        for name in KC:
+            key = KC[name]
+            if isinstance(key, Key) and name.isidentifier():
+                names.setdefault(id(key), name)
+        return names
+
+    def expression(self, value, names):
+        '''Python source that recreates `value`.'''
+        from kmk.keys import Key
+
+        if isinstance(value, Key):
+            if id(value) in names:
+                return f'KC.{names[id(value)]}'
+            if id(value) not in self.calls:
+                raise ValueError(f'{value} was not created through KC')
+
+            callee, args, kwargs, _ = self.calls[id(value)]
+            if isinstance(callee, str):
+                callee = f'KC.{callee}'
+            else:
+                callee = self.expression(callee, names)
+            args = [self.expression(arg, names) for arg in args]
+            args.extend(
+                f'{k}={self.expression(v, names)}' for k, v in kwargs.items()
+            )
+            return f'{callee}({", ".join(args)})'
+
+        if isinstance(value, (tuple, list)):
+            items = [self.expression(item, names) for item in value]
+            if isinstance(value, tuple):
+                return f'({", ".join(items)}{"," if len(items) == 1 else ""})'
+            return f'[{", ".join(items)}]'
+
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return repr(value)
+
+        raise ValueError(f'can\'t recreate {value!r}')
+
+    def key_index(self, key, names):
+        '''
+        Index of `key` in the key table. Keys that may be shared, see
+        `Key.interned`, are deduplicated by their expression.
+        '''
+        expression = self.expression(key, names)
+        ident = expression if key.interned or id(key) in names else id(key)
+        if ident not in self.index:
+            self.index[ident] = len(self.keys)
+            self.keys.append(expression)
+        return self.index[ident]
+
+    def compile(self, keymap, base=0):
+        '''Return the source of the compiled keymap module.'''
+        from kmk.keys import KC
+
+        names = self.names()
+        errors = []
+        layers = []
+        for layer in keymap:
+            indices = []
+            for key in layer:
+                try:
+                    indices.append(self.key_index(key, names))
+                except ValueError as e:
+                    errors.append(str(e))
+                    indices.append(0)
+            layers.append(indices)
+        if errors:
+            raise ValueError('\n'.join(sorted(set(errors))))
+
+        # Transparent keys resolved the same way `KMKKeyboard._resolve_key`
+        # does for the layer stack [layer, base].
+        trns = None
+        if id(KC.TRNS) in names:
+            trns = self.index.get(f'KC.{names[id(KC.TRNS)]}')
+        resolved = []
+        for layer in layers:
+            indices = []
+            for idx in range(max(len(layer), len(layers[base]))):
+                key = layer[idx] if idx < len(layer) else None
+                if key is None or key == trns:
+                    if idx < len(layers[base]):
+                        key = layers[base][idx]
+                indices.append(key)
+            resolved.append(indices)
+
+        lines = [
+            '# Generated by util/keymap_compiler.py, do not edit.',
+            'from kmk.keymap import CompiledKeymap',
+            'from kmk.keys import KC',
+            '',
+        ]
+        if len(self.keys) > 256:
+            lines.insert(1, 'from array import array')
+
+        lines.append('keys = (')
+        lines.extend(f'    {key},' for key in self.keys)
+        lines.append(')')
+        for name, table in (('layers', layers), ('resolved', resolved)):
+            lines.append('')
+            lines.append(f'{name} = (')
+            lines.extend(f'    {self.table(indices)},' for indices in table)
+            lines.append(')')
+        lines.append('')
+        lines.append(f'keymap = CompiledKeymap(keys, layers, resolved, base={base})')
+        lines.append('')
+        return '\n'.join(lines)
+
+    def table(self, indices):
+        if len(self.keys) > 256:
+            return f'array(\'H\', {tuple(indices)!r})'
+        return repr(bytes(indices))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('board', type=Path, help='board directory or main.py')
+    parser.add_argument('-o', '--output', type=Path)
+    args = parser.parse_args()
+
+    path = args.board
+    if path.is_dir():
+        path = path / 'main.py'
+    output = args.output or path.parent / OUTPUT
+
+    init_mocks()
+    compiler = KeymapCompiler()
+    compiler.record()
+    keyboard = load_keyboard(path.resolve())
+
+    try:
+        source = compiler.compile(keyboard.keymap)
+    except ValueError as e:
+        sys.exit(f'{path}: can\'t compile keymap:\n{e}')
+
+    output.write_text(source)
+    print(
+        f'{output}: {len(compiler.keys)} keys, {len(keyboard.keymap)} layers'
+        f' of {max(len(layer) for layer in keyboard.keymap)} keys'
+    )
+
+
+if __name__ == '__main__':
+    main()